@@ -0,0 +1,107 @@
+import json
+import os
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+
+import cv2
+import django
+
+
+def summarize(timings) -> dict:
+    '''Возвращает сводную статистику по списку длительностей (сек).'''
+
+    if not timings:
+        return {'count': 0}
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'total': round(total, 6),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+        'p95_ms': round(
+            ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000,
+            3,
+        ),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'per_second': round(len(ordered) / total, 2) if total else None,
+    }
+
+
+def get_quantile(bounds, counts, quantile: float) -> float:
+    '''Оценивает квантиль по количеству значений в интервалах
+    гистограммы линейной интерполяцией внутри интервала.'''
+
+    rank = quantile * sum(counts)
+    cumulative = lower = 0
+    for bound, count in zip(bounds + (None,), counts):
+        if count and cumulative + count >= rank:
+            # Для последнего интервала верхняя граница не известна
+            if bound is None:
+                return lower
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        if bound is not None:
+            lower = bound
+    return lower
+
+
+def summarize_histogram(histogram, **labels) -> dict:
+    '''Возвращает сводную статистику по значениям гистограммы.
+
+    Формат совпадает с summarize, но процентили и максимум являются
+    оценками по интервалам гистограммы.
+    '''
+
+    counts, total = histogram.get_buckets(**labels)
+    count = sum(counts)
+    if not count:
+        return {'count': 0}
+
+    def get_ms(quantile):
+        value = get_quantile(histogram.buckets, counts, quantile)
+        return round(value * 1000, 3)
+
+    return {
+        'count': count,
+        'total': round(total, 6),
+        'mean_ms': round(total / count * 1000, 3),
+        'p50_ms': get_ms(0.5),
+        'p95_ms': get_ms(0.95),
+        'max_ms': get_ms(1),
+        'per_second': round(count / total, 2) if total else None,
+    }
+
+
+def get_environment() -> dict:
+    '''Возвращает параметры окружения, влияющие на результаты.'''
+
+    return {
+        'python': sys.version.split()[0],
+        'django': django.get_version(),
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(name: str, params: dict, results, output=None) -> dict:
+    '''Сохраняет результаты замеров в формате JSON.
+
+    Результаты разных версий сравниваются по одинаковым ключам,
+    поэтому формат файла следует менять только с добавлением полей.
+    '''
+
+    report = {
+        'benchmark': name,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'environment': get_environment(),
+        'params': params,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    return report
@@ -0,0 +1,277 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.http import HttpResponse
+
+# Границы интервалов гистограмм длительности по умолчанию (сек)
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+
+def escape(value) -> str:
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in labels.items()
+    ) + '}'
+
+
+class Metric:
+    '''Базовый класс метрики в формате Prometheus.
+
+    Значения хранятся в памяти процесса отдельно для каждого
+    набора значений меток.
+    '''
+
+    type = None
+
+    def __init__(
+        self, name: str, help_text: str, labels=(), registry=None
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry or default_registry).register(self)
+
+    def get_key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f'Метрика {self.name} ожидает метки '
+                f'{", ".join(self.label_names)}'
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def get_labels(self, key: tuple, **extra) -> dict:
+        return {**dict(zip(self.label_names, key)), **extra}
+
+    def render(self) -> list:
+        lines = [
+            f'# HELP {self.name} {self.help_text}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.extend(self.render_value(key, value))
+        return lines
+
+    def render_value(self, key: tuple, value) -> list:
+        raise NotImplementedError
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def drain(self) -> dict:
+        '''Возвращает накопленные значения и обнуляет метрику.'''
+
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict):
+        '''Добавляет значения, накопленные в другом процессе.'''
+
+        with self._lock:
+            for key, value in values.items():
+                key = tuple(key)
+                self._values[key] = self.add_value(
+                    self._values.get(key), value
+                )
+
+    def add_value(self, current, value):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    '''Монотонно возрастающий счетчик.'''
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self.get_key(labels), 0)
+
+    def add_value(self, current, value):
+        return (current or 0) + value
+
+    def render_value(self, key: tuple, value) -> list:
+        labels = format_labels(self.get_labels(key))
+        return [f'{self.name}{labels} {value}']
+
+
+class Histogram(Metric):
+    '''Гистограмма распределения значений по интервалам.'''
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels=(),
+        buckets=DEFAULT_BUCKETS,
+        registry=None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels, registry)
+
+    def observe(self, value: float, **labels):
+        key = self.get_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(
+                key, ([0] * (len(self.buckets) + 1), 0)
+            )
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        '''Замеряет длительность выполнения блока кода.'''
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def get_count(self, **labels) -> int:
+        counts, _ = self._values.get(self.get_key(labels), ((), 0))
+        return sum(counts)
+
+    def add_value(self, current, value):
+        counts, total = value
+        if current is None:
+            return list(counts), total
+        current_counts, current_total = current
+        return (
+            [a + b for a, b in zip(current_counts, counts)],
+            current_total + total,
+        )
+
+    def get_buckets(self, **labels):
+        '''Возвращает количество значений в каждом интервале (последний
+        интервал - больше верхней границы) и сумму значений.'''
+
+        with self._lock:
+            counts, total = self._values.get(
+                self.get_key(labels), ([0] * (len(self.buckets) + 1), 0)
+            )
+            return list(counts), total
+
+    def render_value(self, key: tuple, value) -> list:
+        counts, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += count
+            labels = format_labels(self.get_labels(key, le=bound))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = format_labels(self.get_labels(key))
+        lines.append(f'{self.name}_sum{labels} {total}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    '''Реестр метрик процесса.'''
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Метрика {metric.name} уже существует.')
+            self._metrics[metric.name] = metric
+
+    def drain(self) -> dict:
+        '''Возвращает значения всех метрик и обнуляет их.
+
+        Используется для передачи метрик из дочерних процессов
+        в процесс, который их отдает.
+        '''
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: values
+            for metric in metrics if (values := metric.drain())
+        }
+
+    def merge(self, snapshot: dict):
+        '''Добавляет значения метрик, полученные методом drain.'''
+
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in snapshot.items():
+            if name in metrics:
+                metrics[name].merge(values)
+
+    def render(self) -> str:
+        '''Возвращает значения всех метрик в текстовом формате
+        Prometheus.'''
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+default_registry = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_view(request):
+    '''Возвращает метрики процесса в текстовом формате Prometheus.'''
+
+    return HttpResponse(default_registry.render(), content_type=CONTENT_TYPE)
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content = default_registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, address: str = '') -> ThreadingHTTPServer:
+    '''Запускает HTTP-сервер метрик в отдельном потоке.
+
+    Используется процессами без веб-сервера (например, командой
+    run_cameras), метрики которых недоступны по адресу /metrics.
+    '''
+
+    server = ThreadingHTTPServer((address, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -37,6 +37,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'files.middleware.MetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'big_three_test.urls'
@@ -116,6 +117,64 @@ else:
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Хранилище медиа-файлов: "local" (каталог MEDIA_ROOT) или "s3"
+# (S3-совместимое объектное хранилище, требуется пакет boto3)
+FILES_STORAGE = os.getenv('FILES_STORAGE', 'local')
+STORAGES = {
+    'default': {
+        'BACKEND': {
+            'local': 'django.core.files.storage.FileSystemStorage',
+            's3': 'files.storage.S3Storage',
+        }[FILES_STORAGE],
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+# Параметры хранилища S3: корзина, префикс ключей, адрес и регион
+# хранилища (для совместимых с S3 хранилищ, например MinIO)
+S3_BUCKET = os.getenv('S3_BUCKET', '')
+S3_PREFIX = os.getenv('S3_PREFIX', '')
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL')
+S3_REGION = os.getenv('S3_REGION')
+S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID', '')
+S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY', '')
+# Адрес публичного доступа к корзине; если не задан, ссылки на файлы
+# подписываются и действуют S3_URL_EXPIRE секунд
+S3_PUBLIC_URL = os.getenv('S3_PUBLIC_URL', '')
+S3_URL_EXPIRE = 3600
+
+# Обработчики загрузки вычисляют контрольную сумму файла при получении
+FILE_UPLOAD_HANDLERS = [
+    'files.upload_handlers.HashingMemoryFileUploadHandler',
+    'files.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+
+# Каталог для временных файлов загрузок по частям
+CHUNKED_UPLOAD_ROOT = BASE_DIR / 'chunked_uploads'
+# Размер блока при потоковой записи загружаемых файлов (1 MB)
+FILE_UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Срок хранения файлов в днях (0 - файлы хранятся бессрочно)
+FILES_RETENTION_DAYS = int(os.getenv('FILES_RETENTION_DAYS', 0))
+# Количество объектов, удаляемых в одной транзакции
+FILES_DELETE_BATCH_SIZE = 1000
+# Количество потоков для удаления файлов из хранилища
+FILES_DELETE_WORKERS = 4
+# Каталог кэша уменьшенных копий изображений
+THUMBNAIL_CACHE_ROOT = BASE_DIR / 'thumbnails'
+# Максимальный размер кэша уменьшенных копий в байтах (500 MB)
+THUMBNAIL_CACHE_MAX_SIZE = 500 * 1_000_000
+# Размеры уменьшенных копий (ширина, высота)
+THUMBNAIL_SIZES = {
+    'small': (160, 160),
+    'medium': (480, 480),
+}
+THUMBNAIL_QUALITY = 80
+# Максимальное количество файлов в одном запросе пакетной загрузки
+FILES_BATCH_MAX_SIZE = 100
+# Количество потоков для записи файлов пакетной загрузки
+FILES_BATCH_WORKERS = 8
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -128,9 +187,162 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Для нескольких процессов приложения следует использовать общий кэш
+# (например, django.core.cache.backends.redis.RedisCache), иначе
+# версия данных о файлах будет отличаться между процессами
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+# Время хранения закэшированных страниц списка файлов в секундах
+FILES_CACHE_TIMEOUT = 60
+
 DOMAIN = os.getenv('DOMAIN')
 ALLOWED_TIMEOUT = 30  # 30 секунд - допустимый таймаут для распознавания
 
+# Количество процессов для выполнения задач распознавания
+DETECTION_WORKERS = int(os.getenv('DETECTION_WORKERS', 2))
+# Максимальное количество задач в очереди и в работе одновременно
+DETECTION_QUEUE_SIZE = int(os.getenv('DETECTION_QUEUE_SIZE', 20))
+# Время в секундах, после которого задача в очереди или в работе
+# считается потерянной (например, после перезапуска процесса) и
+# завершается с ошибкой: за это время очередь гарантированно
+# обрабатывается пулом целиком
+DETECTION_JOB_TIMEOUT = int(os.getenv(
+    'DETECTION_JOB_TIMEOUT',
+    ALLOWED_TIMEOUT * (DETECTION_QUEUE_SIZE // DETECTION_WORKERS + 2),
+))
+# Количество последних декодированных кадров, хранимых для каждой камеры
+FRAME_BUFFER_SIZE = 2
+
+# Каталоги, из которых автоматически регистрируются каскады (*.xml);
+# имя каскада совпадает с именем файла
+DETECTION_CASCADE_DIRS = [
+    BASE_DIR / 'vision' / 'detection_cascades',
+    *filter(None, os.getenv('DETECTION_CASCADE_DIRS', '').split(',')),
+]
+# Дополнительные каскады в формате {"имя": "путь к файлу"}
+DETECTION_CASCADES = {}
+# Загрузка каскадов при старте процесса
+VISION_PRELOAD_CASCADES = True
+# Масштабы пирамиды изображений для распознавания, например "0.5,0.25"
+# для потоков высокого разрешения (1.0 - исходное разрешение)
+DETECTION_SCALES = tuple(
+    float(scale) for scale in os.getenv('DETECTION_SCALES', '1.0').split(',')
+)
+
+# Движок распознавания по умолчанию: "cascade" (каскады Хаара)
+# или "onnx" (модель YOLOv8 через cv2.dnn)
+DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'cascade')
+ONNX_MODEL_PATH = os.getenv(
+    'ONNX_MODEL_PATH', BASE_DIR / 'vision' / 'models' / 'yolov8n.onnx'
+)
+ONNX_INPUT_SIZE = 640
+ONNX_CONFIDENCE = 0.25
+ONNX_NMS_THRESHOLD = 0.45
+# Индексы классов модели (COCO), соответствующие типам объектов
+ONNX_OBJECT_TYPES = {
+    'people': [0],  # person
+    'cars': [2, 5, 7],  # car, bus, truck
+}
+# Максимальный размер пакета кадров и время его накопления (сек);
+# при размере 1 кадры обрабатываются по одному
+ONNX_BATCH_SIZE = int(os.getenv('ONNX_BATCH_SIZE', 8))
+ONNX_BATCH_DELAY = 0.01
+
+# Распознавание выполняется только на кадрах с движением и только
+# в области движения
+MOTION_DETECTION = os.getenv('MOTION_DETECTION', 'True') == 'True'
+# Масштаб копии кадра, на которой определяется движение
+MOTION_SCALE = 0.25
+# Минимальная площадь области движения (доля площади кадра)
+MOTION_MIN_AREA = 0.002
+# Кадр не сохраняется, если его перцептивный хэш отличается от хэша
+# последнего сохраненного кадра не более чем на указанное число бит
+DUPLICATE_HASH_DISTANCE = 6
+
+# Объекты отслеживаются между кадрами трекером, кадр сохраняется
+# только при появлении новых объектов
+TRACKING = os.getenv('TRACKING', 'True') == 'True'
+# Распознавание выполняется на каждом N-м кадре, на остальных
+# положение объектов предсказывается трекером
+DETECT_EVERY = int(os.getenv('DETECT_EVERY', 1))
+# Минимальное перекрытие (IoU) объекта с предсказанным положением
+# и количество распознаваний подряд, после которого
+# не найденный объект перестает отслеживаться
+TRACK_IOU_THRESHOLD = 0.3
+TRACK_MAX_MISSES = 3
+
+# Режим записи видеороликов с событиями распознавания
+CLIP_RECORDING = os.getenv('CLIP_RECORDING', 'False') == 'True'
+# Длительность записи до и после распознавания (сек)
+CLIP_PRE_ROLL = 5
+CLIP_POST_ROLL = 5
+# Максимальная длительность видеоролика (сек)
+CLIP_MAX_DURATION = 60
+# Частота кадров, если поток не сообщает корректную частоту
+CLIP_FPS = 15
+CLIP_MAX_FPS = 60
+# Размер очереди кадров потока кодирования
+CLIP_QUEUE_SIZE = 64
+# Размер очереди несжатых кадров потока сжатия; кадры сжимаются
+# вне потока захвата, а при переполнении очереди отбрасываются
+CLIP_FRAME_QUEUE_SIZE = 4
+CLIP_CODEC = 'mp4v'
+# Кадры буфера и очереди хранятся сжатыми в JPEG с качеством
+# CLIP_FRAME_QUALITY, кадры шире CLIP_MAX_WIDTH уменьшаются (ролики
+# записываются в этом разрешении). Несжатый кадр 1080p занимает около
+# 6 МБ, и буфер из 5 секунд при 25 кадрах в секунду занимал бы около
+# 750 МБ на камеру; сжатый кадр шириной 1280 - порядка 100-200 КБ,
+# то есть 15-25 МБ на камеру. Размер буфера каждой камеры
+# дополнительно ограничен CLIP_BUFFER_MAX_SIZE байтами.
+CLIP_MAX_WIDTH = int(os.getenv('CLIP_MAX_WIDTH', 1280))
+CLIP_FRAME_QUALITY = 85
+CLIP_BUFFER_MAX_SIZE = int(os.getenv('CLIP_BUFFER_MAX_SIZE', 50_000_000))
+
+# Размер пула и очереди кодирования и сохранения кадров с объектами
+FRAME_ENCODER_WORKERS = int(os.getenv('FRAME_ENCODER_WORKERS', 2))
+FRAME_ENCODER_QUEUE_SIZE = 8
+# Формат ("jpg" или "webp") и качество сохраняемых кадров
+FRAME_FORMAT = os.getenv('FRAME_FORMAT', 'jpg')
+FRAME_QUALITY = int(os.getenv('FRAME_QUALITY', 90))
+# Кадры шире указанного значения уменьшаются перед кодированием
+FRAME_MAX_WIDTH = int(os.getenv('FRAME_MAX_WIDTH', 0)) or None
+# Вместе с размеченным кадром сохраняется исходный кадр без разметки
+FRAME_KEEP_ORIGINAL = os.getenv('FRAME_KEEP_ORIGINAL', 'False') == 'True'
+
+# Размер общего пула распознавания команды run_cameras
+CAMERA_DETECTION_WORKERS = int(
+    os.getenv('CAMERA_DETECTION_WORKERS', os.cpu_count() or 2)
+)
+# Количество кадров, ожидающих распознавания, для каждой камеры
+CAMERA_QUEUE_SIZE = 2
+# Начальная и максимальная задержка переподключения к камере (сек)
+CAMERA_RECONNECT_DELAY = 1
+CAMERA_RECONNECT_MAX_DELAY = 60
+
+# Частота кадров и качество JPEG при просмотре камеры в реальном времени
+LIVE_FPS = 5
+LIVE_QUALITY = 70
+# Время ожидания кадра (сек); по его истечении событийный поток
+# отправляет комментарий для поддержания соединения
+LIVE_TIMEOUT = 15
+# Количество последних событий распознавания, хранимых для зрителей
+LIVE_EVENTS_SIZE = 100
+
+# Камеры, обработка кадров которых профилируется выборочным
+# профилировщиком, интервал снятия стеков (сек) и каталог результатов
+VISION_PROFILE_CAMERAS = list(
+    filter(None, os.getenv('VISION_PROFILE_CAMERAS', '').split(','))
+)
+VISION_PROFILE_INTERVAL = 0.005
+VISION_PROFILE_DIR = BASE_DIR / 'profiles'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -158,5 +370,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'files': {
+            'handlers': ['file'],
+            'level': 'INFO',
+            'propagate': True,
+        },
     },
 }
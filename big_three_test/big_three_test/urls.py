@@ -6,6 +6,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from big_three_test.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="BIG-THREE-TEST API",
@@ -23,6 +25,7 @@ urlpatterns = [
     path('', include('vision.urls', namespace='vision')),
     path('api/', include('files.urls', namespace='files')),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('swagger/', schema_view.with_ui(
         'swagger', cache_timeout=0),
         name='schema-swagger',
@@ -1,5 +1,38 @@
 import os
+import uuid
+from datetime import datetime
 
 
 def generate_upload_path(instance, filename):
-    return os.path.join(instance._meta.model_name, filename)
+    '''Возвращает путь файла в хранилище.
+
+    Файлы распределяются по подкаталогам по дате загрузки, а имя
+    файла заменяется уникальным, чтобы файлы не перезаписывались.
+    '''
+
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(
+        instance._meta.model_name,
+        datetime.now().strftime('%Y/%m/%d'),
+        f'{uuid.uuid4().hex}{extension}',
+    )
+
+
+def generate_blob_path(checksum: str, extension: str) -> str:
+    '''Возвращает путь файла в хранилище, определяемый его содержимым.
+
+    Файлы распределяются по подкаталогам по первым символам
+    контрольной суммы, чтобы не хранить все файлы в одном каталоге.
+    '''
+
+    return os.path.join(
+        'blobs', checksum[:2], checksum[2:4], f'{checksum}.{extension}'
+    )
+
+
+def generate_file_name(extension: str) -> str:
+    '''Возвращает уникальное имя файла, начинающееся с текущих
+    даты и времени.'''
+
+    now = datetime.now()
+    return f'{now:%d_%m_%Y__%H_%M_%S}_{uuid.uuid4().hex[:12]}.{extension}'
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 
 
 class FilesConfig(AppConfig):
@@ -7,7 +7,12 @@ class FilesConfig(AppConfig):
     name = 'files'
 
     def ready(self):
+        from files.cache import bump_version
         from files.signals import delete_file
         from files.models import File
         post_delete.connect(receiver=delete_file, sender=File)
+        # Изменение объектов делает недействительными закэшированные
+        # ответы API, в том числе в других процессах
+        post_save.connect(receiver=bump_version, sender=File)
+        post_delete.connect(receiver=bump_version, sender=File)
         return super().ready()
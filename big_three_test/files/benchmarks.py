@@ -0,0 +1,116 @@
+import base64
+import random
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import cv2
+import numpy as np
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from big_three_test.benchmarks import summarize
+from files.cache import bump_version
+from files.models import File
+
+
+def populate(rows: int, batch_size: int = 10000) -> int:
+    '''Дополняет таблицу файлов до указанного количества строк.
+
+    Даты создания распределяются по дням (по одному дню на пакет),
+    чтобы фильтры по дате выбирали часть строк.
+    '''
+
+    generator = random.Random(rows)
+    existing = File.objects.count()
+    now = timezone.now()
+    while existing < rows:
+        count = min(batch_size, rows - existing)
+        last_pk = File.objects.aggregate(last=Max('pk'))['last'] or 0
+        File.objects.bulk_create([
+            File(
+                file=f'bench/{existing + index}.jpg',
+                file_type=generator.choice(('image', 'video')),
+                size=generator.randint(1_000, 100_000_000),
+            )
+            for index in range(count)
+        ], batch_size=batch_size)
+        File.objects.filter(pk__gt=last_pk).update(
+            created=now - timedelta(days=existing // batch_size)
+        )
+        existing += count
+        bump_version()
+    return existing
+
+
+def get_upload_data() -> dict:
+    '''Возвращает данные запроса на создание файла с уникальным
+    изображением, чтобы не срабатывала дедупликация содержимого.'''
+
+    image = np.random.randint(0, 255, (64, 64, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', image)
+    content = base64.b64encode(buffer.tobytes()).decode()
+    return {'file': f'data:image/jpeg;base64,{content}'}
+
+
+def measure(
+    client: APIClient, method: str, url: str, requests: int, data=None
+):
+    '''Выполняет запросы и возвращает статистику длительности
+    и количества запросов к БД.'''
+
+    timings, queries = [], []
+    for _ in range(requests):
+        payload = data() if data else None
+        with CaptureQueriesContext(connection) as context:
+            start_time = time.perf_counter()
+            response = getattr(client, method)(url, payload)
+            timings.append(time.perf_counter() - start_time)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'{method.upper()} {url}: {response.status_code}'
+            )
+        queries.append(len(context.captured_queries))
+    result = summarize(timings)
+    result['queries'] = max(queries)
+    return result
+
+
+def run(sizes, requests: int = 20) -> list:
+    '''Замеряет создание, получение и фильтрацию файлов через API
+    для таблиц указанных размеров.
+
+    Кэширование страниц списка должно быть отключено
+    (FILES_CACHE_TIMEOUT=0), чтобы замерялись запросы к БД.
+    '''
+
+    client = APIClient()
+    list_url = reverse('files:file-list')
+    results = []
+    for rows in sorted(sizes):
+        populate(rows)
+        created_after = timezone.now() - timedelta(days=3)
+        operations = {
+            'list': list_url,
+            'list_next_page': client.get(list_url).data['next'] or list_url,
+            'filter_size': f'{list_url}?size_min=1000000&size_max=2000000',
+            'filter_created': f'{list_url}?' + urlencode(
+                {'created_after': created_after.isoformat()}
+            ),
+            'filter_type': f'{list_url}?file_type=video',
+            'order_by_size': f'{list_url}?ordering=-size',
+        }
+        result = {'rows': rows, 'operations': {}}
+        for name, url in operations.items():
+            result['operations'][name] = measure(
+                client, 'get', url, requests
+            )
+        result['operations']['create'] = measure(
+            client, 'post', list_url, requests, data=get_upload_data
+        )
+        results.append(result)
+    return results
@@ -0,0 +1,98 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from files.models import ListVersion
+
+# Первичный ключ единственной строки с версией данных списка файлов
+VERSION_ID = 1
+
+
+def get_version():
+    '''Возвращает версию данных списка файлов и время ее изменения.
+
+    Версия хранится в базе данных, поэтому ее меняют и объекты,
+    сохраненные другими процессами (задачами распознавания, командой
+    run_cameras), независимо от того, общий ли кэш у процессов.
+    '''
+
+    versions = ListVersion.objects.filter(pk=VERSION_ID)
+    version = versions.values_list('version', 'modified').first()
+    if version is None:
+        bump_version()
+        version = versions.values_list('version', 'modified').get()
+    token, modified = version
+    return str(token), int(modified.timestamp())
+
+
+def bump_version(*args, **kwargs):
+    '''Обновляет версию данных списка файлов.
+
+    Подключается к сигналам post_save и post_delete модели File,
+    вызывается также после bulk_create, который сигналы не отправляет.
+    '''
+
+    modified = timezone.now()
+    updated = ListVersion.objects.filter(pk=VERSION_ID).update(
+        version=F('version') + 1, modified=modified
+    )
+    if not updated:
+        ListVersion.objects.get_or_create(
+            pk=VERSION_ID, defaults={'modified': modified}
+        )
+
+
+def get_list_cache_key(version: str, url: str) -> str:
+    '''Возвращает ключ кэша страницы списка файлов.
+
+    Страница содержит абсолютные ссылки, поэтому в ключ входит полный
+    адрес запроса вместе со схемой и хостом.
+    '''
+
+    path_hash = hashlib.md5(url.encode()).hexdigest()
+    return f'files:list:{version}:{path_hash}'
+
+
+def get_list_etag(version: str, url: str) -> str:
+    '''Возвращает ETag страницы списка файлов.'''
+
+    return quote_etag(hashlib.md5(f'{version}:{url}'.encode()).hexdigest())
+
+
+def get_object_etag(obj) -> str:
+    '''Возвращает ETag объекта файла.'''
+
+    return quote_etag(f'{obj.pk}-{obj.updated.timestamp():.6f}')
+
+
+def get_not_modified_response(request, etag: str, last_modified: int):
+    '''Возвращает ответ 304, если данные у клиента не изменились.'''
+
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+
+def set_conditional_headers(response, etag: str, last_modified: int):
+    '''Добавляет к ответу заголовки ETag и Last-Modified.'''
+
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def get_cached_list(version: str, url: str):
+    return cache.get(get_list_cache_key(version, url))
+
+
+def set_cached_list(version: str, url: str, data):
+    cache.set(
+        get_list_cache_key(version, url),
+        data,
+        timeout=settings.FILES_CACHE_TIMEOUT,
+    )
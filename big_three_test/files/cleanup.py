@@ -0,0 +1,103 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from files import thumbnails
+from files.models import Blob, File
+
+logger = logging.getLogger('files')
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    '''Возвращает пул потоков для фоновых операций удаления.'''
+
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f'files-{name}'
+            )
+        return _executors[name]
+
+
+def remove_stored_file(name: str):
+    '''Удаляет файл из хранилища.'''
+
+    storage = Blob._meta.get_field('file').storage
+    try:
+        storage.delete(name)
+    except Exception as error:
+        logger.error(f'Не удалось удалить файл {name}: {error}')
+
+
+def remove_stored_files(names):
+    '''Удаляет файлы из хранилища параллельно в фоновых потоках.'''
+
+    executor = get_executor('unlink', settings.FILES_DELETE_WORKERS)
+    for name in names:
+        if name:
+            executor.submit(remove_stored_file, name)
+
+
+def remove_derivatives(file_ids):
+    '''Удаляет производные изображения файлов в фоновых потоках.'''
+
+    executor = get_executor('unlink', settings.FILES_DELETE_WORKERS)
+    for file_id in file_ids:
+        executor.submit(thumbnails.invalidate, file_id)
+
+
+def delete_in_batches(queryset, batch_size: int = None) -> int:
+    '''Удаляет объекты выборки пакетами, каждый в своей транзакции.
+
+    Файлы удаляются из хранилища обработчиком сигнала post_delete
+    в фоновых потоках после фиксации транзакции пакета.
+    '''
+
+    batch_size = batch_size or settings.FILES_DELETE_BATCH_SIZE
+    deleted = 0
+    while True:
+        ids = list(
+            queryset.order_by().values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            _, per_model = File.objects.filter(pk__in=ids).delete()
+        deleted += per_model.get(File._meta.label, 0)
+    return deleted
+
+
+def _delete_in_background(queryset, batch_size: int = None):
+    try:
+        deleted = delete_in_batches(queryset, batch_size)
+        logger.info(f'Удалено файлов: {deleted}')
+    except Exception:
+        logger.exception('Ошибка при пакетном удалении файлов')
+    finally:
+        # Поток пула не обрабатывает запросы, поэтому соединение
+        # с БД закрывается явно
+        connection.close()
+
+
+def delete_in_background(queryset, batch_size: int = None):
+    '''Запускает пакетное удаление объектов выборки в фоновом потоке.'''
+
+    executor = get_executor('delete', 1)
+    return executor.submit(_delete_in_background, queryset, batch_size)
+
+
+def get_expired_files(days: int = None):
+    '''Возвращает файлы, срок хранения которых истек.'''
+
+    days = settings.FILES_RETENTION_DAYS if days is None else days
+    return File.objects.filter(
+        created__lt=timezone.now() - timedelta(days=days)
+    )
@@ -1,9 +1,10 @@
 import base64
-from datetime import datetime
 
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from big_three_test.utils import generate_file_name
+
 
 class BinnaryImageField(serializers.FileField):
     '''Поле для обработки данных файла, переданных в кодировке Base64.'''
@@ -12,9 +13,8 @@ class BinnaryImageField(serializers.FileField):
         if isinstance(data, str) and data.startswith('data:'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-            now = datetime.now()
             data = ContentFile(
                 base64.b64decode(imgstr),
-                name=now.strftime('%d_%m_%Y__%H_%M_%S.') + ext
+                name=generate_file_name(ext)
             )
         return super().to_internal_value(data)
@@ -10,7 +10,15 @@ class FileFilter(filters.FilterSet):
     created_before = filters.DateTimeFilter(
         field_name='created', lookup_expr='lte'
     )
+    size_min = filters.NumberFilter(field_name='size', lookup_expr='gte')
+    size_max = filters.NumberFilter(field_name='size', lookup_expr='lte')
 
     class Meta:
         model = File
-        fields = ['created_after', 'created_before']
+        fields = [
+            'created_after',
+            'created_before',
+            'size_min',
+            'size_max',
+            'file_type',
+        ]
@@ -0,0 +1,83 @@
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from big_three_test.benchmarks import write_results
+from files import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время создания, получения и фильтрации файлов через API '
+        'на таблицах разного размера. Замеры выполняются в отдельной '
+        'тестовой БД, результаты сохраняются в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10_000, 100_000, 1_000_000],
+            help='Количество строк в таблице файлов.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Количество запросов для каждой операции.',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Не удалять тестовую БД после замеров.',
+        )
+        parser.add_argument(
+            '--noinput',
+            '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Удалять существующую тестовую БД без подтверждения.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл результатов в формате JSON.',
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=not options['interactive'],
+            keepdb=options['keepdb'],
+        )
+        try:
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(
+                    MEDIA_ROOT=media_root,
+                    FILES_CACHE_TIMEOUT=0,
+                    ALLOWED_HOSTS=['testserver'],
+                ):
+                    results = benchmarks.run(
+                        options['rows'], requests=options['requests']
+                    )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+        params = {'rows': options['rows'], 'requests': options['requests']}
+        report = write_results('files', params, results, options['output'])
+        if not options['output']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        for result in results:
+            for name, stats in result['operations'].items():
+                self.stdout.write(
+                    f'{result["rows"]} строк, {name}: '
+                    f'p50 {stats["p50_ms"]} мс, p95 {stats["p95_ms"]} мс, '
+                    f'запросов к БД {stats["queries"]}'
+                )
+        self.stdout.write(f'Результаты сохранены в {options["output"]}')
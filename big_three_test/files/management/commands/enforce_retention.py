@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from files.cleanup import delete_in_batches, get_expired_files
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы старше срока хранения FILES_RETENTION_DAYS. '
+        'Предназначена для периодического запуска (cron, systemd timer) '
+        'или работы в цикле с параметром --interval.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.FILES_RETENTION_DAYS,
+            help='Срок хранения файлов в днях.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.FILES_DELETE_BATCH_SIZE,
+            help='Количество объектов, удаляемых в одной транзакции.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Интервал повторного запуска в секундах (0 - однократно).',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days <= 0:
+            raise CommandError(
+                'Срок хранения не задан: укажите --days или '
+                'FILES_RETENTION_DAYS.'
+            )
+        while True:
+            deleted = delete_in_batches(
+                get_expired_files(days), options['batch_size']
+            )
+            self.stdout.write(f'Удалено файлов старше {days} дн.: {deleted}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
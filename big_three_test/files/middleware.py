@@ -0,0 +1,50 @@
+import time
+
+from django.db import connection
+
+from big_three_test.metrics import Histogram
+
+REQUEST_SECONDS = Histogram(
+    'files_request_seconds',
+    'Длительность обработки запросов к API файлов.',
+    labels=('view', 'method', 'status'),
+)
+REQUEST_QUERIES = Histogram(
+    'files_request_db_queries',
+    'Количество запросов к БД при обработке запроса к API файлов.',
+    labels=('view', 'method'),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+
+class MetricsMiddleware:
+    '''Собирает длительность и количество запросов к БД для запросов
+    к API файлов.'''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start_time = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start_time
+        match = request.resolver_match
+        if match is not None and match.app_name == 'files':
+            REQUEST_SECONDS.observe(
+                duration,
+                view=match.view_name,
+                method=request.method,
+                status=response.status_code,
+            )
+            REQUEST_QUERIES.observe(
+                queries, view=match.view_name, method=request.method
+            )
+        return response
@@ -0,0 +1,87 @@
+import re
+
+from django.db import migrations, models
+
+SIZE_PATTERN = re.compile(r'^\s*([\d.,]+)\s*([KMGT]?B)?\s*$', re.IGNORECASE)
+# Ранее размер сохранялся в десятичных мегабайтах ("12.34 MB")
+UNITS = {
+    'B': 1,
+    'KB': 1_000,
+    'MB': 1_000_000,
+    'GB': 1_000_000_000,
+    'TB': 1_000_000_000_000,
+}
+
+
+def parse_size(value):
+    match = SIZE_PATTERN.match(value or '')
+    if not match:
+        return 0
+    number, unit = match.groups()
+    try:
+        number = float(number.replace(',', '.'))
+    except ValueError:
+        return 0
+    return round(number * UNITS[(unit or 'B').upper()])
+
+
+def format_size(value):
+    return f'{value / UNITS["MB"]:.2f} MB'
+
+
+def convert_size_to_bytes(apps, schema_editor):
+    File = apps.get_model('files', 'File')
+    batch = []
+    for obj in File.objects.only('size_text').iterator(chunk_size=2000):
+        obj.size = parse_size(obj.size_text)
+        batch.append(obj)
+        if len(batch) >= 2000:
+            File.objects.bulk_update(batch, ['size'])
+            batch = []
+    File.objects.bulk_update(batch, ['size'])
+
+
+def convert_size_to_string(apps, schema_editor):
+    File = apps.get_model('files', 'File')
+    batch = []
+    for obj in File.objects.only('size').iterator(chunk_size=2000):
+        obj.size_text = format_size(obj.size)
+        batch.append(obj)
+        if len(batch) >= 2000:
+            File.objects.bulk_update(batch, ['size_text'])
+            batch = []
+    File.objects.bulk_update(batch, ['size_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0003_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='file',
+            old_name='size',
+            new_name='size_text',
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='size_text',
+            field=models.CharField(
+                default='', max_length=50, verbose_name='Размер файла'
+            ),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='size',
+            field=models.BigIntegerField(
+                default=0, verbose_name='Размер файла, байт'
+            ),
+        ),
+        migrations.RunPython(convert_size_to_bytes, convert_size_to_string),
+        migrations.RemoveField(
+            model_name='file',
+            name='size_text',
+        ),
+    ]
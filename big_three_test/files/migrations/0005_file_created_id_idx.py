@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0004_file_size_bytes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='file',
+            options={'ordering': ['-created', '-id'], 'verbose_name': 'Файл', 'verbose_name_plural': 'Файлы'},
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['-created', '-id'], name='file_created_id_idx'),
+        ),
+    ]
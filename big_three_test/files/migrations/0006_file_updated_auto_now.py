@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0005_file_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='file',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0007_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Размер файла'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0008_chunkedupload_size'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['size', 'id'], name='file_size_id_idx'),
+        ),
+    ]
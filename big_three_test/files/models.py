@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 
 from big_three_test.utils import generate_upload_path
 
@@ -13,23 +16,139 @@ class File(models.Model):
         max_length=50,
         verbose_name='Тип файла',
     )
-    size = models.CharField(
-        max_length=50,
-        verbose_name='Размер файла',
+    size = models.BigIntegerField(
+        default=0,
+        verbose_name='Размер файла, байт',
+    )
+    checksum = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        verbose_name='Контрольная сумма SHA-256',
     )
     created = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания',
     )
     updated = models.DateTimeField(
-        auto_now_add=True,
+        auto_now=True,
         verbose_name='Дата изменения',
     )
 
     class Meta:
         verbose_name = 'Файл'
         verbose_name_plural = 'Файлы'
-        ordering = ['-created']
+        ordering = ['-created', '-id']
+        indexes = [
+            models.Index(
+                fields=['-created', '-id'],
+                name='file_created_id_idx',
+            ),
+            # Для пагинации списка, отсортированного по размеру
+            models.Index(
+                fields=['size', 'id'],
+                name='file_size_id_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.created.strftime('%d_%m_%Y__%H_%M_%S')
+
+
+class Blob(models.Model):
+    '''Модель, содержащая данные о содержимом файла в хранилище.
+
+    Одинаковое содержимое хранится один раз, а количество ссылающихся
+    на него объектов File учитывается в поле references.
+    '''
+
+    checksum = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Контрольная сумма SHA-256',
+    )
+    file = models.FileField(
+        max_length=255,
+        verbose_name='Файл',
+    )
+    size = models.BigIntegerField(
+        verbose_name='Размер файла, байт',
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество ссылок',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+
+    class Meta:
+        verbose_name = 'Содержимое файла'
+        verbose_name_plural = 'Содержимое файлов'
+
+    def __str__(self) -> str:
+        return f'{self.checksum} ({self.references})'
+
+
+class ListVersion(models.Model):
+    '''Модель, содержащая версию данных списка файлов.
+
+    Таблица содержит одну строку, которая обновляется при каждом
+    изменении объектов File в любом процессе приложения.
+    '''
+
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия',
+    )
+    modified = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Версия списка файлов'
+        verbose_name_plural = 'Версии списка файлов'
+
+    def __str__(self) -> str:
+        return str(self.version)
+
+
+class ChunkedUpload(models.Model):
+    '''Модель, содержащая данные о загрузке файла по частям.'''
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+    )
+    filename = models.CharField(
+        max_length=255,
+        verbose_name='Имя файла',
+    )
+    offset = models.BigIntegerField(
+        default=0,
+        verbose_name='Количество загруженных байт',
+    )
+    size = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Размер файла',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Загрузка по частям'
+        verbose_name_plural = 'Загрузки по частям'
+        ordering = ['-created']
+
+    def __str__(self) -> str:
+        return f'{self.filename} ({self.offset} B)'
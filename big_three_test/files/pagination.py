@@ -0,0 +1,32 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FileCursorPagination(CursorPagination):
+    '''Пагинация списка файлов по курсору.
+
+    В отличие от постраничной пагинации не выполняет COUNT(*): курсор
+    хранит значение первого поля сортировки последнего объекта
+    страницы, и следующая страница выбирается по индексу начиная с
+    этого значения. Объекты с тем же значением пропускаются через
+    OFFSET, равный их количеству на предыдущих страницах, поэтому при
+    сортировке по умолчанию (created почти уникально) стоимость
+    запроса не зависит от номера страницы, а при сортировке по size
+    растет с количеством файлов одного размера.
+    '''
+
+    ordering = ('-created', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        '''Дополняет сортировку идентификатором объекта.
+
+        Значения сортировки (например, size) могут совпадать у многих
+        объектов: без однозначного порядка среди них курсор пропускал
+        бы или повторял объекты на соседних страницах.
+        '''
+
+        ordering = super().get_ordering(request, queryset, view)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
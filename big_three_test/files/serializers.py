@@ -1,10 +1,10 @@
-import mimetypes
-import os
-
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
 
+from files import services, thumbnails
 from files.fields import BinnaryImageField
-from files.models import File
+from files.models import ChunkedUpload, File
 
 
 class FileSerializer(serializers.ModelSerializer):
@@ -13,15 +13,39 @@ class FileSerializer(serializers.ModelSerializer):
 
     file = BinnaryImageField()
     file_type = serializers.CharField(required=False)
-    size = serializers.CharField(required=False)
+    size = serializers.IntegerField(required=False, min_value=0)
     created = serializers.DateTimeField(read_only=True)
     updated = serializers.DateTimeField(read_only=True)
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = File
         fields = '__all__'
 
+    def get_thumbnails(self, obj):
+        '''Возвращает ссылки на уменьшенные копии изображения
+        в формате {размер: {формат: ссылка}}.'''
+
+        if obj.file_type != 'image':
+            return None
+        url = reverse('files:file-thumbnail', args=(obj.pk,))
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return {
+            size: {
+                image_format: (
+                    f'{url}?size={size}&image_format={image_format}'
+                )
+                for image_format in thumbnails.FORMATS
+            }
+            for size in settings.THUMBNAIL_SIZES
+        }
+
     def create(self, validated_data):
+        return services.create_file(**self.complete_data(validated_data))
+
+    def complete_data(self, validated_data):
         file = validated_data.get('file')
         file_type = validated_data.get('file_type')
         size = validated_data.get('size')
@@ -32,25 +56,47 @@ class FileSerializer(serializers.ModelSerializer):
                 validated_data['file_type'] = self.get_file_type(file)
             if not size:
                 validated_data['size'] = self.get_file_size(file)
-        return super().create(validated_data)
+        return validated_data
 
     def get_file_type(self, file):
-        # Допустимые типы принимаемых файлов
-        allowed_types = ['image', 'video']
-
-        file_type, _ = mimetypes.guess_type(file.name)
-        # file_type возвращается в формате "type/extension"
         try:
-            file_type = file_type.split('/')[0]
-        except AttributeError:
-            raise serializers.ValidationError(
-                'Поле "Тип файла" содержит недопустимое значение.'
-            )
-        return file_type if file_type in allowed_types else None
+            file_type = services.get_file_type(file)
+        except services.InvalidFileType as error:
+            raise serializers.ValidationError(str(error))
+        # Файлы, не являющиеся изображениями или видео, не принимаются
+        if file_type is None:
+            raise serializers.ValidationError({'file_type': [
+                'Допустимые типы файлов: '
+                f'{", ".join(services.ALLOWED_FILE_TYPES)}.'
+            ]})
+        return file_type
 
     def get_file_size(self, file):
-        # переменная для дальнейшей конвертации полученного размера в MB
-        m_bytes = 1_000_000
+        return services.get_file_size(file)
+
+
+class FileStatsSerializer(serializers.Serializer):
+    '''Сериализатор для статистики использования хранилища.'''
+
+    day = serializers.DateTimeField()
+    file_type = serializers.CharField()
+    total_size = serializers.IntegerField()
+    count = serializers.IntegerField()
 
-        file.seek(0, os.SEEK_END)
-        return f'{(file.size)/m_bytes:.2f} MB'
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    '''Сериализатор для создания и получения загрузок по частям.'''
+
+    class Meta:
+        model = ChunkedUpload
+        fields = ('id', 'filename', 'offset', 'size', 'created', 'updated')
+        read_only_fields = ('offset', 'size')
+
+    def validate_filename(self, value):
+        return value.split('/')[-1].split('\\')[-1]
+
+    def create(self, validated_data):
+        try:
+            return services.start_chunked_upload(validated_data['filename'])
+        except services.InvalidFileType as error:
+            raise serializers.ValidationError({'filename': str(error)})
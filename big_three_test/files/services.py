@@ -0,0 +1,409 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File as DjangoFile
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from big_three_test.utils import generate_blob_path, generate_file_name
+from files.cache import bump_version
+from files.cleanup import remove_stored_files
+from files.models import Blob, ChunkedUpload, File
+
+logger = logging.getLogger('files')
+
+# Допустимые типы принимаемых файлов
+ALLOWED_FILE_TYPES = ('image', 'video')
+
+
+class InvalidFileType(ValueError):
+    '''Исключение при невозможности определить тип файла.'''
+
+
+class UploadOffsetMismatch(ValueError):
+    '''Исключение при передаче части файла с неожиданным смещением.'''
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        super().__init__(
+            f'Ожидается часть файла, начинающаяся с байта {expected}.'
+        )
+
+
+class InvalidChunk(ValueError):
+    '''Исключение при передаче части файла, не соответствующей
+    заявленному диапазону или размеру файла.'''
+
+
+def get_file_type(file):
+    '''Возвращает тип файла ("image" или "video") по его имени.'''
+
+    file_type, _ = mimetypes.guess_type(file.name)
+    # file_type возвращается в формате "type/extension"
+    try:
+        file_type = file_type.split('/')[0]
+    except AttributeError:
+        raise InvalidFileType(
+            'Поле "Тип файла" содержит недопустимое значение.'
+        )
+    return file_type if file_type in ALLOWED_FILE_TYPES else None
+
+
+def get_file_size(file) -> int:
+    '''Возвращает размер файла в байтах.'''
+
+    # Размер загруженного файла известен заранее, поэтому файл
+    # не перечитывается
+    return file.size
+
+
+def get_checksum(file) -> str:
+    '''Возвращает контрольную сумму SHA-256 содержимого файла.'''
+
+    # Для файлов, загруженных через API, сумма вычислена обработчиком
+    # загрузки при получении данных
+    checksum = getattr(file, 'sha256', None)
+    if checksum:
+        return checksum
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_extension(file) -> str:
+    return os.path.splitext(file.name)[1].lstrip('.').lower() or 'bin'
+
+
+def save_blob_content(checksum: str, file) -> str:
+    '''Записывает содержимое файла в хранилище по контрольной сумме.'''
+
+    storage = Blob._meta.get_field('file').storage
+    return storage.save(
+        generate_blob_path(checksum, get_extension(file)), file
+    )
+
+
+def acquire_blob(
+    checksum: str, file, references: int = 1, name: str = None
+) -> Blob:
+    '''Возвращает объект содержимого файла, увеличивая счетчик ссылок
+    на references.
+
+    Если такое содержимое уже сохранено, файл повторно не записывается.
+    name - имя уже записанного в хранилище содержимого, если запись
+    выполнена заранее. Должна вызываться внутри транзакции.
+    '''
+
+    blob = Blob.objects.select_for_update().filter(checksum=checksum).first()
+    if blob is not None:
+        Blob.objects.filter(pk=blob.pk).update(
+            references=F('references') + references
+        )
+        # Имя зависит только от содержимого, поэтому в хранилищах без
+        # уникальных имен (S3) параллельные запросы записывают один и
+        # тот же объект: удалять его нельзя, на него ссылается blob
+        if name and name != blob.file.name:
+            remove_stored_files([name])
+        return blob
+    if name is None:
+        name = save_blob_content(checksum, file)
+    try:
+        with transaction.atomic():
+            return Blob.objects.create(
+                checksum=checksum,
+                file=name,
+                size=file.size,
+                references=references,
+            )
+    except IntegrityError:
+        # То же содержимое параллельно сохранено другим запросом
+        return acquire_blob(checksum, file, references, name)
+
+
+def release_blob(checksum: str):
+    '''Уменьшает счетчик ссылок на содержимое файла.
+
+    Возвращает имя файла в хранилище, если ссылок больше не осталось
+    и файл следует удалить, иначе None.
+    '''
+
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(
+            checksum=checksum
+        ).first()
+        if blob is None:
+            return None
+        if blob.references > 1:
+            Blob.objects.filter(pk=blob.pk).update(
+                references=F('references') - 1
+            )
+            return None
+        blob.delete()
+    return blob.file.name
+
+
+def create_file(file, file_type: str = None, size: int = None) -> File:
+    '''Записывает файл в хранилище и создает связанный объект БД.
+
+    Используется как API-сериализатором, так и модулем распознавания,
+    который сохраняет кадры без промежуточного HTTP-запроса.
+    Содержимое, уже имеющееся в хранилище, повторно не записывается.
+    '''
+
+    if not file_type:
+        file_type = get_file_type(file)
+    if not size:
+        size = get_file_size(file)
+    checksum = get_checksum(file)
+    with transaction.atomic():
+        blob = acquire_blob(checksum, file)
+        return File.objects.create(
+            file=blob.file.name,
+            file_type=file_type,
+            size=size,
+            checksum=checksum,
+        )
+
+
+def create_files_batch(items) -> list:
+    '''Создает несколько файлов за одну операцию.
+
+    Контрольные суммы вычисляются, а новое содержимое записывается
+    в хранилище параллельно, после чего объекты БД создаются запросами
+    bulk_create в единой транзакции.
+    items - список словарей с ключами file, file_type и size.
+    Возвращает список той же длины, содержащий для каждого файла
+    созданный объект File или исключение, помешавшее его сохранению.
+    '''
+
+    files = [item['file'] for item in items]
+    results = [None] * len(items)
+    checksums = [None] * len(items)
+    with ThreadPoolExecutor(
+        max_workers=settings.FILES_BATCH_WORKERS
+    ) as executor:
+        futures = [executor.submit(get_checksum, file) for file in files]
+        for index, future in enumerate(futures):
+            try:
+                checksums[index] = future.result()
+            except Exception as error:
+                logger.exception(f'Не удалось прочитать файл {index}')
+                results[index] = error
+        valid = [index for index, error in enumerate(results) if not error]
+        references = Counter(checksums[index] for index in valid)
+        names = {}
+        try:
+            with transaction.atomic():
+                blobs = {
+                    blob.checksum: blob
+                    for blob in Blob.objects.select_for_update().filter(
+                        checksum__in=references
+                    )
+                }
+                new_files = {}
+                for index in valid:
+                    if checksums[index] not in blobs:
+                        new_files.setdefault(checksums[index], files[index])
+                futures = {
+                    checksum: executor.submit(
+                        save_blob_content, checksum, file
+                    )
+                    for checksum, file in new_files.items()
+                }
+                # Результаты записи собираются по одному, чтобы при
+                # ошибке были известны все уже записанные файлы
+                for checksum, future in futures.items():
+                    try:
+                        names[checksum] = future.result()
+                    except Exception as error:
+                        logger.exception(
+                            f'Не удалось записать файл {checksum}'
+                        )
+                        for index in valid:
+                            if checksums[index] == checksum:
+                                results[index] = error
+                for checksum, blob in blobs.items():
+                    Blob.objects.filter(pk=blob.pk).update(
+                        references=F('references') + references[checksum]
+                    )
+                blobs.update(create_blobs(names, new_files, references))
+                created = [index for index in valid if not results[index]]
+                objs = File.objects.bulk_create([
+                    File(
+                        file=blobs[checksums[index]].file.name,
+                        file_type=items[index]['file_type'],
+                        size=items[index]['size'],
+                        checksum=checksums[index],
+                    )
+                    for index in created
+                ])
+                if objs:
+                    bump_version()
+        except Exception:
+            # Записанное содержимое, не ставшее объектами Blob,
+            # удаляется; объект хранилища с тем же именем может
+            # принадлежать параллельному запросу
+            remove_unused_files(names.values())
+            raise
+    for index, obj in zip(created, objs):
+        results[index] = obj
+    return results
+
+
+def remove_unused_files(names):
+    '''Удаляет из хранилища файлы, на которые не ссылаются объекты
+    Blob.'''
+
+    names = set(names)
+    if names:
+        names -= set(
+            Blob.objects.filter(file__in=names).values_list('file', flat=True)
+        )
+    remove_stored_files(names)
+
+
+def create_blobs(names: dict, files: dict, references: Counter) -> dict:
+    '''Создает объекты нового содержимого, записанного в хранилище.
+
+    names и files - имена записанных файлов и сами файлы по контрольным
+    суммам. Если часть содержимого параллельно сохранена другим
+    запросом, объекты получаются по одному через acquire_blob.
+    '''
+
+    try:
+        with transaction.atomic():
+            new_blobs = Blob.objects.bulk_create([
+                Blob(
+                    checksum=checksum,
+                    file=name,
+                    size=files[checksum].size,
+                    references=references[checksum],
+                )
+                for checksum, name in names.items()
+            ])
+    except IntegrityError:
+        return {
+            checksum: acquire_blob(
+                checksum, files[checksum], references[checksum], name
+            )
+            for checksum, name in names.items()
+        }
+    return {blob.checksum: blob for blob in new_blobs}
+
+
+def save_content(content: bytes, extension: str, **kwargs) -> File:
+    '''Сохраняет закодированное содержимое файла с указанным расширением.'''
+
+    return create_file(
+        ContentFile(content, name=generate_file_name(extension)), **kwargs
+    )
+
+
+def get_chunked_upload_path(upload: ChunkedUpload) -> Path:
+    '''Возвращает путь к временному файлу загрузки по частям.'''
+
+    return Path(settings.CHUNKED_UPLOAD_ROOT) / f'{upload.pk}.part'
+
+
+def start_chunked_upload(filename: str) -> ChunkedUpload:
+    '''Создает новую загрузку файла по частям.'''
+
+    # Тип файла проверяется до начала загрузки, чтобы не принимать
+    # заведомо недопустимые файлы
+    if get_file_type(DjangoFile(None, name=filename)) is None:
+        raise InvalidFileType(
+            'Поле "Тип файла" содержит недопустимое значение.'
+        )
+    upload = ChunkedUpload.objects.create(filename=filename)
+    path = get_chunked_upload_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def append_chunk(
+    upload_id, stream, offset: int = None, length: int = None,
+    size: int = None,
+) -> ChunkedUpload:
+    '''Дописывает часть файла из потока во временный файл загрузки.
+
+    Данные читаются из потока блоками FILE_UPLOAD_CHUNK_SIZE, поэтому
+    расход памяти не зависит от размера части. Часть сначала целиком
+    принимается во временный файл, а строка загрузки блокируется
+    только на время дописывания, чтобы медленный клиент не удерживал
+    блокировку. length - ожидаемый размер части, size - заявленный
+    размер файла из заголовка Content-Range.
+    '''
+
+    with tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    ) as chunk:
+        for data in iter(
+            lambda: stream.read(settings.FILE_UPLOAD_CHUNK_SIZE), b''
+        ):
+            chunk.write(data)
+        received = chunk.tell()
+        if length is not None and received != length:
+            raise InvalidChunk(
+                f'Получено {received} байт вместо {length}, указанных '
+                'в заголовке Content-Range.'
+            )
+        chunk.seek(0)
+        with transaction.atomic():
+            upload = (
+                ChunkedUpload.objects.select_for_update().get(pk=upload_id)
+            )
+            if offset is not None and offset != upload.offset:
+                raise UploadOffsetMismatch(upload.offset)
+            if size is not None:
+                if upload.size is not None and upload.size != size:
+                    raise InvalidChunk(
+                        'Размер файла не совпадает с указанным ранее '
+                        f'({upload.size}).'
+                    )
+                upload.size = size
+            if (
+                upload.size is not None
+                and upload.offset + received > upload.size
+            ):
+                raise InvalidChunk(
+                    f'Часть файла выходит за его размер ({upload.size}).'
+                )
+            path = get_chunked_upload_path(upload)
+            with open(path, 'r+b') as file:
+                # Недописанный остаток прерванной части отбрасывается
+                file.truncate(upload.offset)
+                file.seek(upload.offset)
+                shutil.copyfileobj(
+                    chunk, file, settings.FILE_UPLOAD_CHUNK_SIZE
+                )
+                upload.offset = file.tell()
+            upload.save(update_fields=['offset', 'size', 'updated'])
+    return upload
+
+
+def complete_chunked_upload(upload_id) -> File:
+    '''Завершает загрузку по частям и создает объект файла.'''
+
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().get(pk=upload_id)
+        if upload.size is not None and upload.offset != upload.size:
+            raise InvalidChunk(
+                f'Загружено {upload.offset} байт из {upload.size}.'
+            )
+        path = get_chunked_upload_path(upload)
+        with open(path, 'rb') as content:
+            obj = create_file(DjangoFile(content, name=upload.filename))
+        upload.delete()
+    os.remove(path)
+    return obj
@@ -1,15 +1,26 @@
-import os
+from functools import partial
 
-from django.conf import settings
+from django.db import transaction
+
+from files.cleanup import remove_derivatives, remove_stored_files
+from files.services import release_blob
 
 
 def delete_file(sender, **kwargs):
-    '''Метод для удаления файла, связанного с удаленным объектом БД.'''
+    '''Метод для удаления файла, связанного с удаленным объектом БД.
+
+    Файл и его уменьшенные копии удаляются в фоновом потоке после
+    фиксации транзакции, чтобы не задерживать запрос и не удалять
+    файл при ее откате.
+    '''
 
     instance = kwargs.get('instance')
     if not instance:
         return
-    file_instance = instance.file
-    file_path = os.path.join(settings.MEDIA_ROOT, file_instance.name)
-    if os.path.exists(file_path):
-        return os.remove(file_path)
+    file_name = instance.file.name
+    # Содержимое, на которое ссылаются другие объекты, не удаляется
+    if instance.checksum:
+        file_name = release_blob(instance.checksum)
+    if file_name:
+        transaction.on_commit(partial(remove_stored_files, [file_name]))
+    transaction.on_commit(partial(remove_derivatives, [instance.pk]))
@@ -0,0 +1,139 @@
+import mimetypes
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File as DjangoFile
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+
+def get_s3_client(endpoint_url: str = None, region: str = None):
+    '''Создает клиент S3-совместимого хранилища.
+
+    boto3 импортируется только при использовании хранилища S3,
+    поэтому не требуется для локального хранилища.
+    '''
+
+    try:
+        import boto3
+    except ImportError:
+        raise ImproperlyConfigured(
+            'Для хранилища S3 необходимо установить пакет boto3.'
+        )
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        region_name=region,
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+    )
+
+
+@deconstructible
+class S3Storage(Storage):
+    '''Хранилище файлов в S3-совместимом объектном хранилище.
+
+    Имена файлов используются как ключи объектов (с префиксом prefix).
+    Клиент (boto3 или совместимый с ним) может быть передан явно,
+    иначе создается при первом обращении к хранилищу.
+    '''
+
+    def __init__(
+        self,
+        bucket: str = None,
+        prefix: str = None,
+        endpoint_url: str = None,
+        region: str = None,
+        public_url: str = None,
+        url_expire: int = None,
+        client=None,
+    ):
+        self.bucket = bucket or settings.S3_BUCKET
+        if not self.bucket:
+            raise ImproperlyConfigured(
+                'Не задано имя корзины хранилища S3 (S3_BUCKET).'
+            )
+        self.prefix = (
+            settings.S3_PREFIX if prefix is None else prefix
+        ).strip('/')
+        self.endpoint_url = endpoint_url or settings.S3_ENDPOINT_URL
+        self.region = region or settings.S3_REGION
+        # Если адрес публичного доступа не задан, ссылки на файлы
+        # подписываются и действуют url_expire секунд
+        self.public_url = (public_url or settings.S3_PUBLIC_URL).rstrip('/')
+        self.url_expire = url_expire or settings.S3_URL_EXPIRE
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_s3_client(self.endpoint_url, self.region)
+        return self._client
+
+    def get_key(self, name: str) -> str:
+        name = name.replace('\\', '/')
+        return posixpath.join(self.prefix, name) if self.prefix else name
+
+    def _save(self, name: str, content) -> str:
+        content_type, _ = mimetypes.guess_type(name)
+        content.seek(0)
+        # Содержимое передается потоком, большие файлы загружаются
+        # по частям
+        self.client.upload_fileobj(
+            content,
+            self.bucket,
+            self.get_key(name),
+            ExtraArgs={
+                'ContentType': content_type or 'application/octet-stream'
+            },
+        )
+        return name
+
+    def _open(self, name: str, mode: str = 'rb'):
+        if 'w' in mode:
+            raise ValueError('Хранилище S3 не поддерживает запись в файл.')
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self.get_key(name)
+        )
+        # Содержимое копируется во временный файл, который хранится
+        # в памяти, пока его размер не превышает FILE_UPLOAD_MAX_MEMORY_SIZE
+        content = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        for chunk in iter(
+            lambda: response['Body'].read(settings.FILE_UPLOAD_CHUNK_SIZE),
+            b'',
+        ):
+            content.write(chunk)
+        content.seek(0)
+        return DjangoFile(content, name=name)
+
+    def delete(self, name: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.get_key(name))
+
+    def exists(self, name: str) -> bool:
+        key = self.get_key(name)
+        response = self.client.list_objects_v2(
+            Bucket=self.bucket, Prefix=key, MaxKeys=1
+        )
+        return any(
+            item['Key'] == key for item in response.get('Contents', ())
+        )
+
+    def size(self, name: str) -> int:
+        response = self.client.head_object(
+            Bucket=self.bucket, Key=self.get_key(name)
+        )
+        return response['ContentLength']
+
+    def url(self, name: str) -> str:
+        key = self.get_key(name)
+        if self.public_url:
+            return f'{self.public_url}/{key}'
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': key},
+            ExpiresIn=self.url_expire,
+        )
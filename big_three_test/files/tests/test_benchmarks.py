@@ -0,0 +1,36 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from big_three_test.benchmarks import summarize
+from files import benchmarks
+from files.models import File
+
+
+class BenchmarkTests(TestCase):
+    '''Класс для тестирования замеров производительности API файлов.'''
+
+    def test_summarize(self):
+        stats = summarize([0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['mean_ms'], 250)
+        self.assertEqual(stats['max_ms'], 400)
+        self.assertEqual(stats['per_second'], 4)
+
+    def test_run(self):
+        '''Замеры выполняются для каждого размера таблицы.'''
+
+        with tempfile.TemporaryDirectory() as media_root:
+            with override_settings(
+                MEDIA_ROOT=media_root, FILES_CACHE_TIMEOUT=0
+            ):
+                results = benchmarks.run([5, 12], requests=2)
+
+        self.assertEqual([result['rows'] for result in results], [5, 12])
+        operations = results[-1]['operations']
+        self.assertIn('filter_created', operations)
+        self.assertEqual(operations['list']['count'], 2)
+        # Версия данных списка и страница списка
+        self.assertEqual(operations['list']['queries'], 2)
+        # Созданные при замере файлы учитываются при заполнении таблицы
+        self.assertEqual(File.objects.count(), 14)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from files.cleanup import delete_in_batches
+from files.models import File
+
+
+class FileCleanupTests(TestCase):
+    '''Класс для тестирования пакетного удаления файлов.'''
+
+    def setUp(self) -> None:
+        self.client = Client()
+        for index in range(5):
+            File.objects.create(
+                file=f'url/to/file_{index}', file_type='image', size=100
+            )
+        # Два объекта старше 30 дней
+        File.objects.filter(
+            pk__in=File.objects.values_list('pk', flat=True)[:2]
+        ).update(created=timezone.now() - timedelta(days=31))
+
+    @mock.patch('files.signals.remove_stored_files')
+    def test_delete_in_batches(self, remove_stored_files):
+        '''Объекты удаляются пакетами, файлы - после фиксации транзакции.'''
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted = delete_in_batches(File.objects.all(), batch_size=2)
+        self.assertEqual(deleted, 5)
+        self.assertFalse(File.objects.exists())
+        self.assertEqual(remove_stored_files.call_count, 5)
+
+    @mock.patch('files.views.cleanup.delete_in_background')
+    def test_bulk_delete_endpoint(self, delete_in_background):
+        '''Пакетное удаление по параметрам фильтрации.'''
+
+        created_before = timezone.now() - timedelta(days=30)
+        response = self.client.delete(
+            reverse('files:file-bulk-delete')
+            + f'?created_before={created_before:%Y-%m-%dT%H:%M:%S}'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.ACCEPTED)
+        self.assertEqual(response.data.get('count'), 2)
+        delete_in_background.assert_called_once()
+
+    def test_bulk_delete_without_filters(self):
+        '''Пакетное удаление без параметров фильтрации запрещено.'''
+
+        response = self.client.delete(reverse('files:file-bulk-delete'))
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(File.objects.count(), 5)
+
+    def test_bulk_delete_with_empty_filters(self):
+        '''Пустые или неверные значения параметров фильтрации не
+        приводят к удалению всех файлов.'''
+
+        for query in (
+            '?created_before=',
+            '?file_type=&size_min=',
+            '?created_before=yesterday',
+        ):
+            with self.subTest(query=query):
+                response = self.client.delete(
+                    reverse('files:file-bulk-delete') + query
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+        self.assertEqual(File.objects.count(), 5)
+
+    def test_enforce_retention(self):
+        '''Удаление файлов старше срока хранения.'''
+
+        call_command('enforce_retention', days=30, stdout=StringIO())
+        self.assertEqual(File.objects.count(), 3)
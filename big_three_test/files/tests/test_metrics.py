@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from big_three_test.metrics import Counter, Histogram, Registry
+from files.middleware import REQUEST_QUERIES, REQUEST_SECONDS
+from files.models import File
+
+
+class MetricsTests(TestCase):
+    '''Класс для тестирования метрик API файлов.'''
+
+    def setUp(self):
+        cache.clear()
+        REQUEST_SECONDS.clear()
+        REQUEST_QUERIES.clear()
+
+    def test_render_prometheus_text(self):
+        '''Метрики выводятся в текстовом формате Prometheus.'''
+
+        registry = Registry()
+        counter = Counter(
+            'test_total', 'Счетчик.', labels=('name',), registry=registry
+        )
+        histogram = Histogram(
+            'test_seconds',
+            'Длительность.',
+            buckets=(0.1, 1),
+            registry=registry,
+        )
+        counter.inc(name='a"b')
+        histogram.observe(0.5)
+        histogram.observe(2)
+
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE test_total counter', lines)
+        self.assertIn('test_total{name="a\\"b"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="0.1"} 0', lines)
+        self.assertIn('test_seconds_bucket{le="1"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertIn('test_seconds_count 2', lines)
+
+    def test_files_request_metrics(self):
+        '''Для запросов к API файлов учитываются длительность
+        и количество запросов к БД.'''
+
+        File.objects.create(file='url/to/file', file_type='image', size=1)
+        self.client.get(reverse('files:file-list'))
+        self.client.get(reverse('vision:index'))
+
+        labels = {'view': 'files:file-list', 'method': 'GET'}
+        self.assertEqual(
+            REQUEST_SECONDS.get_count(status=200, **labels), 1
+        )
+        self.assertEqual(REQUEST_QUERIES.get_count(**labels), 1)
+        response = self.client.get(reverse('metrics'))
+        self.assertContains(
+            response,
+            'files_request_db_queries_bucket{view="files:file-list",'
+            'method="GET",le="2"} 1',
+        )
@@ -0,0 +1,130 @@
+import shutil
+import tempfile
+from concurrent.futures import Future
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from files import services
+from files.models import Blob, File
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class ImmediateExecutor:
+    '''Пул, выполняющий задачи в вызывающем потоке (и соединении
+    с БД тестовой транзакции).'''
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class FileServicesTests(TestCase):
+    '''Класс для тестирования сервиса сохранения медиа-файлов.'''
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_save_content(self):
+        '''Содержимое сохраняется в хранилище вместе с объектом БД.'''
+
+        content = b'\xff\xd8\xff\xe0' + b'0' * 1000
+        obj = services.save_content(content, 'jpg')
+        self.assertEqual(File.objects.count(), 1)
+        self.assertEqual(obj.file_type, 'image')
+        with obj.file.open('rb') as file:
+            self.assertEqual(file.read(), content)
+
+    def test_invalid_file_type(self):
+        '''Файл с неизвестным расширением не сохраняется.'''
+
+        with self.assertRaises(services.InvalidFileType):
+            services.save_content(b'content', 'smth')
+        self.assertFalse(File.objects.exists())
+
+    @mock.patch('files.signals.remove_stored_files')
+    def test_deduplication(self, remove_stored_files):
+        '''Одинаковое содержимое хранится один раз и удаляется
+        вместе с последним ссылающимся на него объектом.'''
+
+        content = b'\xff\xd8\xff\xe0' + b'1' * 1000
+        first = services.save_content(content, 'jpg')
+        second = services.save_content(content, 'jpg')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(Blob.objects.get().references, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(Blob.objects.get().references, 1)
+        remove_stored_files.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.exists())
+        remove_stored_files.assert_called_once_with([second.file.name])
+
+    def test_batch_deduplication(self):
+        '''Пакетная загрузка учитывает уже сохраненное содержимое.'''
+
+        content = b'\xff\xd8\xff\xe0' + b'2' * 1000
+        services.save_content(content, 'jpg')
+        objs = services.create_files_batch([
+            {
+                'file': ContentFile(content, name=f'frame_{index}.jpg'),
+                'file_type': 'image',
+                'size': len(content),
+            }
+            for index in range(3)
+        ])
+        self.assertEqual(len({obj.file.name for obj in objs}), 1)
+        self.assertEqual(Blob.objects.get().references, 4)
+
+    def test_batch_concurrent_blob(self):
+        '''Содержимое, параллельно сохраненное другим запросом,
+        используется пакетной загрузкой без ошибки.'''
+
+        content = b'\xff\xd8\xff\xe0' + b'3' * 1000
+        save_blob_content = services.save_blob_content
+
+        def save_concurrently(checksum, file):
+            # Параллельный запрос успевает создать Blob раньше
+            name = save_blob_content(checksum, file)
+            Blob.objects.create(
+                checksum=checksum,
+                file=save_blob_content(checksum, file),
+                size=file.size,
+                references=1,
+            )
+            return name
+
+        with mock.patch(
+            'files.services.save_blob_content', side_effect=save_concurrently
+        ), mock.patch('files.services.ThreadPoolExecutor', ImmediateExecutor):
+            [obj] = services.create_files_batch([{
+                'file': ContentFile(content, name='frame.jpg'),
+                'file_type': 'image',
+                'size': len(content),
+            }])
+        blob = Blob.objects.get()
+        self.assertEqual(blob.references, 2)
+        self.assertEqual(obj.file.name, blob.file.name)
+        with obj.file.open('rb') as file:
+            self.assertEqual(file.read(), content)
@@ -0,0 +1,137 @@
+import io
+import sys
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase
+
+from big_three_test.utils import generate_file_name, generate_upload_path
+from files import services
+from files.cleanup import remove_stored_file
+from files.models import Blob, File
+from files.storage import S3Storage
+
+
+class FakeS3Client:
+    '''Хранящий объекты в памяти заменитель клиента boto3.'''
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, content, bucket, key, ExtraArgs=None):
+        self.objects[(bucket, key)] = content.read()
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+        keys = sorted(
+            key for bucket, key in self.objects
+            if bucket == Bucket and key.startswith(Prefix)
+        )
+        return {'Contents': [{'Key': key} for key in keys[:MaxKeys]]}
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self.objects[(Bucket, Key)])}
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return f'https://s3.local/{Params["Bucket"]}/{Params["Key"]}?sig'
+
+
+class S3StorageTests(TestCase):
+    '''Класс для тестирования хранилища S3.'''
+
+    def setUp(self):
+        self.s3 = FakeS3Client()
+        storage = S3Storage(bucket='media', prefix='app', client=self.s3)
+        for model in (Blob, File):
+            patcher = mock.patch.object(
+                model._meta.get_field('file'), 'storage', storage
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_save_open_and_remove(self):
+        '''Файлы сохраняются, читаются и удаляются через хранилище.'''
+
+        content = b'\xff\xd8\xff\xe0' + b'0' * 1000
+        obj = services.save_content(content, 'jpg')
+        key = f'app/{obj.file.name}'
+        self.assertEqual(self.s3.objects, {('media', key): content})
+        self.assertTrue(obj.file.storage.exists(obj.file.name))
+        self.assertEqual(obj.file.size, len(content))
+        self.assertEqual(
+            obj.file.url, f'https://s3.local/media/{key}?sig'
+        )
+        with obj.file.open('rb') as file:
+            self.assertEqual(file.read(), content)
+
+        remove_stored_file(obj.file.name)
+        self.assertEqual(self.s3.objects, {})
+        self.assertFalse(obj.file.storage.exists(obj.file.name))
+
+    def test_concurrent_upload_keeps_object(self):
+        '''Запрос, проигравший гонку создания Blob, не удаляет объект
+        хранилища, на который ссылается Blob победившего запроса.'''
+
+        content = b'\xff\xd8\xff\xe0' + b'1' * 1000
+        save_blob_content = services.save_blob_content
+
+        def save_concurrently(checksum, file):
+            # Параллельный запрос записывает тот же объект и успевает
+            # создать Blob раньше
+            name = save_blob_content(checksum, file)
+            Blob.objects.create(
+                checksum=checksum, file=name, size=file.size, references=1
+            )
+            return name
+
+        with mock.patch(
+            'files.services.save_blob_content', side_effect=save_concurrently
+        ), mock.patch('files.services.remove_stored_files') as remove:
+            obj = services.save_content(content, 'jpg')
+        remove.assert_not_called()
+        self.assertEqual(Blob.objects.get().references, 2)
+        with obj.file.open('rb') as file:
+            self.assertEqual(file.read(), content)
+
+    def test_public_url(self):
+        storage = S3Storage(
+            bucket='media', public_url='https://cdn.local/', client=self.s3
+        )
+        self.assertEqual(
+            storage.url('file/1.jpg'), 'https://cdn.local/file/1.jpg'
+        )
+
+    def test_boto3_required(self):
+        '''Без boto3 клиент хранилища не создается.'''
+
+        storage = S3Storage(bucket='media')
+        with mock.patch.dict(sys.modules, {'boto3': None}):
+            with self.assertRaises(ImproperlyConfigured):
+                storage.exists('file/1.jpg')
+
+
+class UploadPathTests(SimpleTestCase):
+    '''Класс для тестирования путей файлов в хранилище.'''
+
+    def test_upload_path(self):
+        '''Файлы распределяются по датам и получают уникальные имена.'''
+
+        paths = {
+            generate_upload_path(File(), 'frame.JPG') for _ in range(2)
+        }
+        self.assertEqual(len(paths), 2)
+        for path in paths:
+            self.assertRegex(
+                path, r'^file/\d{4}/\d{2}/\d{2}/[0-9a-f]{32}\.jpg$'
+            )
+
+    def test_file_names_do_not_collide(self):
+        names = {generate_file_name('jpg') for _ in range(100)}
+        self.assertEqual(len(names), 100)
+        for name in names:
+            self.assertRegex(name, r'^\d{2}_\d{2}_\d{4}__\d{2}_\d{2}_\d{2}_')
@@ -0,0 +1,286 @@
+import io
+import shutil
+import tempfile
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from files import services, thumbnails
+from files.models import ChunkedUpload, File
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = b'\xff\xd8\xff\xe0' + bytes(range(256)) * 40
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    CHUNKED_UPLOAD_ROOT=f'{TEMP_MEDIA_ROOT}/chunked',
+    THUMBNAIL_CACHE_ROOT=f'{TEMP_MEDIA_ROOT}/thumbnails',
+    FILE_UPLOAD_CHUNK_SIZE=1024,
+)
+class FileUploadTests(TestCase):
+    '''Класс для тестирования потоковой загрузки файлов.'''
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        self.client = Client()
+
+    def assertStoredContent(self, obj_id):
+        with File.objects.get(pk=obj_id).file.open('rb') as file:
+            self.assertEqual(file.read(), CONTENT)
+
+    def test_multipart_upload(self):
+        '''Загрузка файла в формате multipart/form-data.'''
+
+        response = self.client.post(
+            reverse('files:file-list'),
+            data={'file': SimpleUploadedFile('frame.jpg', CONTENT)},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertStoredContent(response.data.get('id'))
+
+    def test_raw_upload(self):
+        '''Загрузка файла, переданного в теле запроса.'''
+
+        response = self.client.put(
+            reverse('files:file-upload', args=('frame.jpg',)),
+            data=CONTENT,
+            content_type='image/jpeg',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertStoredContent(response.data.get('id'))
+
+    def test_chunked_upload(self):
+        '''Загрузка файла по частям с повтором части.'''
+
+        response = self.client.post(
+            reverse('files:chunked-upload-list'),
+            data={'filename': 'clip.mp4'},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        upload_url = reverse(
+            'files:chunked-upload-detail', args=(response.data.get('id'),)
+        )
+        middle = len(CONTENT) // 2
+        total = len(CONTENT)
+        parts = (
+            (0, CONTENT[:middle], HTTPStatus.OK),
+            # Повторная отправка уже загруженной части отклоняется
+            (0, CONTENT[:middle], HTTPStatus.CONFLICT),
+            (middle, CONTENT[middle:], HTTPStatus.OK),
+        )
+        for start, chunk, expected_status in parts:
+            with self.subTest(start=start, expected_status=expected_status):
+                response = self.client.put(
+                    upload_url,
+                    data=chunk,
+                    content_type='application/octet-stream',
+                    headers={
+                        'Content-Range': (
+                            f'bytes {start}-{start + len(chunk) - 1}/{total}'
+                        ),
+                    },
+                )
+                self.assertEqual(response.status_code, expected_status)
+        self.assertEqual(self.client.get(upload_url).data['offset'], total)
+
+        response = self.client.post(
+            reverse(
+                'files:chunked-upload-complete',
+                args=(response.data.get('id'),),
+            )
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(response.data.get('file_type'), 'video')
+        self.assertStoredContent(response.data.get('id'))
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_chunked_upload_invalid_chunks(self):
+        '''Части с пустым телом или неверным диапазоном отклоняются.'''
+
+        response = self.client.post(
+            reverse('files:chunked-upload-list'),
+            data={'filename': 'clip.mp4'},
+        )
+        upload_id = response.data.get('id')
+        upload_url = reverse('files:chunked-upload-detail', args=(upload_id,))
+        total = len(CONTENT)
+        requests = (
+            (b'', 'bytes 0-9/100', HTTPStatus.BAD_REQUEST),
+            (CONTENT[:10], 'bytes 0-19/100', HTTPStatus.BAD_REQUEST),
+            (
+                CONTENT[:10],
+                'bytes 0-9/5',
+                HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+            ),
+            (CONTENT[:10], f'bytes 0-9/{total}', HTTPStatus.OK),
+            # Размер файла не может меняться между частями
+            (CONTENT[10:20], 'bytes 10-19/100', HTTPStatus.BAD_REQUEST),
+        )
+        for chunk, content_range, expected_status in requests:
+            with self.subTest(content_range=content_range, chunk=len(chunk)):
+                response = self.client.put(
+                    upload_url,
+                    data=chunk,
+                    content_type='application/octet-stream',
+                    headers={'Content-Range': content_range},
+                )
+                self.assertEqual(response.status_code, expected_status)
+        upload = ChunkedUpload.objects.get(pk=upload_id)
+        self.assertEqual((upload.offset, upload.size), (10, total))
+
+        # Незавершенная загрузка не сохраняется
+        response = self.client.post(
+            reverse('files:chunked-upload-complete', args=(upload_id,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.client.put(
+            reverse('files:chunked-upload-detail', args=('not-a-uuid',)),
+            data=CONTENT,
+            content_type='application/octet-stream',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_chunked_upload_invalid_type(self):
+        '''Загрузка по частям недопустимого типа файла не создается.'''
+
+        response = self.client.post(
+            reverse('files:chunked-upload-list'),
+            data={'filename': 'notes.smth'},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_batch_upload(self):
+        '''Пакетная загрузка с результатом для каждого файла.'''
+
+        response = self.client.post(
+            reverse('files:file-batch'),
+            data={'files': [
+                SimpleUploadedFile(f'frame_{index}.jpg', CONTENT)
+                for index in range(3)
+            ] + [SimpleUploadedFile('notes.smth', CONTENT)]},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.MULTI_STATUS)
+        statuses = [
+            item.get('status') for item in response.data.get('results')
+        ]
+        self.assertEqual(statuses, [HTTPStatus.CREATED] * 3 + [
+            HTTPStatus.BAD_REQUEST
+        ])
+        self.assertEqual(File.objects.count(), 3)
+        for item in response.data.get('results')[:3]:
+            self.assertStoredContent(item['data']['id'])
+
+    def test_batch_upload_mixed_types(self):
+        '''Файл недопустимого типа в пакете отклоняется, остальные
+        файлы сохраняются.'''
+
+        response = self.client.post(
+            reverse('files:file-batch'),
+            data={'files': [
+                SimpleUploadedFile('a.jpg', CONTENT),
+                SimpleUploadedFile('b.txt', CONTENT),
+            ]},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.MULTI_STATUS)
+        first, second = response.data.get('results')
+        self.assertEqual(first['status'], HTTPStatus.CREATED)
+        self.assertEqual(second['status'], HTTPStatus.BAD_REQUEST)
+        self.assertIn('file_type', second['errors'])
+        self.assertEqual(File.objects.count(), 1)
+
+    def test_batch_upload_storage_error(self):
+        '''Ошибка записи одного файла пакета возвращается в его
+        результате, остальные файлы сохраняются.'''
+
+        save_blob_content = services.save_blob_content
+
+        def save_or_fail(checksum, file):
+            if file.name == 'b.jpg':
+                raise OSError('Хранилище недоступно')
+            return save_blob_content(checksum, file)
+
+        with mock.patch(
+            'files.services.save_blob_content', side_effect=save_or_fail
+        ):
+            response = self.client.post(
+                reverse('files:file-batch'),
+                data={'files': [
+                    SimpleUploadedFile('a.jpg', CONTENT),
+                    SimpleUploadedFile('b.jpg', CONTENT + b'1'),
+                ]},
+            )
+        self.assertEqual(response.status_code, HTTPStatus.MULTI_STATUS)
+        first, second = response.data.get('results')
+        self.assertEqual(first['status'], HTTPStatus.CREATED)
+        self.assertEqual(
+            second['status'], HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+        self.assertIn('file', second['errors'])
+        self.assertEqual(File.objects.count(), 1)
+
+    def test_thumbnail(self):
+        '''Уменьшенная копия создается при первом обращении.'''
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 800), color='yellow').save(buffer, 'JPEG')
+        response = self.client.post(
+            reverse('files:file-list'),
+            data={'file': SimpleUploadedFile('frame.jpg', buffer.getvalue())},
+        )
+        thumbnail_url = response.data['thumbnails']['small']['webp']
+        response = self.client.get(thumbnail_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        content = b''.join(response.streaming_content)
+        with Image.open(io.BytesIO(content)) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (160, 107))
+
+    def test_thumbnail_of_invalid_image(self):
+        '''Для поврежденного изображения возвращается ошибка 415.'''
+
+        response = self.client.post(
+            reverse('files:file-list'),
+            data={'file': SimpleUploadedFile('frame.jpg', CONTENT)},
+        )
+        response = self.client.get(
+            response.data['thumbnails']['small']['jpeg']
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+        )
+
+    @mock.patch.object(thumbnails, '_cache_size', None)
+    def test_thumbnail_cache_eviction(self):
+        '''Кэш обходится целиком только при превышении его размера.'''
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 800), color='yellow').save(buffer, 'JPEG')
+        response = self.client.post(
+            reverse('files:file-list'),
+            data={'file': SimpleUploadedFile('frame.jpg', buffer.getvalue())},
+        )
+        urls = response.data['thumbnails']['small']
+        with mock.patch.object(
+            thumbnails, 'evict', wraps=thumbnails.evict
+        ) as evict:
+            for url in urls.values():
+                self.client.get(url)
+            self.assertEqual(evict.call_count, 1)
+            # Вытесненная из кэша копия все равно передается клиенту
+            with override_settings(THUMBNAIL_CACHE_MAX_SIZE=1):
+                response = self.client.get(
+                    urls['jpeg'].replace('small', 'medium')
+                )
+            self.assertEqual(evict.call_count, 2)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(b''.join(response.streaming_content))
+        self.assertEqual(thumbnails._cache_size, 0)
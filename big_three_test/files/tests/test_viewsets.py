@@ -1,11 +1,18 @@
 import os
+from datetime import timedelta
 from http import HTTPStatus
 from pathlib import Path
 
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
-from files.models import File
+from files.models import File, ListVersion
+from files.pagination import FileCursorPagination
+from files.views import FileListViewSet
 
 
 def get_test_picture():
@@ -27,12 +34,12 @@ class FileViewTests(TestCase):
             'first': {
                 "file": 'url/to/file_1',
                 'file_type': 'image',
-                'size': '100 MB',
+                'size': 100_000_000,
             },
             'second': {
                 "file": 'url/to/file_2',
                 'file_type': 'video',
-                'size': '100 MB',
+                'size': 200_000_000,
             }
         }
         for data in obj_data.values():
@@ -40,6 +47,9 @@ class FileViewTests(TestCase):
 
     def setUp(self) -> None:
         self.client = Client()
+        # Откат транзакции теста не отправляет сигналы моделей,
+        # поэтому закэшированные ответы очищаются явно
+        cache.clear()
 
     def test_create_valid_object(self):
         '''Тестирование создания объекта с корректными данными.'''
@@ -82,7 +92,7 @@ class FileViewTests(TestCase):
         response = self.client.get(reverse('files:file-list'))
         files_count = File.objects.count()
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertEqual(response.data.get('count'), files_count)
+        self.assertEqual(len(response.data.get('results')), files_count)
 
     def test_get_object_detail(self):
         '''Тестирование получения конкретного объекта.'''
@@ -109,3 +119,145 @@ class FileViewTests(TestCase):
         end_count = File.objects.count()
         self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
         self.assertEqual(start_count, end_count + 1)
+
+    def test_filter_by_size(self):
+        '''Тестирование фильтрации объектов по размеру.'''
+
+        response = self.client.get(
+            reverse('files:file-list'),
+            data={'size_min': 150_000_000, 'size_max': 250_000_000},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [obj.get('size') for obj in response.data.get('results')],
+            [200_000_000],
+        )
+
+    def test_ordering_by_size(self):
+        '''Тестирование сортировки объектов по размеру.'''
+
+        response = self.client.get(
+            reverse('files:file-list'), data={'ordering': 'size'}
+        )
+        sizes = [obj.get('size') for obj in response.data.get('results')]
+        self.assertEqual(sizes, sorted(sizes))
+
+    def test_stats(self):
+        '''Тестирование статистики использования хранилища.'''
+
+        response = self.client.get(reverse('files:file-stats'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        stats = {
+            item['file_type']: (item['total_size'], item['count'])
+            for item in response.data
+        }
+        self.assertEqual(
+            stats, {'image': (100_000_000, 1), 'video': (200_000_000, 1)}
+        )
+
+    def test_cursor_pagination(self):
+        '''Тестирование обхода списка объектов по курсору.'''
+
+        ids = []
+        url = reverse('files:file-list')
+        data = {'page_size': 1}
+        while url:
+            response = self.client.get(url, data=data)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(obj.get('id') for obj in response.data.get('results'))
+            url, data = response.data.get('next'), None
+        self.assertEqual(
+            ids, list(File.objects.values_list('id', flat=True))
+        )
+
+    def test_cursor_pagination_with_equal_values(self):
+        '''Объекты с одинаковым значением сортировки не пропускаются
+        и не повторяются при обходе по курсору.'''
+
+        for index in range(5):
+            File.objects.create(
+                file=f'url/to/same_{index}', file_type='image', size=1
+            )
+        view = FileListViewSet()
+        request = Request(APIRequestFactory().get('/', {'ordering': 'size'}))
+        self.assertEqual(
+            FileCursorPagination().get_ordering(request, None, view),
+            ('size', 'id'),
+        )
+        for ordering in ('size', '-size', 'created'):
+            with self.subTest(ordering=ordering):
+                ids = []
+                url = reverse('files:file-list')
+                data = {'page_size': 2, 'ordering': ordering}
+                while url:
+                    response = self.client.get(url, data=data)
+                    ids.extend(
+                        obj.get('id') for obj in response.data.get('results')
+                    )
+                    url, data = response.data.get('next'), None
+                tie_breaker = '-id' if ordering.startswith('-') else 'id'
+                self.assertEqual(
+                    ids,
+                    list(
+                        File.objects.order_by(ordering, tie_breaker)
+                        .values_list('id', flat=True)
+                    ),
+                )
+
+    def test_list_not_modified(self):
+        '''Тестирование условного запроса списка объектов.'''
+
+        url = reverse('files:file-list')
+        etag = self.client.get(url).headers.get('ETag')
+        self.assertIsNotNone(etag)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        # Изменение данных делает ETag недействительным
+        File.objects.create(file='url/to/file_3', file_type='image', size=1)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            len(response.data.get('results')), File.objects.count()
+        )
+
+    def test_list_version_on_delete(self):
+        '''Кэш списка различает хосты, а удаление файла меняет
+        версию списка и Last-Modified.'''
+
+        url = reverse('files:file-list')
+        self.client.get(url, data={'page_size': 1})
+        with self.settings(ALLOWED_HOSTS=['testserver', 'other.local']):
+            response = self.client.get(
+                url, data={'page_size': 1}, headers={'Host': 'other.local'}
+            )
+        self.assertTrue(
+            response.data['next'].startswith('http://other.local/')
+        )
+
+        ListVersion.objects.update(
+            modified=timezone.now() - timedelta(hours=1)
+        )
+        response = self.client.get(url)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        File.objects.filter(size=100_000_000).delete()
+        response = self.client.get(
+            url, headers={'If-Modified-Since': last_modified}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response.headers.get('ETag'), etag)
+        self.assertNotIn(
+            100_000_000, [obj['size'] for obj in response.data['results']]
+        )
+
+    def test_detail_not_modified(self):
+        '''Тестирование условного запроса конкретного объекта.'''
+
+        url = reverse('files:file-detail', args=(File.objects.first().id,))
+        response = self.client.get(url)
+        response = self.client.get(url, headers={
+            'If-None-Match': response.headers.get('ETag'),
+        })
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
@@ -0,0 +1,144 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image
+
+logger = logging.getLogger('files')
+
+# Форматы производных изображений: формат Pillow и расширение файла
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg'),
+    'webp': ('WEBP', 'webp'),
+}
+
+# Ошибки Pillow при чтении поврежденного или неподдерживаемого файла
+# (UnidentifiedImageError является подклассом OSError)
+IMAGE_ERRORS = (OSError, Image.DecompressionBombError)
+
+_eviction_lock = threading.Lock()
+# Размер кэша, известный процессу (None - не вычислялся). Учитываются
+# изображения, созданные процессом, поэтому кэш обходится целиком
+# только при превышении THUMBNAIL_CACHE_MAX_SIZE.
+_cache_size = None
+
+
+def get_cache_root() -> Path:
+    return Path(settings.THUMBNAIL_CACHE_ROOT)
+
+
+def get_derivative_path(file_id: int, size: str, image_format: str) -> Path:
+    '''Возвращает путь к производному изображению в кэше.'''
+
+    _, extension = FORMATS[image_format]
+    return get_cache_root() / str(file_id) / f'{size}.{extension}'
+
+
+def generate_derivative(source, path: Path, size: str, image_format: str):
+    '''Создает уменьшенную копию изображения в указанном формате.
+
+    Возвращает открытый на чтение файл копии: он остается доступным,
+    даже если копия будет вытеснена из кэша параллельным запросом.
+    '''
+
+    pillow_format, _ = FORMATS[image_format]
+    dimensions = settings.THUMBNAIL_SIZES[size]
+    with Image.open(source) as image:
+        # Для JPEG уменьшение выполняется уже при декодировании
+        image.draft('RGB', dimensions)
+        image = image.convert('RGB')
+        image.thumbnail(dimensions)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Запись во временный файл с последующим переименованием
+        # исключает чтение недописанного файла параллельным запросом
+        descriptor, temp_path = tempfile.mkstemp(dir=path.parent)
+        temp_file = os.fdopen(descriptor, 'w+b')
+        try:
+            image.save(
+                temp_file,
+                pillow_format,
+                quality=settings.THUMBNAIL_QUALITY,
+            )
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_file.close()
+            os.remove(temp_path)
+            raise
+    temp_file.seek(0)
+    return temp_file
+
+
+def open_derivative(obj, size: str, image_format: str):
+    '''Возвращает открытый на чтение файл производного изображения,
+    создавая изображение при первом обращении.
+
+    Файл открывается сразу, поэтому вытеснение изображения из кэша
+    после проверки его наличия не приводит к ошибке.
+    '''
+
+    global _cache_size
+    path = get_derivative_path(obj.pk, size, image_format)
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        # Время изменения используется как время последнего обращения
+        # для вытеснения давно не используемых изображений
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return file
+    with obj.file.open('rb') as source:
+        file = generate_derivative(source, path, size, image_format)
+    file_size = os.fstat(file.fileno()).st_size
+    with _eviction_lock:
+        if _cache_size is not None:
+            _cache_size += file_size
+        needs_eviction = (
+            _cache_size is None
+            or _cache_size > settings.THUMBNAIL_CACHE_MAX_SIZE
+        )
+    if needs_eviction:
+        evict()
+    return file
+
+
+def evict(max_size: int = None):
+    '''Удаляет давно не использованные изображения, пока размер кэша
+    превышает THUMBNAIL_CACHE_MAX_SIZE, и запоминает размер кэша.'''
+
+    global _cache_size
+    if max_size is None:
+        max_size = settings.THUMBNAIL_CACHE_MAX_SIZE
+    with _eviction_lock:
+        entries = []
+        total_size = 0
+        for path in get_cache_root().glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+        if total_size > max_size:
+            for _, file_size, path in sorted(entries):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total_size -= file_size
+                if total_size <= max_size:
+                    break
+        _cache_size = total_size
+
+
+def invalidate(file_id: int):
+    '''Удаляет все производные изображения файла.'''
+
+    shutil.rmtree(get_cache_root() / str(file_id), ignore_errors=True)
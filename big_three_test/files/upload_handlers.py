@@ -0,0 +1,50 @@
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+class HashingMixin:
+    '''Вычисляет SHA-256 загружаемого файла по мере получения данных,
+    чтобы не перечитывать файл после загрузки.
+
+    Контрольная сумма сохраняется в атрибуте sha256 загруженного файла.
+    '''
+
+    def new_file(self, *args, **kwargs):
+        # Родительский метод может прервать цепочку обработчиков
+        # исключением StopFutureHandlers, поэтому хэш создается заранее
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def hash_chunk(self, raw_data):
+        self.hasher.update(raw_data)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingMixin, MemoryFileUploadHandler):
+    '''Обработчик небольших файлов, загружаемых в память.'''
+
+    def receive_data_chunk(self, raw_data, start):
+        # Если файл слишком велик для хранения в памяти, данные
+        # передаются следующему обработчику, который и вычислит сумму
+        if self.activated:
+            self.hash_chunk(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingMixin, TemporaryFileUploadHandler
+):
+    '''Обработчик больших файлов, записываемых во временный файл.'''
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hash_chunk(raw_data)
+        return super().receive_data_chunk(raw_data, start)
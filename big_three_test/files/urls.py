@@ -7,6 +7,9 @@ app_name = 'files'
 
 router = routers.SimpleRouter()
 router.register('files', views.FileListViewSet, basename='file')
+router.register(
+    'uploads', views.ChunkedUploadViewSet, basename='chunked-upload'
+)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,8 +1,30 @@
-from rest_framework import mixins, viewsets
+import logging
+import re
 
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay
+from django.http import FileResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FileUploadParser
+from rest_framework.response import Response
+
+from files import cache, cleanup, services, thumbnails
 from files.filters import FileFilter
-from files.models import File
-from files.serializers import FileSerializer
+from files.models import ChunkedUpload, File
+from files.pagination import FileCursorPagination
+from files.serializers import (
+    ChunkedUploadSerializer,
+    FileSerializer,
+    FileStatsSerializer,
+)
+
+logger = logging.getLogger('files')
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
 
 
 class FileListViewSet(
@@ -13,11 +35,52 @@ class FileListViewSet(
     viewsets.GenericViewSet,
 ):
     '''Класс для отображения списка сохраненных файлов, конкретного
-    файлa по id, а также добавления и удаления файлов.'''
+    файлa по id, а также добавления и удаления файлов.
+
+    Помимо JSON с содержимым в кодировке Base64 принимает файлы в
+    формате multipart/form-data, а также "сырое" тело запроса
+    (эндпоинт upload), которые записываются на диск потоково.
+    '''
 
     queryset = File.objects.all()
     serializer_class = FileSerializer
     filterset_class = FileFilter
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    ordering_fields = ['created', 'size']
+    pagination_class = FileCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        # Страницы списка кэшируются по версии данных и адресу запроса,
+        # версия меняется при любом изменении файлов
+        version, last_modified = cache.get_version()
+        url = request.build_absolute_uri()
+        etag = cache.get_list_etag(version, url)
+        not_modified = cache.get_not_modified_response(
+            request, etag, last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        data = cache.get_cached_list(version, url)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set_cached_list(version, url, data)
+        return cache.set_conditional_headers(
+            Response(data), etag, last_modified
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        obj = self.get_object()
+        etag = cache.get_object_etag(obj)
+        last_modified = int(obj.updated.timestamp())
+        not_modified = cache.get_not_modified_response(
+            request, etag, last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(obj)
+        return cache.set_conditional_headers(
+            Response(serializer.data), etag, last_modified
+        )
 
     def destroy(self, request, *args, **kwargs):
         response = super().destroy(request, *args, **kwargs)
@@ -26,3 +89,273 @@ class FileListViewSet(
 
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
+
+    @action(
+        detail=False,
+        methods=['put'],
+        parser_classes=[FileUploadParser],
+        url_path=r'upload/(?P<filename>[^/]+)',
+    )
+    def upload(self, request, filename=None, *args, **kwargs):
+        '''Загрузка файла, переданного в теле запроса целиком.'''
+
+        serializer = self.get_serializer(
+            data={'file': request.data.get('file')}
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True)
+    def thumbnail(self, request, *args, **kwargs):
+        '''Уменьшенная копия изображения (параметры size и image_format).
+        Создается при первом обращении и сохраняется в кэше.'''
+
+        obj = self.get_object()
+        size = request.query_params.get('size', 'small')
+        image_format = request.query_params.get('image_format', 'jpeg')
+        if size not in settings.THUMBNAIL_SIZES:
+            return Response(
+                {'size': ['Допустимые значения: ' + ', '.join(
+                    settings.THUMBNAIL_SIZES
+                )]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if image_format not in thumbnails.FORMATS:
+            return Response(
+                {'image_format': [
+                    f'Допустимые значения: {", ".join(thumbnails.FORMATS)}'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if obj.file_type != 'image':
+            return Response(
+                {'detail': (
+                    'Уменьшенные копии доступны только для изображений.'
+                )},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            file = thumbnails.open_derivative(obj, size, image_format)
+        except FileNotFoundError:
+            return Response(
+                {'detail': 'Исходный файл не найден.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        except thumbnails.IMAGE_ERRORS:
+            logger.warning(
+                f'Не удалось создать уменьшенную копию файла {obj.pk}',
+                exc_info=True,
+            )
+            return Response(
+                {'detail': 'Файл не является поддерживаемым изображением.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        return FileResponse(file, content_type=f'image/{image_format}')
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, *args, **kwargs):
+        '''Загрузка нескольких файлов одним запросом.
+
+        Принимает список files (строки Base64 или объекты с полями
+        файла) в JSON либо несколько полей files в multipart/form-data.
+        Возвращает результат для каждого файла.
+        '''
+
+        if hasattr(request.data, 'getlist'):
+            items = request.data.getlist('files')
+        else:
+            items = request.data.get('files')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'files': ['Передайте непустой список файлов.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.FILES_BATCH_MAX_SIZE:
+            return Response(
+                {'files': [
+                    'Количество файлов превышает допустимое '
+                    f'({settings.FILES_BATCH_MAX_SIZE}).'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(
+                data=item if isinstance(item, dict) else {'file': item}
+            )
+            try:
+                serializer.is_valid(raise_exception=True)
+                data = serializer.complete_data(serializer.validated_data)
+            except ValidationError as error:
+                results[index] = {
+                    'index': index,
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': error.detail,
+                }
+                continue
+            valid.append((index, data))
+
+        objs = services.create_files_batch([data for _, data in valid])
+        for (index, _), obj in zip(valid, objs):
+            if isinstance(obj, Exception):
+                # Ошибки хранилища не раскрываются клиенту
+                results[index] = {
+                    'index': index,
+                    'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    'errors': {'file': ['Не удалось сохранить файл.']},
+                }
+                continue
+            results[index] = {
+                'index': index,
+                'status': status.HTTP_201_CREATED,
+                'data': self.get_serializer(obj).data,
+            }
+
+        statuses = {result['status'] for result in results}
+        if len(statuses) > 1:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = statuses.pop()
+        return Response({'results': results}, status=response_status)
+
+    @action(detail=False, methods=['delete'], url_path='bulk')
+    def bulk_delete(self, request, *args, **kwargs):
+        '''Удаление всех файлов, соответствующих параметрам фильтрации
+        (например, created_before). Удаление выполняется в фоне.'''
+
+        filterset = DjangoFilterBackend().get_filterset(
+            request, self.get_queryset(), self
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        # Параметры с пустыми значениями не фильтруют объекты, поэтому
+        # требуется хотя бы одно непустое значение
+        values = filterset.form.cleaned_data.values()
+        if all(value in (None, '') for value in values):
+            return Response(
+                {'detail': (
+                    'Необходимо указать хотя бы один параметр фильтрации: '
+                    f'{", ".join(FileFilter.base_filters)}'
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = filterset.qs
+        count = queryset.count()
+        cleanup.delete_in_background(queryset)
+        return Response(
+            {'detail': 'Удаление объектов запущено', 'count': count},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=False)
+    def stats(self, request, *args, **kwargs):
+        '''Суммарный размер (в байтах) и количество файлов каждого типа
+        по дням.'''
+
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .annotate(day=TruncDay('created'))
+            .values('day', 'file_type')
+            .annotate(total_size=Sum('size'), count=Count('id'))
+            .order_by('-day', 'file_type')
+        )
+        # Количество строк ограничено числом дней и типов файлов,
+        # поэтому статистика возвращается без пагинации
+        serializer = FileStatsSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class ChunkedUploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    '''Класс для загрузки больших файлов по частям с возможностью
+    возобновления.
+
+    Порядок загрузки: создание загрузки (POST), передача частей
+    (PUT с заголовком Content-Range), завершение (POST complete).
+    Текущее смещение можно получить запросом GET.
+    '''
+
+    queryset = ChunkedUpload.objects.all()
+    serializer_class = ChunkedUploadSerializer
+
+    def get_range(self, request):
+        '''Возвращает начало, конец и размер файла (или None, если
+        размер не известен) из заголовка Content-Range.'''
+
+        content_range = request.headers.get('Content-Range')
+        if not content_range:
+            return None
+        match = CONTENT_RANGE_PATTERN.match(content_range)
+        if not match:
+            return False
+        start, end, size = match.groups()
+        return int(start), int(end), None if size == '*' else int(size)
+
+    def update(self, request, *args, **kwargs):
+        '''Дописывает часть файла, переданную в теле запроса.'''
+
+        upload = self.get_object()
+        content_range = self.get_range(request)
+        if content_range is False:
+            return Response(
+                {'detail': 'Заголовок Content-Range имеет неверный формат.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.stream is None:
+            return Response(
+                {'detail': 'Тело запроса не содержит части файла.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        offset = length = size = None
+        if content_range is not None:
+            offset, end, size = content_range
+            if end < offset or (size is not None and end >= size):
+                return Response(
+                    {'detail': 'Диапазон Content-Range недопустим.'},
+                    status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                )
+            length = end - offset + 1
+            # Смещение проверяется до приема части, чтобы не читать
+            # заведомо отклоняемое тело запроса
+            if offset != upload.offset:
+                return self.get_offset_mismatch_response(upload.offset)
+        try:
+            upload = services.append_chunk(
+                upload.pk, request.stream, offset, length, size
+            )
+        except services.UploadOffsetMismatch as error:
+            return self.get_offset_mismatch_response(error.expected)
+        except services.InvalidChunk as error:
+            return Response(
+                {'detail': str(error)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(self.get_serializer(upload).data)
+
+    def get_offset_mismatch_response(self, expected: int):
+        error = services.UploadOffsetMismatch(expected)
+        return Response(
+            {'detail': str(error), 'offset': expected},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, *args, **kwargs):
+        '''Завершает загрузку и сохраняет файл.'''
+
+        upload = self.get_object()
+        try:
+            obj = services.complete_chunked_upload(upload.pk)
+        except (services.InvalidFileType, services.InvalidChunk) as error:
+            return Response(
+                {'detail': str(error)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            FileSerializer(obj, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from vision.models import Camera
+
+
+@admin.register(Camera)
+class CameraAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'url', 'interval', 'detect_every', 'enabled')
+    list_filter = ('enabled', 'backend')
+    search_fields = ('name', 'url')
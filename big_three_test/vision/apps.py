@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class VisionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vision'
+
+    def ready(self):
+        from vision.registry import classifiers
+        classifiers.autodiscover()
+        # Каскады загружаются при старте процесса, чтобы не разбирать
+        # XML-файлы при создании каждой задачи распознавания
+        if settings.VISION_PRELOAD_CASCADES:
+            classifiers.preload()
+        # Профилирование камер, включенное в настройках
+        if settings.VISION_PROFILE_CAMERAS:
+            from vision.profiling import profiler
+            for camera_url in settings.VISION_PROFILE_CAMERAS:
+                profiler.enable(camera_url)
+        return super().ready()
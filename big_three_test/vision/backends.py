@@ -0,0 +1,305 @@
+import logging
+import pathlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from vision.detection import Box, DetectionPass
+from vision.registry import classifiers
+
+logger = logging.getLogger('vision')
+
+
+class DetectorBackend:
+    '''Базовый класс движка распознавания объектов.
+
+    Движок распознает объекты нескольких типов на кадре и возвращает
+    словарь {тип объекта: [Box, ...]} в координатах исходного кадра.
+    '''
+
+    name = None
+
+    @classmethod
+    def get_allowed_types(cls):
+        '''Возвращает типы объектов, которые распознает движок.'''
+
+        raise NotImplementedError
+
+    def detect(self, frame, region=None) -> dict:
+        raise NotImplementedError
+
+    def detect_batch(self, frames, regions=None) -> list:
+        '''Распознает объекты на нескольких кадрах.'''
+
+        regions = regions or [None] * len(frames)
+        return [
+            self.detect(frame, region=region)
+            for frame, region in zip(frames, regions)
+        ]
+
+
+class CascadeDetector(DetectionPass, DetectorBackend):
+    '''Движок распознавания на каскадах Хаара.'''
+
+    name = 'cascade'
+
+    @classmethod
+    def get_allowed_types(cls):
+        return classifiers.names()
+
+
+def crop(frame, region):
+    '''Возвращает часть кадра в области (x, y, w, h).'''
+
+    if not region:
+        return frame
+    x, y, w, h = region
+    return frame[y:y + h, x:x + w]
+
+
+_nets = threading.local()
+
+
+def get_net(model_path: str):
+    '''Возвращает сеть ONNX, загруженную в текущем потоке.'''
+
+    nets = getattr(_nets, 'nets', None)
+    if nets is None:
+        nets = _nets.nets = {}
+    if model_path not in nets:
+        start_time = time.perf_counter()
+        nets[model_path] = cv2.dnn.readNetFromONNX(model_path)
+        logger.info(
+            f'Модель {model_path} загружена за '
+            f'{time.perf_counter() - start_time:.2f} сек.'
+        )
+    return nets[model_path]
+
+
+def forward(model_path: str, input_size: int, images) -> np.ndarray:
+    '''Выполняет один прямой проход сети для пакета изображений.
+
+    Возвращает массив формы (кадры, якоря, 4 + классы).
+    '''
+
+    blob = cv2.dnn.blobFromImages(
+        images,
+        scalefactor=1 / 255,
+        size=(input_size, input_size),
+        swapRB=True,
+        crop=False,
+    )
+    net = get_net(model_path)
+    net.setInput(blob)
+    # Выход YOLOv8 имеет форму (кадры, 4 + классы, якоря)
+    return np.transpose(net.forward(), (0, 2, 1))
+
+
+class BatchCollector(threading.Thread):
+    '''Поток, объединяющий кадры нескольких камер в один пакет.
+
+    Кадры, поступившие в течение max_delay секунд (но не более
+    max_batch), обрабатываются одним прямым проходом сети.
+    '''
+
+    def __init__(
+        self,
+        model_path: str,
+        input_size: int,
+        max_batch: int,
+        max_delay: float,
+    ):
+        super().__init__(daemon=True, name=f'batch {model_path}')
+        self.model_path = model_path
+        self.input_size = input_size
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches_count = 0
+        self.frames_count = 0
+        self._queue = queue.Queue()
+
+    def forward(self, images) -> list:
+        '''Передает изображения в пакет и ожидает результатов.'''
+
+        futures = []
+        for image in images:
+            future = Future()
+            self._queue.put((image, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(items) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                outputs = forward(
+                    self.model_path,
+                    self.input_size,
+                    [image for image, _ in items],
+                )
+            except Exception as error:
+                for _, future in items:
+                    future.set_exception(error)
+                continue
+            self.batches_count += 1
+            self.frames_count += len(items)
+            for (_, future), output in zip(items, outputs):
+                future.set_result(output)
+
+
+_collectors = {}
+_collectors_lock = threading.Lock()
+
+
+def get_collector(model_path: str, input_size: int) -> BatchCollector:
+    '''Возвращает поток пакетной обработки, общий для модели.'''
+
+    key = (model_path, input_size)
+    with _collectors_lock:
+        if key not in _collectors:
+            collector = BatchCollector(
+                model_path,
+                input_size,
+                max_batch=settings.ONNX_BATCH_SIZE,
+                max_delay=settings.ONNX_BATCH_DELAY,
+            )
+            collector.start()
+            _collectors[key] = collector
+        return _collectors[key]
+
+
+class OnnxDetector(DetectorBackend):
+    '''Движок распознавания на модели ONNX (формат YOLOv8) через cv2.dnn.
+
+    Если ONNX_BATCH_SIZE больше 1, кадры всех камер, использующих
+    модель, объединяются в пакеты (blobFromImages) и обрабатываются
+    одним прямым проходом сети. Для пакетной обработки модель должна
+    быть экспортирована с динамическим размером пакета.
+    '''
+
+    name = 'onnx'
+
+    def __init__(
+        self,
+        object_types,
+        model_path=None,
+        input_size: int = None,
+        confidence: float = None,
+        nms_threshold: float = None,
+        batched: bool = None,
+    ):
+        self.object_types = [
+            object_type.lower() for object_type in object_types
+        ]
+        self.model_path = str(model_path or settings.ONNX_MODEL_PATH)
+        if not pathlib.Path(self.model_path).is_file():
+            raise ImproperlyConfigured(
+                f'Файл модели {self.model_path} не найден (ONNX_MODEL_PATH).'
+            )
+        self.input_size = input_size or settings.ONNX_INPUT_SIZE
+        self.confidence = confidence or settings.ONNX_CONFIDENCE
+        self.nms_threshold = nms_threshold or settings.ONNX_NMS_THRESHOLD
+        if batched is None:
+            batched = settings.ONNX_BATCH_SIZE > 1
+        self.collector = (
+            get_collector(self.model_path, self.input_size)
+            if batched else None
+        )
+
+    @classmethod
+    def get_allowed_types(cls):
+        return settings.ONNX_OBJECT_TYPES.keys()
+
+    def postprocess(self, output, shape) -> dict:
+        '''Преобразует выход сети для одного кадра в объекты.'''
+
+        height, width = shape[:2]
+        scale_x, scale_y = width / self.input_size, height / self.input_size
+        scores = output[:, 4:]
+        class_ids = np.argmax(scores, axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        detected = {}
+        for object_type in self.object_types:
+            mask = np.isin(
+                class_ids, settings.ONNX_OBJECT_TYPES[object_type]
+            ) & (confidences >= self.confidence)
+            boxes = []
+            for (cx, cy, w, h), confidence in zip(
+                output[mask, :4], confidences[mask]
+            ):
+                boxes.append(Box(
+                    int(round((cx - w / 2) * scale_x)),
+                    int(round((cy - h / 2) * scale_y)),
+                    int(round(w * scale_x)),
+                    int(round(h * scale_y)),
+                    confidence=float(confidence),
+                ))
+            if len(boxes) > 1:
+                indices = cv2.dnn.NMSBoxes(
+                    [box[:4] for box in boxes],
+                    [box.confidence for box in boxes],
+                    self.confidence,
+                    self.nms_threshold,
+                )
+                boxes = [boxes[index] for index in np.ravel(indices)]
+            detected[object_type] = boxes
+        return detected
+
+    def detect_batch(self, frames, regions=None) -> list:
+        regions = regions or [None] * len(frames)
+        images = [
+            crop(frame, region) for frame, region in zip(frames, regions)
+        ]
+        if self.collector is not None:
+            outputs = self.collector.forward(images)
+        else:
+            outputs = forward(self.model_path, self.input_size, images)
+        results = []
+        for image, region, output in zip(images, regions, outputs):
+            detected = self.postprocess(output, image.shape)
+            if region:
+                offset_x, offset_y = region[:2]
+                detected = {
+                    object_type: [
+                        box._replace(x=box.x + offset_x, y=box.y + offset_y)
+                        for box in boxes
+                    ]
+                    for object_type, boxes in detected.items()
+                }
+            results.append(detected)
+        return results
+
+    def detect(self, frame, region=None) -> dict:
+        return self.detect_batch([frame], [region])[0]
+
+
+BACKENDS = {
+    backend.name: backend for backend in (CascadeDetector, OnnxDetector)
+}
+
+
+def get_backend_class(name: str):
+    '''Возвращает класс движка распознавания по имени.'''
+
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'Неизвестный движок распознавания {name}. '
+            f'Доступные движки: {", ".join(BACKENDS)}'
+        )
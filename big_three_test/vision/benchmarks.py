@@ -0,0 +1,153 @@
+import time
+import uuid
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+from big_three_test.benchmarks import summarize, summarize_histogram
+from vision import metrics
+from vision.camera_vision import DetectionConfig, FrameHandler
+from vision.encoder import EncodedFrame, FrameEncoder
+
+# Этапы обработки кадра в порядке выполнения
+STAGES = ('read', 'motion', 'detect', 'hash', 'annotate', 'encode')
+# Результаты обработки кадра FrameHandler
+RESULTS = (
+    'tracked', 'no_motion', 'outside_roi', 'no_objects', 'no_new_objects',
+    'duplicate', 'dropped', 'queued',
+)
+
+
+def create_fixture(
+    path: str,
+    frames: int = 300,
+    width: int = 1280,
+    height: int = 720,
+    fps: int = 25,
+) -> str:
+    '''Записывает синтетический видеоролик с движущимися объектами.
+
+    Фон неподвижен, поэтому часть кадров отсекается определением
+    движения так же, как на реальной камере.
+    '''
+
+    random = np.random.default_rng(0)
+    background = random.integers(
+        60, 100, (height, width, 3), dtype=np.uint8
+    )
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height)
+    )
+    size = max(width // 10, 8)
+    for index in range(frames):
+        frame = background.copy()
+        # Объекты движутся только в первой половине каждой секунды
+        if index % fps < fps // 2:
+            for lane in range(3):
+                x = (index * (lane + 2) * 4) % (width - size)
+                y = height // 4 * (lane + 1) - size // 2
+                cv2.rectangle(
+                    frame,
+                    (x, y),
+                    (x + size, y + size // 2),
+                    (30 + lane * 80, 200, 220),
+                    -1,
+                )
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+class BenchmarkEncoder(FrameEncoder):
+    '''Пул кодирования для замеров: размечает и кодирует кадры
+    в вызывающем потоке и не сохраняет их в хранилище.'''
+
+    def submit(self, encoded: EncodedFrame) -> bool:
+        try:
+            self.process(encoded)
+        finally:
+            encoded.done.set()
+        return True
+
+    def save(self, encoded: EncodedFrame, content: bytes, original_content):
+        pass
+
+
+def run(
+    video_path: str,
+    object_types,
+    backend: str = None,
+    scales=None,
+    motion: bool = True,
+    frames: int = None,
+    roi=None,
+) -> dict:
+    '''Прогоняет видеоролик через FrameHandler и возвращает
+    статистику по каждому этапу обработки кадра.
+
+    Кадры обрабатываются так же, как кадры камеры (определение
+    движения, области распознавания, трекер, разметка и кодирование),
+    а длительности этапов берутся из метрики vision_stage_seconds.
+    Кадры не сохраняются в хранилище, поэтому замеры не зависят
+    от БД и могут сравниваться между версиями.
+    '''
+
+    # Метрики замера не смешиваются с метриками камер и других замеров
+    camera = f'benchmark:{uuid.uuid4().hex[:8]}'
+    handler = FrameHandler(
+        camera,
+        DetectionConfig(
+            object_types=object_types,
+            scales=scales,
+            backend=backend,
+            roi=roi,
+        ),
+        encoder=BenchmarkEncoder(
+            workers=0,
+            format=settings.FRAME_FORMAT,
+            quality=settings.FRAME_QUALITY,
+            max_width=settings.FRAME_MAX_WIDTH,
+            keep_original=settings.FRAME_KEEP_ORIGINAL,
+        ),
+    )
+    if not motion:
+        handler.motion = None
+    stream = cv2.VideoCapture(str(video_path))
+    pipeline = []
+    try:
+        while frames is None or len(pipeline) < frames:
+            start_time = time.perf_counter()
+            success, frame = stream.read()
+            if not success:
+                break
+            metrics.STAGE_SECONDS.observe(
+                time.perf_counter() - start_time, camera=camera, stage='read'
+            )
+            handler.handle(frame)
+            pipeline.append(time.perf_counter() - start_time)
+    finally:
+        stream.release()
+    results = {
+        result: int(metrics.FRAMES.get(camera=camera, result=result))
+        for result in RESULTS
+    }
+    return {
+        'frames': len(pipeline),
+        'skipped_by_motion': results['no_motion'],
+        'skipped_by_roi': results['outside_roi'],
+        'frames_with_objects': sum(
+            count for result, count in results.items()
+            if result not in (
+                'tracked', 'no_motion', 'outside_roi', 'no_objects'
+            )
+        ),
+        'results': results,
+        'stages': {
+            stage: summarize_histogram(
+                metrics.STAGE_SECONDS, camera=camera, stage=stage
+            )
+            for stage in STAGES
+        },
+        'pipeline': summarize(pipeline),
+    }
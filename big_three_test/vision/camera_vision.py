@@ -1,21 +1,33 @@
-import base64
-import json
 import logging
-import pathlib
 import time
-from http import HTTPStatus
 
 import cv2
-import requests
 from django.conf import settings
 
+from vision import metrics
+from vision.backends import CascadeDetector, get_backend_class
+from vision.encoder import EncodedFrame, FrameEncoder, get_encoder
+from vision.grabber import FrameGrabber
+from vision.models import Camera, Detection
+from vision.motion import MotionDetector, hash_distance, perceptual_hash
+from vision.profiling import profiler
+from vision.recording import ClipRecorder
+from vision.roi import RegionOfInterest, offset_boxes
+from vision.tracking import IouTracker
+
 logger = logging.getLogger('vision')
 
 
 class CameraConfig:
     '''Класс конфигурации для подключения к камере.'''
 
-    def __init__(self, camera_url: str = None, interval: int = None):
+    def __init__(
+        self,
+        camera_url: str = None,
+        interval: int = None,
+        record: bool = None,
+        camera_id: int = None,
+    ):
         default_url = 'https://streams.cam72.su/1500-1032/tracks-v1/mono.m3u8'
         default_interval = 1
 
@@ -27,6 +39,24 @@ class CameraConfig:
         # распознавания объектов (по умолчанию - 1 сек)
         self.interval = interval if interval else default_interval
 
+        # В режиме записи вместе с кадром сохраняется видеоролик
+        # с событием распознавания
+        self.record = settings.CLIP_RECORDING if record is None else record
+
+        # Камера из реестра камер, к которой относятся распознавания
+        self.camera_id = camera_id
+
+    @classmethod
+    def from_camera(cls, camera: Camera):
+        '''Возвращает конфигурацию камеры из реестра камер.'''
+
+        return cls(
+            camera_url=camera.url,
+            interval=camera.interval,
+            record=camera.record,
+            camera_id=camera.pk,
+        )
+
     def get_config_params(self):
         '''Возвращает конфигурационные параметры.'''
 
@@ -36,46 +66,338 @@ class CameraConfig:
 class DetectionConfig:
     '''Класс конфигурации для распознавания объектов.'''
 
-    detection_objects = {
-        'cars': (
-            pathlib.Path(__file__).parent / 'detection_cascades/cars.xml'
-        ),
-        'people': (
-            pathlib.Path(__file__).parent / 'detection_cascades/people.xml'
-        ),
-    }
-
-    def __init__(self, object_type: str = None):
-        self.object_type = object_type
-
-    def __object_type_is_valid(self):
-        '''Проверяет валидность параметра object_type.'''
-
-        keys = self.detection_objects.keys()
-        if self.object_type.lower() not in keys:
-            logger.error(
-                    'Передан недопустимый для detection_objects параметр '
-                    f'{self.object_type}'
+    def __init__(
+        self,
+        object_type: str = None,
+        object_types=None,
+        scales=None,
+        backend: str = None,
+        detect_every: int = None,
+        scale_factor: float = 1.1,
+        min_neighbors: int = 3,
+        min_size: int = 30,
+        roi=None,
+    ):
+        # Для обратной совместимости допускается передача одного типа
+        self.object_types = list(object_types or [object_type])
+        # Масштабы пирамиды изображений, на которых выполняется
+        # распознавание (1.0 - исходное разрешение кадра)
+        self.scales = scales if scales else settings.DETECTION_SCALES
+        # Движок распознавания ("cascade" или "onnx")
+        self.backend = backend if backend else settings.DETECTION_BACKEND
+        self.backend_class = get_backend_class(self.backend)
+        # Распознавание выполняется на каждом detect_every-м кадре,
+        # на остальных положение объектов предсказывается трекером
+        self.detect_every = (
+            detect_every if detect_every else settings.DETECT_EVERY
+        )
+        # Параметры каскадов Хаара
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+        # Многоугольники областей кадра, в которых распознаются объекты
+        self.roi = roi or []
+
+    @classmethod
+    def from_camera(cls, camera: Camera, **overrides):
+        '''Возвращает конфигурацию распознавания камеры из реестра.
+
+        Переданные параметры, отличные от None, заменяют параметры
+        камеры.
+        '''
+
+        params = {
+            'object_types': camera.object_types or ['cars'],
+            'scales': camera.scales,
+            'backend': camera.backend,
+            'detect_every': camera.detect_every,
+            'scale_factor': camera.scale_factor,
+            'min_neighbors': camera.min_neighbors,
+            'min_size': camera.min_size,
+            'roi': camera.roi,
+        }
+        params.update(
+            (name, value) for name, value in overrides.items()
+            if value is not None
+        )
+        return cls(**params)
+
+    def __object_types_are_valid(self):
+        '''Проверяет валидность параметра object_types.'''
+
+        for object_type in self.object_types:
+            if object_type is None or (
+                object_type.lower() not in self.get_allowed_types()
+            ):
+                logger.error(
+                        'Передан недопустимый для detection_objects параметр '
+                        f'{object_type}'
+                    )
+                raise AssertionError(
+                    f'Параметр {object_type} не является допустимым '
+                    'для object_type. Список доступных параметров можно'
+                    'получить при вызове метода get_allowed_types.'
                 )
-            raise AssertionError(
-                f'Параметр {self.object_type} не является допустимым '
-                'для object_type. Список доступных параметров можно'
-                'получить при вызове метода get_allowed_types.'
-            )
         return True
 
     def get_detection(self):
-        '''Возвращает каскадный классификатор для объектов.'''
-
-        if self.__object_type_is_valid():
-            return cv2.CascadeClassifier(
-                self.detection_objects.get(self.object_type)
+        '''Возвращает проход распознавания для всех типов объектов.'''
+
+        if not self.__object_types_are_valid():
+            return None
+        if self.backend_class is CascadeDetector:
+            return CascadeDetector(
+                self.object_types,
+                scales=self.scales,
+                scale_factor=self.scale_factor,
+                min_neighbors=self.min_neighbors,
+                min_size=(self.min_size, self.min_size),
             )
+        return self.backend_class(self.object_types)
 
     def get_allowed_types(self):
         '''Возвращает массив допустимых типов объектов для распознавания.'''
 
-        return self.detection_objects.keys()
+        return self.backend_class.get_allowed_types()
+
+
+def get_recorder(stream: cv2.VideoCapture) -> ClipRecorder:
+    '''Возвращает объект записи видеороликов с событиями.'''
+
+    fps = stream.get(cv2.CAP_PROP_FPS)
+    # Некоторые потоки сообщают заведомо неверную частоту кадров
+    if not 0 < fps <= settings.CLIP_MAX_FPS:
+        fps = settings.CLIP_FPS
+    return ClipRecorder(
+        fps=fps,
+        pre_roll=settings.CLIP_PRE_ROLL,
+        post_roll=settings.CLIP_POST_ROLL,
+        max_duration=settings.CLIP_MAX_DURATION,
+        queue_size=settings.CLIP_QUEUE_SIZE,
+        codec=settings.CLIP_CODEC,
+        max_width=settings.CLIP_MAX_WIDTH,
+        quality=settings.CLIP_FRAME_QUALITY,
+        max_buffer_size=settings.CLIP_BUFFER_MAX_SIZE,
+        frame_queue_size=settings.CLIP_FRAME_QUEUE_SIZE,
+    )
+
+
+class FrameHandler:
+    '''Класс для распознавания объектов на отдельных кадрах камеры.
+
+    Содержит состояние, которое сохраняется между кадрами одной камеры
+    (модель фона, хэш последнего сохраненного кадра), поэтому кадры
+    одной камеры должны обрабатываться последовательно.
+    '''
+
+    def __init__(
+        self,
+        camera_url: str,
+        detection: DetectionConfig,
+        recorder: ClipRecorder = None,
+        encoder: FrameEncoder = None,
+        camera_id: int = None,
+    ):
+        self.camera_url = camera_url
+        self.camera_id = camera_id
+        self.detection = detection.get_detection()
+        # Распознавание выполняется только в областях кадра камеры
+        self.roi = RegionOfInterest(detection.roi) if detection.roi else None
+        self.detect_every = detection.detect_every
+        self.recorder = recorder
+        # Кодирование и сохранение кадров выполняется пулом потоков
+        self.encoder = encoder if encoder else get_encoder()
+        # Определение движения отсекает кадры без изменений в сцене
+        self.motion = MotionDetector(
+            scale=settings.MOTION_SCALE, min_area=settings.MOTION_MIN_AREA
+        ) if settings.MOTION_DETECTION else None
+        # Трекер присваивает объектам постоянные идентификаторы,
+        # кадр сохраняется только при появлении новых объектов
+        self.tracker = IouTracker(
+            iou_threshold=settings.TRACK_IOU_THRESHOLD,
+            max_misses=settings.TRACK_MAX_MISSES,
+        ) if settings.TRACKING else None
+        self.frame_count = 0
+        # Перцептивный хэш последнего сохраненного кадра
+        self.last_hash = None
+        # Последний начатый видеоролик
+        self.clip = None
+        # Сохраняемые кадры и объекты, впервые попавшие на них
+        self.uploads = []
+
+    def __is_duplicate(self, frame_hash: int) -> bool:
+        '''Проверяет, совпадает ли кадр с последним сохраненным.'''
+
+        return self.last_hash is not None and hash_distance(
+            frame_hash, self.last_hash
+        ) <= settings.DUPLICATE_HASH_DISTANCE
+
+    def __save_detections(self, detected, tracks, file, original=None):
+        '''Сохраняет прямоугольники и количество распознанных объектов.'''
+
+        Detection.objects.bulk_create([
+            Detection(
+                file=file,
+                original=original,
+                camera_id=self.camera_id,
+                camera_url=self.camera_url,
+                object_class=object_class,
+                count=len(boxes),
+                boxes=[list(box) for box in boxes],
+                track_ids=[
+                    track.id for track in tracks.get(object_class, ())
+                ],
+                confidence=max(box.confidence for box in boxes),
+            )
+            for object_class, boxes in detected.items() if boxes
+        ])
+
+    def __track(self, detected: dict):
+        '''Сопоставляет распознанные объекты с отслеживаемыми.
+
+        Возвращает словарь треков объектов и список треков, кадры
+        с которыми еще не сохранялись.
+        '''
+
+        self.__check_uploads()
+        tracks = self.tracker.update(detected)
+        new_tracks = []
+        for object_tracks in tracks.values():
+            for track in object_tracks:
+                if track.hits == 1:
+                    metrics.TRACKS.inc(
+                        camera=self.camera_url,
+                        object_class=track.object_class,
+                    )
+                if not track.uploaded:
+                    new_tracks.append(track)
+        return tracks, new_tracks
+
+    def __check_uploads(self):
+        '''Возвращает в число несохраненных объекты кадров, которые
+        не удалось сохранить, чтобы кадр с ними был сохранен снова.'''
+
+        uploads = []
+        for encoded, tracks in self.uploads:
+            if not encoded.done.is_set():
+                uploads.append((encoded, tracks))
+            elif encoded.file is None:
+                for track in tracks:
+                    track.uploaded = False
+                    track.failed = True
+        self.uploads = uploads
+
+    def __stage(self, stage: str):
+        '''Замеряет длительность этапа обработки кадра.'''
+
+        return metrics.STAGE_SECONDS.time(camera=self.camera_url, stage=stage)
+
+    def handle(self, frame) -> EncodedFrame:
+        '''Распознает объекты на кадре и передает кадр с ними
+        на кодирование и сохранение.
+
+        Возвращает объект EncodedFrame, который сохраняется
+        в пуле кодирования, или None, если кадр не будет сохранен.
+        '''
+
+        with profiler.track(self.camera_url):
+            encoded, result = self.__handle(frame)
+        metrics.FRAMES.inc(camera=self.camera_url, result=result)
+        return encoded
+
+    def __handle(self, frame):
+        '''Обрабатывает кадр и возвращает пару (кадр, результат).'''
+
+        # Между распознаваниями положение объектов предсказывается
+        if self.tracker is not None:
+            self.tracker.predict()
+            self.frame_count += 1
+            if (self.frame_count - 1) % self.detect_every:
+                return None, 'tracked'
+
+        # Если в сцене нет движения, распознавание не выполняется,
+        # иначе выполняется только в области движения
+        region = None
+        if self.motion is not None:
+            with self.__stage('motion'):
+                region = self.motion.detect(frame)
+
+        if region == ():
+            if self.tracker is not None:
+                self.tracker.hold()
+            return None, 'no_motion'
+
+        # Кадр обрезается по областям распознавания камеры, пиксели
+        # вне многоугольников областей закрашиваются
+        image = frame
+        if self.roi is not None:
+            image, region = self.roi.apply(frame, region)
+            if region == ():
+                if self.tracker is not None:
+                    self.tracker.hold()
+                return None, 'outside_roi'
+
+        # Обнаружение объектов всех типов за один проход
+        with self.__stage('detect'):
+            if self.roi is not None:
+                detected = offset_boxes(
+                    self.detection.detect(image), *region[:2]
+                )
+            else:
+                detected = self.detection.detect(frame, region=region)
+        tracks, new_tracks = {}, []
+        if self.tracker is not None:
+            tracks, new_tracks = self.__track(detected)
+        items = [box for boxes in detected.values() for box in boxes]
+        if not items:
+            return None, 'no_objects'
+        # Кадр сохраняется только при появлении новых объектов
+        if self.tracker is not None and not new_tracks:
+            return None, 'no_new_objects'
+
+        # Почти одинаковые кадры (например, с припаркованным
+        # автомобилем) повторно не сохраняются; хэш вычисляется
+        # до рисования прямоугольников. Новый объект может почти
+        # не менять хэш кадра, поэтому кадры с объектами, впервые
+        # распознанными на этом кадре, и с объектами, кадр с которыми
+        # не удалось сохранить, сохраняются без сравнения хэшей.
+        # Объекты кадра, отброшенного пулом кодирования, сохраняются
+        # с первым кадром, отличающимся от последнего сохраненного.
+        with self.__stage('hash'):
+            frame_hash = perceptual_hash(frame)
+        forced = any(track.hits == 1 or track.failed for track in new_tracks)
+        if not forced and self.__is_duplicate(frame_hash):
+            logger.info('Кадр совпадает с последним сохраненным.')
+            return None, 'duplicate'
+
+        # Разметка, кодирование и сохранение кадра выполняются
+        # в пуле кодирования, распознавание их не ожидает
+        encoded = EncodedFrame(
+            self.camera_url,
+            frame,
+            items,
+            on_saved=lambda *files: self.__save_detections(
+                detected, tracks, *files
+            ),
+        )
+        if not self.encoder.submit(encoded):
+            logger.warning(
+                f'Пул кодирования не успевает, кадр {self.camera_url} '
+                'отброшен.'
+            )
+            return None, 'dropped'
+        # Объекты считаются сохраненными только после передачи кадра
+        # в пул; если сохранить кадр не удастся, он будет сохранен
+        # при следующем распознавании объектов
+        for track in new_tracks:
+            track.uploaded = True
+            track.failed = False
+        if new_tracks:
+            self.uploads.append((encoded, new_tracks))
+        self.last_hash = frame_hash
+        if self.recorder is not None:
+            self.clip = self.recorder.trigger()
+        return encoded, 'queued'
 
 
 class VideoCatch:
@@ -90,44 +412,32 @@ class VideoCatch:
         self.interval = camera_config.interval
         self.last_detection_time = time.time()
         self.stream = cv2.VideoCapture(self.camera_url)
-        self.detection = detection.get_detection()
-
-    def __get_stream(self):
-        '''Возвращает кадр с камеры.'''
-
-        return self.stream.read()
-
-    def __send_api_request(self, data, headers):
-        return requests.post(
-            f'{settings.DOMAIN}/api/files/', data=data, headers=headers
+        self.recorder = (
+            get_recorder(self.stream) if camera_config.record else None
         )
-
-    def __create_rectangles(self, items, frame):
-        '''Создает желтые прямоугольники вокруг распознанных объектов.'''
-
-        for (x, y, w, h) in items:
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 255), 2)
-
-    def __get_base64_image(self, buffer):
-        '''Представляет контент фрейма в кодировке Base64.'''
-
-        return (
-            'data:image/jpeg;base64,' +
-            base64.b64encode(buffer).decode('utf-8')
+        self.grabber = FrameGrabber(
+            self.stream,
+            buffer_size=settings.FRAME_BUFFER_SIZE,
+            listener=self.recorder.add if self.recorder else None,
+        )
+        self.handler = FrameHandler(
+            self.camera_url,
+            detection,
+            recorder=self.recorder,
+            camera_id=camera_config.camera_id,
         )
 
-    def __get_request_params(self, content):
-        '''Возвращает контент и заголовки запроса.'''
+    def __get_stream(self, timeout: float):
+        '''Возвращает самый свежий кадр с камеры.'''
 
-        data = json.dumps({'file': content})
-        headers = {
-            'Content-Type': 'application/json',
-        }
-        return data, headers
+        return self.grabber.read(timeout=timeout)
 
     def __stop_stream(self):
         '''Останавливает обработку видеопотока.'''
 
+        self.grabber.stop()
+        if self.recorder is not None:
+            self.recorder.close(timeout=settings.CLIP_MAX_DURATION)
         self.stream.release()
         cv2.destroyAllWindows()
 
@@ -137,50 +447,46 @@ class VideoCatch:
 
         logger.info(f'Подключение к камере: {self.camera_url}...')
         start_time = time.time()
+        self.grabber.start()
         while True:
-            success, frame = self.__get_stream()
+            current_time = time.time()
+            remaining_time = settings.ALLOWED_TIMEOUT - (
+                current_time - start_time
+            )
+            if remaining_time <= 0:
+                break
+            # Кадры декодируются только к моменту очередного распознавания,
+            # в остальное время поток лишь захватывает их без декодирования
+            wait_time = self.interval - (
+                current_time - self.last_detection_time
+            )
+            if wait_time > 0:
+                time.sleep(min(wait_time, remaining_time))
+                continue
+            with metrics.STAGE_SECONDS.time(
+                camera=self.camera_url, stage='read'
+            ):
+                success, frame = self.__get_stream(timeout=remaining_time)
             if not success:
                 logger.error(
                     'Не удалось подключиться к камере по url '
                     f'{self.camera_url}'
                 )
                 break
-            current_time = time.time()
-            if current_time - start_time > settings.ALLOWED_TIMEOUT:
-                break
-            if current_time - self.last_detection_time >= self.interval:
-                # Преобразование в оттенки серого
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-                # Обнаружение объектов
-                items = self.detection.detectMultiScale(
-                    gray, scaleFactor=1.1, minNeighbors=3, minSize=(30, 30)
-                )
-                # Рисование прямоугольников вокруг обнаруженных объектов
-                self.__create_rectangles(items, frame)
-
-                if len(items):
-                    # Получение массива данных фрейма
-                    _, buffer = cv2.imencode('.jpg', frame)
-
-                    # Представление в кодировке Base64
-                    image_base64 = self.__get_base64_image(buffer)
-
-                    # Создание данных для API запроса
-                    data, headers = self.__get_request_params(image_base64)
-
-                    # Отправка данных через API для сохранения изображение
-                    # с распознанными объектами
-                    response = self.__send_api_request(data, headers)
-                    if response.status_code != HTTPStatus.CREATED:
-                        logger.error(
-                            'Произошла ошибка при отправке запроса на '
-                            'сохранение файла.'
-                        )
-                        break
-                    logger.info('Файл успешно сохранен.')
-                    obj = response.json()
-                    self.__stop_stream()
-                    return obj.get('file')
-            self.last_detection_time = current_time
+            self.last_detection_time = time.time()
+
+            encoded = self.handler.handle(frame)
+            if encoded is not None:
+                # Поток захвата продолжает работу, пока кадр сохраняется
+                encoded.done.wait(timeout=remaining_time)
+                if encoded.file is None:
+                    continue
+                if self.handler.clip is not None:
+                    # Захват кадров продолжается до окончания записи
+                    # видеоролика после события
+                    self.handler.clip.done.wait(
+                        timeout=settings.CLIP_MAX_DURATION
+                    )
+                self.__stop_stream()
+                return encoded.file.file.url
         self.__stop_stream()
@@ -0,0 +1,120 @@
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+from vision.registry import classifiers
+
+
+class Box(NamedTuple):
+    '''Прямоугольник распознанного объекта и уверенность каскада.'''
+
+    x: int
+    y: int
+    w: int
+    h: int
+    confidence: float
+
+
+class DetectionPass:
+    '''Класс для распознавания нескольких типов объектов за один проход.
+
+    Кадр переводится в оттенки серого и масштабируется один раз,
+    после чего полученная пирамида изображений используется всеми
+    каскадами. Координаты найденных объектов переводятся обратно
+    в разрешение исходного кадра.
+    '''
+
+    # Порог перекрытия для объединения объектов, найденных на разных
+    # уровнях пирамиды
+    nms_threshold = 0.4
+
+    def __init__(
+        self,
+        object_types,
+        scales=(1.0,),
+        scale_factor: float = 1.1,
+        min_neighbors: int = 3,
+        min_size=(30, 30),
+    ):
+        self.object_types = [
+            object_type.lower() for object_type in object_types
+        ]
+        self.scales = sorted(set(scales), reverse=True)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def get_pyramid(self, gray):
+        '''Возвращает уровни пирамиды изображений в виде (масштаб, кадр).'''
+
+        pyramid = []
+        for scale in self.scales:
+            if scale == 1:
+                pyramid.append((1.0, gray))
+                continue
+            pyramid.append((scale, cv2.resize(
+                gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+            )))
+        return pyramid
+
+    def detect_on_pyramid(self, classifier, pyramid):
+        '''Распознает объекты одним каскадом на всех уровнях пирамиды.'''
+
+        boxes = []
+        for scale, image in pyramid:
+            min_size = tuple(
+                max(1, round(size * scale)) for size in self.min_size
+            )
+            # detectMultiScale3 дополнительно возвращает веса последней
+            # стадии каскада, которые используются как уверенность
+            items, _, weights = classifier.detectMultiScale3(
+                image,
+                scaleFactor=self.scale_factor,
+                minNeighbors=self.min_neighbors,
+                minSize=min_size,
+                outputRejectLevels=True,
+            )
+            for (x, y, w, h), weight in zip(items, np.ravel(weights)):
+                boxes.append(Box(
+                    *(int(round(value / scale)) for value in (x, y, w, h)),
+                    confidence=float(weight),
+                ))
+        if len(pyramid) > 1 and len(boxes) > 1:
+            indices = cv2.dnn.NMSBoxes(
+                [box[:4] for box in boxes],
+                [box.confidence for box in boxes],
+                float('-inf'),
+                self.nms_threshold,
+            )
+            boxes = [boxes[index] for index in np.array(indices).flatten()]
+        return boxes
+
+    def detect(self, frame, region=None) -> dict:
+        '''Возвращает словарь {тип объекта: [Box, ...]}.
+
+        Если передана область (x, y, w, h), распознавание выполняется
+        только в ней, а координаты объектов переводятся в координаты
+        исходного кадра.
+        '''
+
+        offset_x = offset_y = 0
+        if region:
+            offset_x, offset_y, width, height = region
+            frame = frame[
+                offset_y:offset_y + height, offset_x:offset_x + width
+            ]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        pyramid = self.get_pyramid(gray)
+        detected = {}
+        for object_type in self.object_types:
+            boxes = self.detect_on_pyramid(
+                classifiers.get(object_type), pyramid
+            )
+            if offset_x or offset_y:
+                boxes = [
+                    box._replace(x=box.x + offset_x, y=box.y + offset_y)
+                    for box in boxes
+                ]
+            detected[object_type] = boxes
+        return detected
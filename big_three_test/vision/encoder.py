@@ -0,0 +1,209 @@
+import logging
+import queue
+import threading
+
+import cv2
+from django.conf import settings
+from django.db import close_old_connections
+
+from files.services import save_content
+from vision import metrics
+
+logger = logging.getLogger('vision')
+
+# Параметры кодирования для поддерживаемых форматов
+QUALITY_PARAMS = {
+    'jpg': cv2.IMWRITE_JPEG_QUALITY,
+    'webp': cv2.IMWRITE_WEBP_QUALITY,
+}
+
+
+def create_rectangles(items, frame, scale: float = 1):
+    '''Создает желтые прямоугольники вокруг распознанных объектов.
+
+    scale - коэффициент пересчета координат прямоугольников
+    для уменьшенного кадра.
+    '''
+
+    for (x, y, w, h, _) in items:
+        x, y, w, h = (round(value * scale) for value in (x, y, w, h))
+        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 255), 2)
+
+
+class EncodedFrame:
+    '''Кадр, ожидающий кодирования и сохранения.'''
+
+    def __init__(self, camera_url: str, frame, items, on_saved=None):
+        self.camera_url = camera_url
+        self.frame = frame
+        self.items = items
+        # Обработчик сохранения, получающий размеченный
+        # и исходный объекты File
+        self.on_saved = on_saved
+        # Кадр с прямоугольниками и исходный кадр без разметки
+        self.file = None
+        self.original = None
+        self.done = threading.Event()
+
+
+class FrameEncoder:
+    '''Класс для кодирования и сохранения кадров в пуле потоков.
+
+    Кадры передаются в пул через ограниченную очередь, поэтому
+    захват и распознавание кадров не ожидают кодирования
+    и сохранения: если пул не успевает, новые кадры отбрасываются.
+    Прямоугольники рисуются на копии кадра в потоке пула; при
+    keep_original вместе с ней сохраняется исходный кадр без разметки.
+    '''
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 8,
+        format: str = 'jpg',
+        quality: int = 90,
+        max_width: int = None,
+        keep_original: bool = False,
+    ):
+        if format not in QUALITY_PARAMS:
+            raise ValueError(
+                f'Формат {format} не поддерживается, допустимые форматы: '
+                f'{", ".join(QUALITY_PARAMS)}.'
+            )
+        self.format = format
+        self.quality = quality
+        # Кадры шире max_width уменьшаются перед кодированием
+        self.max_width = max_width
+        self.keep_original = keep_original
+        self.dropped_count = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(
+                target=self._work, daemon=True, name=f'encoder {index}'
+            )
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, encoded: EncodedFrame) -> bool:
+        '''Передает кадр в пул без ожидания.
+
+        Возвращает False, если очередь заполнена и кадр отброшен.
+        '''
+
+        with self._condition:
+            try:
+                self._queue.put_nowait(encoded)
+            except queue.Full:
+                self.dropped_count += 1
+                return False
+            self._pending += 1
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        '''Ожидает сохранения всех переданных в пул кадров.'''
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending == 0, timeout=timeout
+            )
+
+    def encode(self, frame) -> bytes:
+        '''Кодирует кадр в заданном формате.'''
+
+        success, buffer = cv2.imencode(
+            f'.{self.format}',
+            frame,
+            [QUALITY_PARAMS[self.format], self.quality],
+        )
+        if not success:
+            raise ValueError('Не удалось закодировать кадр.')
+        return buffer.tobytes()
+
+    def resize(self, frame):
+        '''Уменьшает кадр до max_width и возвращает его с масштабом.'''
+
+        width = frame.shape[1]
+        if not self.max_width or width <= self.max_width:
+            return frame, 1
+        scale = self.max_width / width
+        frame = cv2.resize(
+            frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+        return frame, scale
+
+    def process(self, encoded: EncodedFrame):
+        '''Размечает, кодирует и сохраняет кадр.'''
+
+        def stage(name):
+            return metrics.STAGE_SECONDS.time(
+                camera=encoded.camera_url, stage=name
+            )
+
+        # Прямоугольники рисуются на копии кадра, так как исходный
+        # кадр может записываться в видеоролик или сохраняться;
+        # уменьшенный кадр уже является копией
+        with stage('annotate'):
+            original, scale = self.resize(encoded.frame)
+            frame = original
+            if self.keep_original or original is encoded.frame:
+                frame = original.copy()
+            create_rectangles(encoded.items, frame, scale)
+        with stage('encode'):
+            content = self.encode(frame)
+            original_content = (
+                self.encode(original) if self.keep_original else None
+            )
+        with stage('save'):
+            self.save(encoded, content, original_content)
+
+    def save(self, encoded: EncodedFrame, content: bytes, original_content):
+        '''Сохраняет закодированный кадр и исходный кадр (если он есть).'''
+
+        encoded.file = save_content(content, self.format)
+        if original_content is not None:
+            encoded.original = save_content(original_content, self.format)
+        if encoded.on_saved is not None:
+            encoded.on_saved(encoded.file, encoded.original)
+        logger.info('Файл успешно сохранен.')
+
+    def _work(self):
+        while True:
+            encoded = self._queue.get()
+            try:
+                self.process(encoded)
+            except Exception:
+                logger.exception(
+                    f'Не удалось сохранить кадр {encoded.camera_url}'
+                )
+            finally:
+                close_old_connections()
+                encoded.frame = None
+                encoded.done.set()
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify_all()
+
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder() -> FrameEncoder:
+    '''Возвращает пул кодирования кадров, общий для процесса.'''
+
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = FrameEncoder(
+                workers=settings.FRAME_ENCODER_WORKERS,
+                queue_size=settings.FRAME_ENCODER_QUEUE_SIZE,
+                format=settings.FRAME_FORMAT,
+                quality=settings.FRAME_QUALITY,
+                max_width=settings.FRAME_MAX_WIDTH,
+                keep_original=settings.FRAME_KEEP_ORIGINAL,
+            )
+        return _encoder
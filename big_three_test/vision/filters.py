@@ -0,0 +1,26 @@
+from django_filters import rest_framework as filters
+
+from vision.models import Detection
+
+
+class DetectionFilter(filters.FilterSet):
+    camera = filters.CharFilter(field_name='camera_url')
+    object_class = filters.CharFilter(field_name='object_class')
+    created_after = filters.DateTimeFilter(
+        field_name='created', lookup_expr='gte'
+    )
+    created_before = filters.DateTimeFilter(
+        field_name='created', lookup_expr='lte'
+    )
+    count_min = filters.NumberFilter(field_name='count', lookup_expr='gte')
+
+    class Meta:
+        model = Detection
+        fields = [
+            'camera',
+            'object_class',
+            'file',
+            'created_after',
+            'created_before',
+            'count_min',
+        ]
@@ -1,5 +1,26 @@
 from django import forms
+from django.conf import settings
+
+from vision.backends import get_backend_class
+
+
+def get_object_type_choices():
+    backend_class = get_backend_class(settings.DETECTION_BACKEND)
+    return [
+        (name, name) for name in sorted(backend_class.get_allowed_types())
+    ]
 
 
 class CameraForm(forms.Form):
     camera_url = forms.URLField(label='URL камеры', required=True)
+    object_types = forms.MultipleChoiceField(
+        label='Типы объектов',
+        choices=get_object_type_choices,
+        initial=['cars'],
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+
+    def clean_object_types(self):
+        # Если типы объектов не выбраны, распознаются автомобили
+        return self.cleaned_data.get('object_types') or ['cars']
@@ -0,0 +1,93 @@
+import collections
+import logging
+import threading
+
+import cv2
+
+logger = logging.getLogger('vision')
+
+
+class FrameGrabber(threading.Thread):
+    '''Поток для непрерывного захвата кадров видеопотока.
+
+    Кадры захватываются методом grab() без декодирования, чтобы
+    не отставать от потока. Декодирование (retrieve()) выполняется
+    только по запросу, а результат помещается в кольцевой буфер
+    последних кадров. Если передан обработчик кадров (listener),
+    декодируется каждый кадр и передается обработчику, например
+    для записи видеороликов.
+    '''
+
+    def __init__(
+        self,
+        stream: cv2.VideoCapture,
+        buffer_size: int = 2,
+        listener=None,
+    ):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.listener = listener
+        self.frames = collections.deque(maxlen=buffer_size)
+        self.grabbed_count = 0
+        self.retrieved_count = 0
+        self.failed = False
+        self._retrieve_requested = False
+        self._stopped = threading.Event()
+        self._condition = threading.Condition()
+
+    def run(self):
+        while not self._stopped.is_set():
+            if not self.stream.grab():
+                with self._condition:
+                    self.failed = True
+                    self._condition.notify_all()
+                break
+            self.grabbed_count += 1
+            if not self._retrieve_requested and self.listener is None:
+                continue
+            success, frame = self.stream.retrieve()
+            if success and self.listener is not None:
+                self.listener(frame)
+            with self._condition:
+                self._retrieve_requested = False
+                if success:
+                    self.frames.append(frame)
+                    self.retrieved_count += 1
+                else:
+                    self.failed = True
+                self._condition.notify_all()
+            if not success:
+                break
+
+    def read(self, timeout: float = None):
+        '''Запрашивает декодирование ближайшего кадра и возвращает его.
+
+        Возвращает кортеж (success, frame) по аналогии с
+        cv2.VideoCapture.read().
+        '''
+
+        with self._condition:
+            if self.failed:
+                return False, None
+            retrieved = self.retrieved_count
+            self._retrieve_requested = True
+            self._condition.wait_for(
+                lambda: (
+                    self.retrieved_count > retrieved
+                    or self.failed
+                    or self._stopped.is_set()
+                ),
+                timeout=timeout,
+            )
+            if self.retrieved_count == retrieved:
+                return False, None
+            return True, self.frames[-1]
+
+    def stop(self, timeout: float = 5):
+        '''Останавливает захват кадров.'''
+
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=timeout)
@@ -0,0 +1,194 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from big_three_test.metrics import default_registry
+from vision.models import Camera, DetectionJob
+from vision.profiling import profiler
+
+logger = logging.getLogger('vision')
+
+_executor = None
+_executor_lock = threading.Lock()
+_submit_lock = threading.Lock()
+
+
+class JobQueueFull(Exception):
+    '''Исключение при переполнении очереди задач распознавания.'''
+
+
+def _init_worker():
+    '''Инициализирует Django в дочернем процессе пула.'''
+
+    django.setup()
+
+
+def run_detection_job(job_id: int):
+    '''Выполняет задачу распознавания в дочернем процессе пула.'''
+
+    from vision.camera_vision import CameraConfig, DetectionConfig, VideoCatch
+
+    close_old_connections()
+    # Задача переводится в статус "выполняется" только из статуса
+    # "в очереди", что исключает ее повторный запуск
+    started = DetectionJob.objects.filter(
+        pk=job_id, status=DetectionJob.PENDING
+    ).update(status=DetectionJob.RUNNING, updated=timezone.now())
+    if not started:
+        return
+    job = DetectionJob.objects.select_related('camera').get(pk=job_id)
+    try:
+        # Для камер из реестра используются их параметры распознавания
+        if job.camera is not None:
+            camera_config = CameraConfig.from_camera(job.camera)
+            detection = DetectionConfig.from_camera(
+                job.camera, object_types=job.object_types
+            )
+        else:
+            camera_config = CameraConfig(camera_url=job.camera_url)
+            detection = DetectionConfig(object_types=job.object_types)
+        video_stream = VideoCatch(
+            camera_config=camera_config, detection=detection
+        )
+        result = video_stream.process()
+    except Exception as error:
+        logger.exception(f'Ошибка при выполнении задачи {job_id}')
+        job.status = DetectionJob.FAILED
+        job.error = str(error)
+    else:
+        if result:
+            job.status = DetectionJob.DONE
+            job.result = result
+        else:
+            job.status = DetectionJob.FAILED
+            job.error = 'Объекты не были распознаны за отведенное время.'
+    job.save(update_fields=['status', 'result', 'error', 'updated'])
+    close_old_connections()
+
+
+def run_in_worker(job_id: int) -> dict:
+    '''Выполняет задачу в дочернем процессе пула и возвращает метрики
+    и стеки профилировщика, накопленные процессом после предыдущей
+    переданной задачи.
+
+    Метрики и стеки хранятся в памяти процесса, поэтому передаются
+    вместе с результатом задачи: метрики добавляются к метрикам
+    веб-процесса, отдающего их по адресу /metrics, а стеки
+    сохраняются им в VISION_PROFILE_DIR.
+    '''
+
+    run_detection_job(job_id)
+    return {
+        'metrics': default_registry.drain(),
+        'stacks': profiler.drain(),
+    }
+
+
+def get_executor() -> ProcessPoolExecutor:
+    '''Возвращает пул процессов для выполнения задач распознавания.'''
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Используется контекст spawn, чтобы дочерние процессы
+            # не наследовали открытые соединения с БД
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.DETECTION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+    return _executor
+
+
+def _on_job_done(job_id: int):
+    '''Возвращает обработчик завершения задачи в пуле.'''
+
+    def callback(future):
+        error = future.exception()
+        if error is None:
+            result = future.result() or {}
+            default_registry.merge(result.get('metrics', {}))
+            stacks = result.get('stacks')
+            if stacks:
+                profiler.merge(stacks)
+                try:
+                    profiler.dump(settings.VISION_PROFILE_DIR)
+                except OSError:
+                    logger.exception(
+                        'Не удалось сохранить стеки профилировщика'
+                    )
+            return
+        logger.error(f'Задача {job_id} завершилась с ошибкой: {error}')
+        DetectionJob.objects.filter(
+            pk=job_id, status__in=(DetectionJob.PENDING, DetectionJob.RUNNING)
+        ).update(status=DetectionJob.FAILED, error=str(error))
+
+    return callback
+
+
+def enqueue(job_id: int):
+    '''Передает задачу в пул процессов.'''
+
+    future = get_executor().submit(run_in_worker, job_id)
+    future.add_done_callback(_on_job_done(job_id))
+    return future
+
+
+def fail_stale_jobs() -> int:
+    '''Завершает с ошибкой задачи, потерянные пулом процессов.
+
+    Задачи в очереди и в работе, не изменявшиеся дольше
+    DETECTION_JOB_TIMEOUT (например, оставшиеся после перезапуска
+    веб-процесса), иначе навсегда занимали бы место в очереди.
+    '''
+
+    stale_before = timezone.now() - timedelta(
+        seconds=settings.DETECTION_JOB_TIMEOUT
+    )
+    count = DetectionJob.objects.filter(
+        status__in=(DetectionJob.PENDING, DetectionJob.RUNNING),
+        updated__lt=stale_before,
+    ).update(
+        status=DetectionJob.FAILED,
+        error='Задача не была выполнена за отведенное время.',
+        updated=timezone.now(),
+    )
+    if count:
+        logger.warning(f'Завершено потерянных задач распознавания: {count}')
+    return count
+
+
+def submit_job(camera_url: str, object_types) -> DetectionJob:
+    '''Создает задачу распознавания и ставит ее в очередь.
+
+    Проверка размера очереди и создание задачи выполняются под
+    блокировкой процесса и блокировкой строк активных задач, чтобы
+    одновременные запросы не превышали DETECTION_QUEUE_SIZE.
+    '''
+
+    with _submit_lock, transaction.atomic():
+        fail_stale_jobs()
+        active_jobs = list(
+            DetectionJob.objects.select_for_update()
+            .filter(status__in=(DetectionJob.PENDING, DetectionJob.RUNNING))
+            .values_list('pk', flat=True)
+        )
+        if len(active_jobs) >= settings.DETECTION_QUEUE_SIZE:
+            raise JobQueueFull(
+                'Очередь задач распознавания переполнена, '
+                'повторите попытку позже.'
+            )
+        job = DetectionJob.objects.create(
+            camera=Camera.objects.filter(url=camera_url).first(),
+            camera_url=camera_url,
+            object_types=list(object_types),
+        )
+    transaction.on_commit(lambda: enqueue(job.pk))
+    return job
@@ -0,0 +1,229 @@
+import collections
+import json
+import logging
+import threading
+import time
+
+import cv2
+from django.conf import settings
+from django.utils import timezone
+
+from vision.camera_vision import DetectionConfig
+from vision.encoder import create_rectangles
+from vision.grabber import FrameGrabber
+from vision.motion import MotionDetector
+
+logger = logging.getLogger('vision')
+
+
+class LivePipeline(threading.Thread):
+    '''Поток распознавания для просмотра камеры в реальном времени.
+
+    Для каждой пары (камера, типы объектов) работает один поток,
+    общий для всех зрителей: он декодирует кадры с частотой LIVE_FPS,
+    распознает на них объекты и публикует последний кадр
+    с прямоугольниками в формате JPEG и события распознавания.
+    Кадры в хранилище не сохраняются.
+    '''
+
+    def __init__(self, camera_url: str, object_types):
+        super().__init__(daemon=True, name=f'live {camera_url}')
+        self.camera_url = camera_url
+        self.key = self.get_key(camera_url, object_types)
+        self.detection = DetectionConfig(
+            object_types=object_types
+        ).get_detection()
+        self.motion = MotionDetector(
+            scale=settings.MOTION_SCALE, min_area=settings.MOTION_MIN_AREA
+        ) if settings.MOTION_DETECTION else None
+        # Количество подключенных зрителей
+        self.subscribers = 0
+        # Номер последнего опубликованного кадра
+        self.sequence = 0
+        self.frame = None
+        self.events = collections.deque(maxlen=settings.LIVE_EVENTS_SIZE)
+        self.finished = False
+        self._stopped = threading.Event()
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def get_key(camera_url: str, object_types) -> tuple:
+        return camera_url, tuple(sorted(object_types))
+
+    def run(self):
+        stream = cv2.VideoCapture(self.camera_url)
+        grabber = FrameGrabber(stream, buffer_size=1)
+        grabber.start()
+        period = 1 / settings.LIVE_FPS
+        try:
+            while not self._stopped.is_set():
+                start_time = time.monotonic()
+                success, frame = grabber.read(timeout=settings.LIVE_TIMEOUT)
+                if not success:
+                    logger.error(
+                        f'Не удалось подключиться к камере {self.camera_url}'
+                    )
+                    self.publish(None, {
+                        'type': 'error',
+                        'detail': 'Не удалось получить кадр с камеры.',
+                    })
+                    break
+                self.process(frame)
+                self._stopped.wait(
+                    max(period - (time.monotonic() - start_time), 0)
+                )
+        finally:
+            grabber.stop()
+            stream.release()
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+
+    def process(self, frame):
+        '''Распознает объекты на кадре и публикует результат.'''
+
+        detected = {}
+        region = self.motion.detect(frame) if self.motion else None
+        if region != ():
+            detected = self.detection.detect(frame, region=region)
+        items = [box for boxes in detected.values() for box in boxes]
+        frame = frame.copy()
+        create_rectangles(items, frame)
+        success, buffer = cv2.imencode(
+            '.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, settings.LIVE_QUALITY]
+        )
+        if not success:
+            logger.error('Не удалось закодировать кадр.')
+            return
+        event = None
+        if items:
+            event = {
+                'type': 'detection',
+                'created': timezone.now().isoformat(),
+                'camera_url': self.camera_url,
+                'objects': {
+                    object_class: [list(box) for box in boxes]
+                    for object_class, boxes in detected.items() if boxes
+                },
+            }
+        self.publish(buffer.tobytes(), event)
+
+    def publish(self, frame: bytes = None, event: dict = None):
+        '''Публикует кадр и событие для зрителей.'''
+
+        with self._condition:
+            self.sequence += 1
+            if frame is not None:
+                self.frame = frame
+            if event is not None:
+                self.events.append((self.sequence, event))
+            self._condition.notify_all()
+
+    def wait(self, sequence: int, timeout: float = None) -> int:
+        '''Ожидает публикации кадра с номером больше sequence и
+        возвращает номер последнего кадра.'''
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.sequence > sequence or self.finished,
+                timeout=timeout,
+            )
+            return self.sequence
+
+    def get_events(self, sequence: int) -> list:
+        '''Возвращает события, опубликованные после кадра sequence.'''
+
+        with self._condition:
+            return [
+                event for number, event in self.events if number > sequence
+            ]
+
+    def stop(self):
+        self._stopped.set()
+
+
+class LivePipelines:
+    '''Реестр потоков просмотра камер с подсчетом зрителей.
+
+    Поток запускается при подключении первого зрителя и
+    останавливается при отключении последнего.
+    '''
+
+    def __init__(self):
+        self._pipelines = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, camera_url: str, object_types) -> LivePipeline:
+        '''Подключает зрителя к потоку камеры.'''
+
+        key = LivePipeline.get_key(camera_url, object_types)
+        with self._lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is None or pipeline.finished:
+                pipeline = LivePipeline(camera_url, object_types)
+                pipeline.start()
+                self._pipelines[key] = pipeline
+            pipeline.subscribers += 1
+            return pipeline
+
+    def release(self, pipeline: LivePipeline):
+        '''Отключает зрителя от потока камеры.'''
+
+        with self._lock:
+            pipeline.subscribers -= 1
+            if pipeline.subscribers > 0:
+                return
+            pipeline.stop()
+            if self._pipelines.get(pipeline.key) is pipeline:
+                del self._pipelines[pipeline.key]
+
+
+pipelines = LivePipelines()
+
+
+def stream_frames(camera_url: str, object_types):
+    '''Генератор потока MJPEG (multipart/x-mixed-replace).
+
+    Зритель подключается к потоку камеры при начале чтения ответа,
+    а отключается при его закрытии.
+    '''
+
+    pipeline = pipelines.acquire(camera_url, object_types)
+    sequence = 0
+    try:
+        while not pipeline.finished:
+            number = pipeline.wait(sequence, timeout=settings.LIVE_TIMEOUT)
+            if number == sequence or pipeline.frame is None:
+                continue
+            sequence, frame = number, pipeline.frame
+            yield (
+                b'--frame\r\nContent-Type: image/jpeg\r\n'
+                b'Content-Length: ' + str(len(frame)).encode() + b'\r\n\r\n'
+                + frame + b'\r\n'
+            )
+    finally:
+        pipelines.release(pipeline)
+
+
+def stream_events(camera_url: str, object_types):
+    '''Генератор событий распознавания (Server-Sent Events).'''
+
+    pipeline = pipelines.acquire(camera_url, object_types)
+    sequence = pipeline.sequence
+    try:
+        while True:
+            number = pipeline.wait(sequence, timeout=settings.LIVE_TIMEOUT)
+            if number == sequence and not pipeline.finished:
+                # Комментарий поддерживает соединение открытым
+                yield ': keep-alive\n\n'
+                continue
+            for event in pipeline.get_events(sequence):
+                yield (
+                    f'event: {event["type"]}\n'
+                    f'data: {json.dumps(event, ensure_ascii=False)}\n\n'
+                )
+            sequence = number
+            if pipeline.finished:
+                break
+    finally:
+        pipelines.release(pipeline)
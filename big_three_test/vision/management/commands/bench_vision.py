@@ -0,0 +1,111 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from big_three_test.benchmarks import write_results
+from vision import benchmarks
+from vision.backends import BACKENDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет производительность этапов обработки кадров '
+        '(чтение, определение движения, распознавание, кодирование) '
+        'обработчиком кадров камеры на локальном видеоролике '
+        'и сохраняет результаты в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--video',
+            help=(
+                'Путь к видеоролику. По умолчанию создается синтетический '
+                'ролик с движущимися объектами.'
+            ),
+        )
+        parser.add_argument(
+            '--frames',
+            type=int,
+            default=300,
+            help='Количество обрабатываемых кадров.',
+        )
+        parser.add_argument('--width', type=int, default=1280)
+        parser.add_argument('--height', type=int, default=720)
+        parser.add_argument(
+            '--object-types',
+            nargs='+',
+            default=['cars'],
+            help='Типы распознаваемых объектов.',
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(BACKENDS),
+            default=settings.DETECTION_BACKEND,
+            help='Движок распознавания.',
+        )
+        parser.add_argument(
+            '--scales',
+            type=float,
+            nargs='+',
+            help='Масштабы пирамиды изображений.',
+        )
+        parser.add_argument(
+            '--roi',
+            type=json.loads,
+            help=(
+                'Области распознавания в формате JSON: список '
+                'многоугольников в долях ширины и высоты кадра.'
+            ),
+        )
+        parser.add_argument(
+            '--no-motion',
+            action='store_true',
+            help='Не использовать определение движения.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл результатов в формате JSON.',
+        )
+
+    def handle(self, *args, **options):
+        params = {
+            key: options[key] for key in (
+                'video', 'frames', 'width', 'height', 'object_types',
+                'backend', 'scales', 'roi', 'no_motion',
+            )
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            video_path = options['video']
+            if not video_path:
+                video_path = benchmarks.create_fixture(
+                    Path(directory) / 'fixture.mp4',
+                    frames=options['frames'],
+                    width=options['width'],
+                    height=options['height'],
+                )
+            results = benchmarks.run(
+                video_path,
+                object_types=options['object_types'],
+                backend=options['backend'],
+                scales=options['scales'],
+                motion=not options['no_motion'],
+                frames=options['frames'],
+                roi=options['roi'],
+            )
+        report = write_results('vision', params, results, options['output'])
+        if not options['output']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        for stage, stats in results['stages'].items():
+            if stats['count']:
+                self.stdout.write(
+                    f'{stage}: {stats["per_second"]} кадр/с, '
+                    f'p95 {stats["p95_ms"]} мс'
+                )
+        self.stdout.write(
+            f'Всего: {results["pipeline"]["per_second"]} кадр/с, '
+            f'результаты сохранены в {options["output"]}'
+        )
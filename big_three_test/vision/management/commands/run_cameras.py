@@ -0,0 +1,164 @@
+import signal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from big_three_test.metrics import start_metrics_server
+from vision.backends import BACKENDS
+from vision.camera_vision import CameraConfig, DetectionConfig
+from vision.models import Camera
+from vision.profiling import profiler
+from vision.supervisor import CameraSupervisor
+
+
+class Command(BaseCommand):
+    help = (
+        'Непрерывно обрабатывает видеопотоки нескольких камер '
+        'с распознаванием объектов. Если адреса камер не переданы, '
+        'обрабатываются включенные камеры реестра с их параметрами. '
+        'Останавливается по SIGINT/SIGTERM.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'camera_urls',
+            nargs='*',
+            help='Адреса видеопотоков камер.',
+        )
+        parser.add_argument(
+            '--object-types',
+            nargs='+',
+            help=(
+                'Типы распознаваемых объектов (по умолчанию cars, для камер '
+                'реестра - типы объектов камеры).'
+            ),
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(BACKENDS),
+            help='Движок распознавания.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Интервал между обрабатываемыми кадрами в секундах.',
+        )
+        parser.add_argument(
+            '--detect-every',
+            type=int,
+            help=(
+                'Распознавание выполняется на каждом N-м кадре, '
+                'на остальных объекты отслеживаются трекером.'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.CAMERA_DETECTION_WORKERS,
+            help='Размер общего пула распознавания.',
+        )
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=settings.CAMERA_QUEUE_SIZE,
+            help='Количество кадров, ожидающих распознавания, на камеру.',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help='Порт HTTP-сервера метрик в формате Prometheus.',
+        )
+        parser.add_argument(
+            '--profile',
+            nargs='+',
+            default=[],
+            metavar='CAMERA_URL',
+            help='Камеры, обработка кадров которых профилируется.',
+        )
+        parser.add_argument(
+            '--profile-dir',
+            default=settings.VISION_PROFILE_DIR,
+            help='Каталог для результатов профилирования.',
+        )
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='Сохранять видеоролики с событиями распознавания.',
+        )
+
+    def get_cameras(self, options) -> list:
+        '''Возвращает пары (CameraConfig, DetectionConfig) камер.'''
+
+        if options['camera_urls']:
+            return [
+                (
+                    CameraConfig(
+                        camera_url=camera_url,
+                        interval=options['interval'],
+                        record=options['record'],
+                    ),
+                    DetectionConfig(
+                        object_types=options['object_types'] or ['cars'],
+                        backend=options['backend'],
+                        detect_every=options['detect_every'],
+                    ),
+                )
+                for camera_url in options['camera_urls']
+            ]
+        cameras = []
+        for camera in Camera.objects.filter(enabled=True):
+            camera_config = CameraConfig.from_camera(camera)
+            # Переданные параметры команды заменяют параметры камер
+            if options['interval']:
+                camera_config.interval = options['interval']
+            if options['record']:
+                camera_config.record = True
+            detection = DetectionConfig.from_camera(
+                camera,
+                object_types=options['object_types'],
+                backend=options['backend'],
+                detect_every=options['detect_every'],
+            )
+            cameras.append((camera_config, detection))
+        return cameras
+
+    def handle(self, *args, **options):
+        try:
+            cameras = self.get_cameras(options)
+        except (AssertionError, ImproperlyConfigured) as error:
+            raise CommandError(str(error))
+        if not cameras:
+            raise CommandError('Нет включенных камер в реестре камер.')
+        try:
+            supervisor = CameraSupervisor(
+                cameras,
+                workers=options['workers'],
+                queue_size=options['queue_size'],
+            )
+        except (AssertionError, ImproperlyConfigured) as error:
+            raise CommandError(str(error))
+
+        def shutdown(signum, frame):
+            self.stdout.write('Остановка обработки камер...')
+            supervisor.stopped.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+        if options['metrics_port']:
+            start_metrics_server(options['metrics_port'])
+        for camera_url in options['profile']:
+            profiler.enable(camera_url)
+        try:
+            supervisor.run()
+        finally:
+            supervisor.stop()
+        if profiler.stacks:
+            for path in profiler.dump(options['profile_dir']):
+                self.stdout.write(f'Результаты профилирования: {path}')
+        for camera_url, stats in supervisor.stats().items():
+            self.stdout.write(
+                f'{camera_url}: распознано кадров {stats["processed"]}, '
+                f'отброшено {stats["dropped"]}, '
+                f'переподключений {stats["reconnects"]}'
+            )
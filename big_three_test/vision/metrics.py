@@ -0,0 +1,32 @@
+from big_three_test.metrics import Counter, Histogram
+
+STAGE_SECONDS = Histogram(
+    'vision_stage_seconds',
+    'Длительность этапов обработки кадра.',
+    labels=('camera', 'stage'),
+)
+FRAMES = Counter(
+    'vision_frames_total',
+    'Количество обработанных кадров по результату обработки.',
+    labels=('camera', 'result'),
+)
+DROPPED_FRAMES = Counter(
+    'vision_dropped_frames_total',
+    'Количество кадров, отброшенных из-за переполнения очереди.',
+    labels=('camera',),
+)
+TRACKS = Counter(
+    'vision_tracks_total',
+    'Количество уникальных объектов, отслеживаемых трекером.',
+    labels=('camera', 'object_class'),
+)
+RECONNECTS = Counter(
+    'vision_reconnects_total',
+    'Количество переподключений к камере.',
+    labels=('camera',),
+)
+PROFILE_SAMPLES = Counter(
+    'vision_profile_samples_total',
+    'Количество снимков стека, собранных профилировщиком.',
+    labels=('camera',),
+)
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('camera_url', models.URLField(max_length=500, verbose_name='URL камеры')),
+                ('object_type', models.CharField(max_length=50, verbose_name='Тип объектов')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Завершена'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('result', models.CharField(blank=True, max_length=500, verbose_name='Ссылка на результат')),
+                ('error', models.TextField(blank=True, verbose_name='Описание ошибки')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Задача распознавания',
+                'verbose_name_plural': 'Задачи распознавания',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
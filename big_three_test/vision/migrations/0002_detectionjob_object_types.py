@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+def copy_object_type(apps, schema_editor):
+    DetectionJob = apps.get_model('vision', 'DetectionJob')
+    for job in DetectionJob.objects.only('object_type').iterator():
+        job.object_types = [job.object_type]
+        job.save(update_fields=['object_types'])
+
+
+def restore_object_type(apps, schema_editor):
+    DetectionJob = apps.get_model('vision', 'DetectionJob')
+    for job in DetectionJob.objects.only('object_types').iterator():
+        job.object_type = (job.object_types or ['cars'])[0]
+        job.save(update_fields=['object_type'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vision', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionjob',
+            name='object_types',
+            field=models.JSONField(default=list, verbose_name='Типы объектов'),
+        ),
+        migrations.RunPython(copy_object_type, restore_object_type),
+        migrations.RemoveField(
+            model_name='detectionjob',
+            name='object_type',
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0003_chunkedupload'),
+        ('vision', '0002_detectionjob_object_types'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Detection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('camera_url', models.URLField(max_length=500, verbose_name='URL камеры')),
+                ('object_class', models.CharField(max_length=50, verbose_name='Тип объектов')),
+                ('count', models.PositiveIntegerField(verbose_name='Количество объектов')),
+                ('boxes', models.JSONField(default=list, help_text='Список вида [[x, y, w, h, уверенность], ...]', verbose_name='Прямоугольники объектов')),
+                ('confidence', models.FloatField(verbose_name='Максимальная уверенность')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='detections', to='files.file', verbose_name='Файл')),
+            ],
+            options={
+                'verbose_name': 'Распознавание',
+                'verbose_name_plural': 'Распознавания',
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['camera_url', 'created', 'object_class'], name='detection_camera_created_idx'), models.Index(fields=['object_class', 'created'], name='detection_class_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0007_blob'),
+        ('vision', '0003_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detection',
+            name='original',
+            field=models.ForeignKey(blank=True, help_text='Кадр без разметки распознанных объектов', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='files.file', verbose_name='Исходный кадр'),
+        ),
+    ]
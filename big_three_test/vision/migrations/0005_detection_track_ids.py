@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vision', '0004_detection_original'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detection',
+            name='track_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Идентификаторы треков в порядке прямоугольников', verbose_name='Идентификаторы объектов'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vision', '0005_detection_track_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Camera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100, verbose_name='Название')),
+                ('url', models.URLField(max_length=500, unique=True, verbose_name='URL камеры')),
+                ('interval', models.FloatField(default=1, verbose_name='Интервал между кадрами, сек')),
+                ('object_types', models.JSONField(default=list, verbose_name='Типы объектов')),
+                ('backend', models.CharField(blank=True, help_text='По умолчанию используется DETECTION_BACKEND', max_length=20, verbose_name='Движок распознавания')),
+                ('detect_every', models.PositiveIntegerField(default=1, verbose_name='Распознавание на каждом N-м кадре')),
+                ('scales', models.JSONField(blank=True, default=list, help_text='По умолчанию используется DETECTION_SCALES', verbose_name='Масштабы пирамиды изображений')),
+                ('scale_factor', models.FloatField(default=1.1, verbose_name='Шаг масштаба каскада')),
+                ('min_neighbors', models.PositiveIntegerField(default=3, verbose_name='Минимальное количество соседей каскада')),
+                ('min_size', models.PositiveIntegerField(default=30, verbose_name='Минимальный размер объекта, пикс.')),
+                ('roi', models.JSONField(blank=True, default=list, help_text='Список многоугольников вида [[[x, y], ...], ...] в долях ширины и высоты кадра', verbose_name='Области распознавания')),
+                ('record', models.BooleanField(default=False, verbose_name='Запись видеороликов')),
+                ('enabled', models.BooleanField(default=True, verbose_name='Включена')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Камера',
+                'verbose_name_plural': 'Камеры',
+                'ordering': ['name', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='detection',
+            name='camera',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='detections', to='vision.camera', verbose_name='Камера'),
+        ),
+        migrations.AddField(
+            model_name='detectionjob',
+            name='camera',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='vision.camera', verbose_name='Камера'),
+        ),
+    ]
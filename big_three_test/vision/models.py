@@ -0,0 +1,285 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import models
+
+from vision.backends import get_backend_class
+
+
+class Camera(models.Model):
+    '''Модель, содержащая параметры камеры и распознавания объектов.'''
+
+    name = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Название',
+    )
+    url = models.URLField(
+        max_length=500,
+        unique=True,
+        verbose_name='URL камеры',
+    )
+    interval = models.FloatField(
+        default=1,
+        verbose_name='Интервал между кадрами, сек',
+    )
+    object_types = models.JSONField(
+        default=list,
+        verbose_name='Типы объектов',
+    )
+    backend = models.CharField(
+        max_length=20,
+        blank=True,
+        verbose_name='Движок распознавания',
+        help_text='По умолчанию используется DETECTION_BACKEND',
+    )
+    detect_every = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Распознавание на каждом N-м кадре',
+    )
+    scales = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Масштабы пирамиды изображений',
+        help_text='По умолчанию используется DETECTION_SCALES',
+    )
+    scale_factor = models.FloatField(
+        default=1.1,
+        verbose_name='Шаг масштаба каскада',
+    )
+    min_neighbors = models.PositiveIntegerField(
+        default=3,
+        verbose_name='Минимальное количество соседей каскада',
+    )
+    min_size = models.PositiveIntegerField(
+        default=30,
+        verbose_name='Минимальный размер объекта, пикс.',
+    )
+    roi = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Области распознавания',
+        help_text=(
+            'Список многоугольников вида [[[x, y], ...], ...] '
+            'в долях ширины и высоты кадра'
+        ),
+    )
+    record = models.BooleanField(
+        default=False,
+        verbose_name='Запись видеороликов',
+    )
+    enabled = models.BooleanField(
+        default=True,
+        verbose_name='Включена',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Камера'
+        verbose_name_plural = 'Камеры'
+        ordering = ['name', 'id']
+
+    def __str__(self) -> str:
+        return self.name or self.url
+
+    def clean(self):
+        errors = {}
+        backend_class = None
+        try:
+            backend_class = get_backend_class(
+                self.backend or settings.DETECTION_BACKEND
+            )
+        except ImproperlyConfigured as error:
+            errors['backend'] = str(error)
+        if not isinstance(self.object_types, list) or not all(
+            isinstance(object_type, str) for object_type in self.object_types
+        ):
+            errors['object_types'] = 'Типы объектов задаются списком строк.'
+        elif backend_class is not None:
+            unknown = set(self.object_types) - set(
+                backend_class.get_allowed_types()
+            )
+            if unknown:
+                errors['object_types'] = (
+                    f'Движок {backend_class.name} не распознает объекты: '
+                    f'{", ".join(sorted(unknown))}.'
+                )
+        if isinstance(self.scale_factor, (int, float)) and (
+            self.scale_factor <= 1
+        ):
+            errors['scale_factor'] = 'Шаг масштаба должен быть больше 1.'
+        if not isinstance(self.roi, list) or not all(
+            is_valid_polygon(polygon) for polygon in self.roi
+        ):
+            errors['roi'] = (
+                'Область должна содержать не менее трех точек '
+                '[x, y] с координатами от 0 до 1.'
+            )
+        if errors:
+            raise ValidationError(errors)
+
+
+def is_valid_polygon(polygon) -> bool:
+    '''Проверяет, что многоугольник области распознавания содержит
+    не менее трех точек [x, y] с координатами от 0 до 1.'''
+
+    return isinstance(polygon, list) and len(polygon) >= 3 and all(
+        isinstance(point, list) and len(point) == 2 and all(
+            isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and 0 <= value <= 1
+            for value in point
+        )
+        for point in polygon
+    )
+
+
+class DetectionJob(models.Model):
+    '''Модель, содержащая данные о задаче распознавания объектов.'''
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    camera = models.ForeignKey(
+        Camera,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='Камера',
+    )
+    camera_url = models.URLField(
+        max_length=500,
+        verbose_name='URL камеры',
+    )
+    object_types = models.JSONField(
+        default=list,
+        verbose_name='Типы объектов',
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус',
+    )
+    result = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name='Ссылка на результат',
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Описание ошибки',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Задача распознавания'
+        verbose_name_plural = 'Задачи распознавания'
+        ordering = ['-created']
+
+    def __str__(self) -> str:
+        return f'{self.camera_url} ({self.status})'
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED)
+
+
+class Detection(models.Model):
+    '''Модель, содержащая данные об объектах одного типа,
+    распознанных на кадре с камеры.'''
+
+    file = models.ForeignKey(
+        'files.File',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='detections',
+        verbose_name='Файл',
+    )
+    original = models.ForeignKey(
+        'files.File',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Исходный кадр',
+        help_text='Кадр без разметки распознанных объектов',
+    )
+    camera = models.ForeignKey(
+        Camera,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='detections',
+        verbose_name='Камера',
+    )
+    camera_url = models.URLField(
+        max_length=500,
+        verbose_name='URL камеры',
+    )
+    object_class = models.CharField(
+        max_length=50,
+        verbose_name='Тип объектов',
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Количество объектов',
+    )
+    boxes = models.JSONField(
+        default=list,
+        verbose_name='Прямоугольники объектов',
+        help_text='Список вида [[x, y, w, h, уверенность], ...]',
+    )
+    track_ids = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Идентификаторы объектов',
+        help_text='Идентификаторы треков в порядке прямоугольников',
+    )
+    confidence = models.FloatField(
+        verbose_name='Максимальная уверенность',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+
+    class Meta:
+        verbose_name = 'Распознавание'
+        verbose_name_plural = 'Распознавания'
+        ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['camera_url', 'created', 'object_class'],
+                name='detection_camera_created_idx',
+            ),
+            models.Index(
+                fields=['object_class', 'created'],
+                name='detection_class_created_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.object_class}: {self.count} ({self.camera_url})'
@@ -0,0 +1,109 @@
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    '''Класс для определения областей движения на кадре.
+
+    Используется вычитание фона (MOG2) на уменьшенной копии кадра,
+    что значительно дешевле прохода каскадов. Если движения нет,
+    распознавание объектов на кадре не выполняется, а если есть -
+    выполняется только в области движения.
+    '''
+
+    def __init__(
+        self,
+        scale: float = 0.25,
+        min_area: float = 0.002,
+        padding: float = 0.1,
+        max_region: float = 0.6,
+        history: int = 50,
+    ):
+        # Масштаб уменьшенной копии кадра
+        self.scale = scale
+        # Минимальная площадь области движения (доля площади кадра)
+        self.min_area = min_area
+        # Расширение области движения (доля ее размера), чтобы объект
+        # целиком попадал в область распознавания
+        self.padding = padding
+        # Если область движения занимает большую долю кадра,
+        # распознавание выполняется на всем кадре
+        self.max_region = max_region
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=history, detectShadows=False
+        )
+        self.kernel = np.ones((3, 3), dtype=np.uint8)
+        self.initialized = False
+
+    def get_mask(self, frame):
+        '''Возвращает маску движения на уменьшенной копии кадра.'''
+
+        small = cv2.resize(
+            frame,
+            None,
+            fx=self.scale,
+            fy=self.scale,
+            interpolation=cv2.INTER_AREA,
+        )
+        gray = cv2.GaussianBlur(
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0
+        )
+        mask = self.subtractor.apply(gray)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        return cv2.dilate(mask, self.kernel, iterations=2)
+
+    def detect(self, frame):
+        '''Возвращает область движения (x, y, w, h) в координатах кадра.
+
+        Возвращает None, если распознавание нужно выполнить на всем
+        кадре (первый кадр или движение по большей части кадра),
+        и пустой кортеж, если движения нет.
+        '''
+
+        mask = self.get_mask(frame)
+        if not self.initialized:
+            # Первый кадр только инициализирует модель фона
+            self.initialized = True
+            return None
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+        min_area = self.min_area * mask.shape[0] * mask.shape[1]
+        contours = [
+            contour for contour in contours
+            if cv2.contourArea(contour) >= min_area
+        ]
+        if not contours:
+            return ()
+        x, y, w, h = cv2.boundingRect(np.vstack(contours))
+        x, y, w, h = (
+            int(round(value / self.scale)) for value in (x, y, w, h)
+        )
+        height, width = frame.shape[:2]
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        left, top = max(x - pad_x, 0), max(y - pad_y, 0)
+        right = min(x + w + pad_x, width)
+        bottom = min(y + h + pad_y, height)
+        area = (right - left) * (bottom - top)
+        if area >= self.max_region * width * height:
+            return None
+        return (left, top, right - left, bottom - top)
+
+
+def perceptual_hash(frame) -> int:
+    '''Возвращает 64-битный разностный хэш (dHash) кадра.
+
+    Хэши визуально почти одинаковых кадров отличаются в небольшом
+    количестве бит.
+    '''
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hash_distance(first: int, second: int) -> int:
+    '''Возвращает количество различающихся бит двух хэшей.'''
+
+    return bin(first ^ second).count('1')
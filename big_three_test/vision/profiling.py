@@ -0,0 +1,137 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from vision import metrics
+
+
+class SamplingProfiler(threading.Thread):
+    '''Выборочный профилировщик обработки кадров отдельных камер.
+
+    Поток с заданным интервалом снимает стеки потоков, которые
+    в данный момент обрабатывают кадры профилируемых камер
+    (sys._current_frames), и подсчитывает одинаковые стеки. Результат
+    выгружается в формате folded stacks, который принимают
+    flamegraph.pl и speedscope. Профилирование других камер
+    не создает накладных расходов.
+    '''
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        super().__init__(daemon=True, name='profiler')
+        self.interval = interval
+        self.max_depth = max_depth
+        self.cameras = set()
+        self.stacks = defaultdict(Counter)
+        # Потоки, обрабатывающие кадры профилируемых камер
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._enabled = threading.Event()
+
+    def enable(self, camera_url: str):
+        '''Включает профилирование камеры.'''
+
+        with self._lock:
+            self.cameras.add(camera_url)
+            if not self.is_alive():
+                self.start()
+        self._enabled.set()
+
+    def disable(self, camera_url: str):
+        '''Выключает профилирование камеры.'''
+
+        with self._lock:
+            self.cameras.discard(camera_url)
+            if not self.cameras:
+                self._enabled.clear()
+
+    @contextmanager
+    def track(self, camera_url: str):
+        '''Отмечает текущий поток как обрабатывающий кадр камеры.'''
+
+        if camera_url not in self.cameras:
+            yield
+            return
+        ident = threading.get_ident()
+        self._targets[ident] = camera_url
+        try:
+            yield
+        finally:
+            self._targets.pop(ident, None)
+
+    def collapse(self, frame) -> str:
+        '''Возвращает стек вызовов в виде строки "f1;f2;...".'''
+
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(
+                f'{code.co_name} ({os.path.basename(code.co_filename)}'
+                f':{frame.f_lineno})'
+            )
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def sample(self):
+        '''Снимает стеки всех отмеченных потоков.'''
+
+        frames = sys._current_frames()
+        for ident, camera_url in list(self._targets.items()):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            self.stacks[camera_url][self.collapse(frame)] += 1
+            metrics.PROFILE_SAMPLES.inc(camera=camera_url)
+
+    def run(self):
+        while True:
+            self._enabled.wait()
+            self.sample()
+            time.sleep(self.interval)
+
+    def get_report(self, camera_url: str) -> str:
+        '''Возвращает стеки камеры в формате folded stacks.'''
+
+        return ''.join(
+            f'{stack} {count}\n'
+            for stack, count in self.stacks[camera_url].most_common()
+        )
+
+    def drain(self) -> dict:
+        '''Возвращает накопленные стеки и очищает их.
+
+        Используется процессами пула задач распознавания, чтобы
+        передать стеки процессу, создавшему задачу.
+        '''
+
+        stacks, self.stacks = self.stacks, defaultdict(Counter)
+        return {
+            camera_url: dict(counter) for camera_url, counter in stacks.items()
+        }
+
+    def merge(self, stacks: dict):
+        '''Добавляет стеки, полученные от другого процесса.'''
+
+        for camera_url, counter in stacks.items():
+            self.stacks[camera_url].update(counter)
+
+    def dump(self, directory) -> list:
+        '''Сохраняет стеки профилируемых камер в каталог.'''
+
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for camera_url in list(self.stacks):
+            name = re.sub(r'[^\w.-]+', '_', camera_url).strip('_')
+            path = os.path.join(directory, f'{name}.folded')
+            with open(path, 'w') as file:
+                file.write(self.get_report(camera_url))
+            paths.append(path)
+        return paths
+
+
+profiler = SamplingProfiler(interval=settings.VISION_PROFILE_INTERVAL)
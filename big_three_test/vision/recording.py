@@ -0,0 +1,280 @@
+import collections
+import logging
+import os
+import queue
+import tempfile
+import threading
+
+import cv2
+from django.core.files import File as DjangoFile
+from django.db import connection
+
+from big_three_test.utils import generate_file_name
+from files.services import create_file
+
+logger = logging.getLogger('vision')
+
+
+class Clip:
+    '''Записываемый видеоролик.'''
+
+    def __init__(self, post_roll: int, max_frames: int):
+        # Количество кадров, которое осталось записать после
+        # последнего распознавания
+        self.remaining = post_roll
+        # Количество кадров, которое еще может быть добавлено в ролик
+        self.capacity = max_frames
+        # Количество кадров, переданных в поток кодирования
+        self.queued = 0
+        self.finished = False
+        self.file = None
+        self.done = threading.Event()
+
+
+class ClipRecorder:
+    '''Класс для записи видеороликов вокруг распознаваний.
+
+    Последние кадры видеопотока хранятся в ограниченном буфере
+    (pre-roll). Кадры буфера и очереди хранятся сжатыми в JPEG (кадры
+    шире max_width предварительно уменьшаются), а размер буфера
+    ограничен также max_buffer_size байтами: несжатый кадр 1080p
+    занимает около 6 МБ, и 5 секунд видео при 25 кадрах в секунду
+    занимали бы около 750 МБ на камеру. Кадры сжимаются в отдельном
+    потоке, который получает их от потока захвата через небольшую
+    очередь несжатых кадров. При распознавании буфер и следующие
+    кадры (post-roll) передаются в отдельный поток кодирования через
+    ограниченную очередь, поэтому запись не задерживает ни захват
+    кадров, ни распознавание: если потоки сжатия или кодирования
+    не успевают, лишние кадры отбрасываются. Готовый ролик
+    сохраняется как видеофайл.
+    '''
+
+    def __init__(
+        self,
+        fps: float,
+        pre_roll: float = 5,
+        post_roll: float = 5,
+        max_duration: float = 60,
+        queue_size: int = 64,
+        codec: str = 'mp4v',
+        on_saved=None,
+        max_width: int = None,
+        quality: int = 85,
+        max_buffer_size: int = None,
+        frame_queue_size: int = 4,
+    ):
+        self.fps = fps
+        self.pre_roll = collections.deque(maxlen=max(1, int(fps * pre_roll)))
+        # Суммарный размер сжатых кадров буфера в байтах
+        self.pre_roll_size = 0
+        self.max_buffer_size = max_buffer_size
+        self.max_width = max_width
+        self.quality = quality
+        self.post_roll_frames = max(1, int(fps * post_roll))
+        self.max_frames = max(1, int(fps * max_duration))
+        self.codec = codec
+        # Обработчик сохранения ролика, получающий объект File
+        self.on_saved = on_saved
+        self.clip = None
+        self.dropped_count = 0
+        # Очередь несжатых кадров потока сжатия
+        self._frames = queue.Queue(maxsize=frame_queue_size)
+        # Очередь сжатых кадров потока кодирования
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._compressor = threading.Thread(
+            target=self._compress, daemon=True
+        )
+        self._encoder = threading.Thread(target=self._encode, daemon=True)
+        self._compressor.start()
+        self._encoder.start()
+
+    def add(self, frame):
+        '''Добавляет очередной кадр видеопотока.
+
+        Вызывается из потока захвата кадров и никогда не блокируется:
+        кадр передается в поток сжатия, а если тот не успевает,
+        отбрасывается.
+        '''
+
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped_count += 1
+
+    def _compress(self):
+        '''Сжимает кадры и добавляет их в буфер или в ролик.'''
+
+        while True:
+            try:
+                frame = self._frames.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    break
+                continue
+            try:
+                frame = self.compress(frame)
+            except cv2.error:
+                logger.exception('Не удалось сжать кадр видеоролика.')
+            else:
+                self._add(frame)
+            self._frames.task_done()
+
+    def _add(self, frame):
+        '''Добавляет сжатый кадр в буфер или в текущий ролик.'''
+
+        with self._lock:
+            clip = self.clip
+            if clip is None:
+                self._buffer(frame)
+                return
+            self._put(clip, frame)
+            clip.remaining -= 1
+            if clip.remaining <= 0 or clip.capacity <= 0:
+                self._finish(clip)
+
+    def trigger(self) -> Clip:
+        '''Начинает запись ролика или продлевает текущий ролик.'''
+
+        with self._lock:
+            if self.clip is None:
+                self.clip = Clip(self.post_roll_frames, self.max_frames)
+                while self.pre_roll:
+                    self._put(self.clip, self.pre_roll.popleft())
+                self.pre_roll_size = 0
+            else:
+                self.clip.remaining = self.post_roll_frames
+            return self.clip
+
+    def compress(self, frame):
+        '''Уменьшает и сжимает кадр для хранения в буфере и очереди.'''
+
+        height, width = frame.shape[:2]
+        if self.max_width and width > self.max_width:
+            height = round(height * self.max_width / width)
+            frame = cv2.resize(
+                frame, (self.max_width, height), interpolation=cv2.INTER_AREA
+            )
+        _, buffer = cv2.imencode(
+            '.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        )
+        return buffer
+
+    def _buffer(self, frame):
+        '''Добавляет сжатый кадр в буфер, вытесняя старые кадры.'''
+
+        if len(self.pre_roll) == self.pre_roll.maxlen:
+            self.pre_roll_size -= self.pre_roll[0].nbytes
+        self.pre_roll.append(frame)
+        self.pre_roll_size += frame.nbytes
+        while (
+            self.max_buffer_size
+            and self.pre_roll_size > self.max_buffer_size
+            and len(self.pre_roll) > 1
+        ):
+            self.pre_roll_size -= self.pre_roll.popleft().nbytes
+
+    def _put(self, clip: Clip, frame):
+        '''Передает кадр в поток кодирования без ожидания.'''
+
+        try:
+            self._queue.put_nowait((clip, frame))
+        except queue.Full:
+            self.dropped_count += 1
+            return
+        clip.capacity -= 1
+        clip.queued += 1
+
+    def _finish(self, clip: Clip):
+        '''Завершает прием кадров в ролик.'''
+
+        clip.finished = True
+        self.clip = None
+        # Ролик, все кадры которого отброшены, не попадет в поток
+        # кодирования, поэтому завершается сразу
+        if not clip.queued:
+            clip.done.set()
+
+    def _encode(self):
+        '''Кодирует кадры роликов и сохраняет готовые ролики.'''
+
+        clip = writer = path = None
+        while True:
+            try:
+                item_clip, buffer = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if (
+                    self._stopped.is_set()
+                    and not self._compressor.is_alive()
+                    and (clip is None or clip.finished)
+                ):
+                    break
+                # Ролик завершен и все его кадры уже закодированы
+                if clip is not None and clip.finished:
+                    self._save(clip, writer, path)
+                    clip = writer = path = None
+                continue
+            frame = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            if frame is None:
+                continue
+            if item_clip is not clip:
+                if clip is not None:
+                    self._save(clip, writer, path)
+                clip = item_clip
+                writer, path = self._open_writer(frame)
+            writer.write(frame)
+        if clip is not None:
+            self._save(clip, writer, path)
+        # Поток использует собственное соединение с БД
+        connection.close()
+
+    def _open_writer(self, frame):
+        '''Создает объект записи видео во временный файл.'''
+
+        descriptor, path = tempfile.mkstemp(suffix='.mp4')
+        os.close(descriptor)
+        height, width = frame.shape[:2]
+        writer = cv2.VideoWriter(
+            path,
+            cv2.VideoWriter_fourcc(*self.codec),
+            self.fps,
+            (width, height),
+        )
+        return writer, path
+
+    def _save(self, clip: Clip, writer, path: str):
+        '''Сохраняет ролик как видеофайл.'''
+
+        opened = writer.isOpened()
+        writer.release()
+        try:
+            # Если кодек недоступен, файл ролика остается пустым
+            if not opened:
+                logger.error(
+                    f'Не удалось открыть запись видеоролика ({self.codec}).'
+                )
+                return
+            with open(path, 'rb') as content:
+                clip.file = create_file(
+                    DjangoFile(content, name=generate_file_name('mp4'))
+                )
+            logger.info(f'Видеоролик сохранен: {clip.file.file.name}')
+            if self.on_saved is not None:
+                self.on_saved(clip.file)
+        except Exception:
+            logger.exception('Не удалось сохранить видеоролик.')
+        finally:
+            os.remove(path)
+            clip.done.set()
+
+    def close(self, timeout: float = None):
+        '''Завершает текущий ролик и останавливает потоки сжатия
+        и кодирования.'''
+
+        self._stopped.set()
+        self._compressor.join(timeout=timeout)
+        with self._lock:
+            if self.clip is not None:
+                self._finish(self.clip)
+        self._encoder.join(timeout=timeout)
@@ -0,0 +1,116 @@
+import logging
+import os
+import pathlib
+import resource
+import threading
+import time
+
+import cv2
+from django.conf import settings
+
+logger = logging.getLogger('vision')
+
+
+def get_memory_usage() -> int:
+    '''Возвращает объем резидентной памяти процесса в байтах.'''
+
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Для систем без procfs используется пиковое значение
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ClassifierRegistry:
+    '''Реестр каскадных классификаторов.
+
+    Каждый каскад загружается один раз на поток: экземпляры
+    cv2.CascadeClassifier не предназначены для одновременного
+    использования из нескольких потоков, поэтому каждый поток-обработчик
+    получает собственный экземпляр, который затем переиспользуется.
+    '''
+
+    def __init__(self):
+        self._paths = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def register(self, name: str, path):
+        '''Регистрирует каскад под указанным именем.'''
+
+        path = pathlib.Path(path)
+        if not path.is_file():
+            raise FileNotFoundError(f'Файл каскада {path} не найден.')
+        with self._lock:
+            self._paths[name.lower()] = path
+
+    def autodiscover(self):
+        '''Регистрирует каскады из каталогов DETECTION_CASCADE_DIRS
+        и словаря DETECTION_CASCADES.'''
+
+        for directory in settings.DETECTION_CASCADE_DIRS:
+            for path in sorted(pathlib.Path(directory).glob('*.xml')):
+                self.register(path.stem, path)
+        for name, path in settings.DETECTION_CASCADES.items():
+            self.register(name, path)
+
+    def names(self):
+        '''Возвращает имена зарегистрированных каскадов.'''
+
+        return self._paths.keys()
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._paths
+
+    def _load(self, name: str) -> cv2.CascadeClassifier:
+        '''Загружает каскад и сохраняет статистику загрузки.'''
+
+        path = self._paths[name]
+        memory_before = get_memory_usage()
+        start_time = time.perf_counter()
+        classifier = cv2.CascadeClassifier(str(path))
+        load_time = time.perf_counter() - start_time
+        if classifier.empty():
+            raise ValueError(f'Не удалось загрузить каскад {path}.')
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'path': str(path),
+                'instances': 0,
+            })
+            stats['instances'] += 1
+            stats['load_time'] = load_time
+            stats['memory'] = max(get_memory_usage() - memory_before, 0)
+        logger.info(
+            f'Каскад {name} загружен за {load_time:.3f} сек. '
+            f'({stats["memory"] / 1_000_000:.2f} MB)'
+        )
+        return classifier
+
+    def get(self, name: str) -> cv2.CascadeClassifier:
+        '''Возвращает экземпляр каскада для текущего потока.'''
+
+        name = name.lower()
+        if name not in self._paths:
+            raise KeyError(name)
+        classifiers = self._local.__dict__.setdefault('classifiers', {})
+        if name not in classifiers:
+            classifiers[name] = self._load(name)
+        return classifiers[name]
+
+    def preload(self):
+        '''Загружает все зарегистрированные каскады в текущем потоке.'''
+
+        for name in list(self.names()):
+            self.get(name)
+
+    def stats(self) -> dict:
+        '''Возвращает время загрузки (сек.) и прирост памяти (байт)
+        для каждого каскада.'''
+
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+classifiers = ClassifierRegistry()
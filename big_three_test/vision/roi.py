@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+
+
+def intersect(first, second):
+    '''Возвращает пересечение областей (x, y, w, h) или ().
+
+    None обозначает весь кадр.
+    '''
+
+    if first is None:
+        return second
+    if second is None:
+        return first
+    x = max(first[0], second[0])
+    y = max(first[1], second[1])
+    right = min(first[0] + first[2], second[0] + second[2])
+    bottom = min(first[1] + first[3], second[1] + second[3])
+    if right <= x or bottom <= y:
+        return ()
+    return x, y, right - x, bottom - y
+
+
+class RegionOfInterest:
+    '''Области кадра, в которых распознаются объекты.
+
+    Области задаются многоугольниками в долях ширины и высоты кадра,
+    поэтому не зависят от разрешения видеопотока. Распознавание
+    выполняется только в ограничивающем прямоугольнике областей,
+    а пиксели вне многоугольников закрашиваются черным.
+    '''
+
+    def __init__(self, polygons):
+        self.polygons = [
+            np.array(polygon, dtype=np.float32) for polygon in polygons
+        ]
+        # Ограничивающий прямоугольник и маска для размера кадра
+        self._shape = None
+        self.bounds = None
+        self.mask = None
+
+    def prepare(self, shape):
+        '''Вычисляет прямоугольник и маску областей для размера кадра.'''
+
+        if shape[:2] == self._shape:
+            return
+        height, width = self._shape = shape[:2]
+        polygons = [
+            np.round(polygon * (width, height)).astype(np.int32)
+            for polygon in self.polygons
+        ]
+        points = np.concatenate(polygons)
+        x, y = np.clip(points.min(axis=0), 0, (width, height))
+        right, bottom = np.clip(points.max(axis=0) + 1, 0, (width, height))
+        self.bounds = (int(x), int(y), int(right - x), int(bottom - y))
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, polygons, 255)
+        mask = mask[y:bottom, x:right]
+        # Маска не нужна, если области занимают весь прямоугольник
+        self.mask = None if mask.all() else mask
+
+    def apply(self, frame, region=None):
+        '''Ограничивает кадр областями распознавания.
+
+        Возвращает пару (изображение, область): изображение является
+        частью кадра в области region, ограниченной прямоугольником
+        областей распознавания, с закрашенными пикселями вне
+        многоугольников. Если region не пересекается с областями,
+        возвращается (None, ()).
+        '''
+
+        self.prepare(frame.shape)
+        region = intersect(region, self.bounds)
+        if not region:
+            return None, ()
+        x, y, w, h = region
+        image = frame[y:y + h, x:x + w]
+        if self.mask is not None:
+            bounds_x, bounds_y = self.bounds[:2]
+            mask = self.mask[
+                y - bounds_y:y - bounds_y + h, x - bounds_x:x - bounds_x + w
+            ]
+            image = cv2.bitwise_and(image, image, mask=mask)
+        return image, region
+
+
+def offset_boxes(detected: dict, x: int, y: int) -> dict:
+    '''Переводит координаты объектов части кадра в координаты кадра.'''
+
+    if not x and not y:
+        return detected
+    return {
+        object_type: [
+            box._replace(x=box.x + x, y=box.y + y) for box in boxes
+        ]
+        for object_type, boxes in detected.items()
+    }
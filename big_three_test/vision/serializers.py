@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+from vision.models import Detection
+
+
+class DetectionSerializer(serializers.ModelSerializer):
+    '''Сериализатор для получения данных о распознанных объектах.'''
+
+    class Meta:
+        model = Detection
+        fields = (
+            'id',
+            'camera',
+            'file',
+            'original',
+            'camera_url',
+            'object_class',
+            'count',
+            'boxes',
+            'track_ids',
+            'confidence',
+            'created',
+        )
+        read_only_fields = fields
+
+
+class DetectionStatsSerializer(serializers.Serializer):
+    '''Сериализатор для агрегированной статистики распознаваний.'''
+
+    period = serializers.DateTimeField()
+    camera_url = serializers.CharField()
+    object_class = serializers.CharField()
+    detections = serializers.IntegerField()
+    objects = serializers.IntegerField()
@@ -0,0 +1,259 @@
+import collections
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from django.conf import settings
+from django.db import close_old_connections
+
+from vision import metrics
+from vision.camera_vision import (
+    CameraConfig,
+    DetectionConfig,
+    FrameHandler,
+    get_recorder,
+)
+from vision.encoder import get_encoder
+
+logger = logging.getLogger('vision')
+
+
+class Backoff:
+    '''Экспоненциально растущая задержка переподключения.'''
+
+    def __init__(self, initial: float, maximum: float):
+        self.initial = initial
+        self.maximum = maximum
+        self.delay = initial
+
+    def next(self) -> float:
+        '''Возвращает очередную задержку и увеличивает следующую.'''
+
+        delay = self.delay
+        self.delay = min(self.delay * 2, self.maximum)
+        # Случайная добавка исключает одновременное переподключение
+        # всех камер после сбоя сети
+        return delay * random.uniform(1, 1.1)
+
+    def reset(self):
+        self.delay = self.initial
+
+
+class CameraWorker(threading.Thread):
+    '''Поток захвата кадров одной камеры.
+
+    Кадры с интервалом camera_config.interval помещаются в ограниченную
+    очередь камеры, из которой их забирает общий пул распознавания.
+    Для каждой камеры одновременно распознается не более одного кадра;
+    если пул не успевает, самые старые кадры очереди отбрасываются.
+    При потере соединения поток переподключается к камере
+    с экспоненциально растущей задержкой.
+    '''
+
+    def __init__(
+        self,
+        camera_config: CameraConfig,
+        handler: FrameHandler,
+        executor: ThreadPoolExecutor,
+        stopped: threading.Event,
+        queue_size: int = 2,
+    ):
+        super().__init__(daemon=True, name=camera_config.camera_url)
+        self.camera_url = camera_config.camera_url
+        self.interval = camera_config.interval
+        self.record = camera_config.record
+        self.handler = handler
+        self.executor = executor
+        self.stopped = stopped
+        self.frames = collections.deque(maxlen=queue_size)
+        self.backoff = Backoff(
+            settings.CAMERA_RECONNECT_DELAY,
+            settings.CAMERA_RECONNECT_MAX_DELAY,
+        )
+        self.busy = False
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.reconnect_count = 0
+        self._lock = threading.Lock()
+
+    def run(self):
+        while not self.stopped.is_set():
+            stream = cv2.VideoCapture(self.camera_url)
+            recorder = None
+            try:
+                if stream.isOpened():
+                    if self.record:
+                        recorder = get_recorder(stream)
+                    self.handler.recorder = recorder
+                    self.capture(stream, recorder)
+            except Exception:
+                logger.exception(f'Ошибка обработки камеры {self.camera_url}')
+            finally:
+                stream.release()
+                if recorder is not None:
+                    self.handler.recorder = None
+                    recorder.close(timeout=settings.CLIP_MAX_DURATION)
+            if self.stopped.is_set():
+                break
+            delay = self.backoff.next()
+            self.reconnect_count += 1
+            metrics.RECONNECTS.inc(camera=self.camera_url)
+            logger.warning(
+                f'Нет соединения с камерой {self.camera_url}, повторное '
+                f'подключение через {delay:.1f} сек.'
+            )
+            self.stopped.wait(delay)
+
+    def capture(self, stream: cv2.VideoCapture, recorder=None):
+        '''Захватывает кадры до потери соединения или остановки.'''
+
+        last_submit_time = 0
+        while not self.stopped.is_set():
+            if not stream.grab():
+                return
+            current_time = time.monotonic()
+            due = current_time - last_submit_time >= self.interval
+            # Без записи видеороликов декодируются только кадры,
+            # передаваемые на распознавание
+            if not due and recorder is None:
+                continue
+            success, frame = stream.retrieve()
+            if not success:
+                return
+            self.backoff.reset()
+            if recorder is not None:
+                recorder.add(frame)
+            if due:
+                last_submit_time = current_time
+                self.submit(frame)
+
+    def submit(self, frame):
+        '''Помещает кадр в очередь камеры.'''
+
+        with self._lock:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped_count += 1
+                metrics.DROPPED_FRAMES.inc(camera=self.camera_url)
+            self.frames.append(frame)
+            if self.busy:
+                return
+            self.busy = True
+        self._schedule()
+
+    def _schedule(self):
+        '''Передает обработку очереди камеры в пул распознавания.'''
+
+        try:
+            self.executor.submit(self.process_next)
+        except RuntimeError:
+            # Пул уже остановлен
+            with self._lock:
+                self.busy = False
+
+    def process_next(self):
+        '''Распознает объекты на следующем кадре очереди камеры.
+
+        После обработки кадра задача повторно ставится в очередь пула,
+        а не обрабатывает очередь камеры целиком, чтобы пул равномерно
+        распределялся между камерами.
+        '''
+
+        with self._lock:
+            if not self.frames or self.stopped.is_set():
+                self.busy = False
+                return
+            frame = self.frames.popleft()
+        try:
+            self.handler.handle(frame)
+        except Exception:
+            logger.exception(f'Ошибка распознавания {self.camera_url}')
+        finally:
+            self.processed_count += 1
+            close_old_connections()
+        with self._lock:
+            if not self.frames or self.stopped.is_set():
+                self.busy = False
+                return
+        self._schedule()
+
+    def stats(self) -> dict:
+        return {
+            'processed': self.processed_count,
+            'dropped': self.dropped_count,
+            'reconnects': self.reconnect_count,
+        }
+
+
+class CameraSupervisor:
+    '''Класс для непрерывной обработки видеопотоков нескольких камер.
+
+    Каждая камера обслуживается отдельным потоком захвата кадров,
+    а распознавание выполняется общим пулом потоков ограниченного
+    размера. OpenCV освобождает GIL при распознавании, поэтому пул
+    потоков загружает несколько ядер в рамках одного процесса.
+    '''
+
+    def __init__(
+        self,
+        cameras,
+        workers: int = None,
+        queue_size: int = None,
+    ):
+        '''cameras - список пар (CameraConfig, DetectionConfig).'''
+
+        self.stopped = threading.Event()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or settings.CAMERA_DETECTION_WORKERS,
+            thread_name_prefix='detection',
+        )
+        self.encoder = get_encoder()
+        self.workers = [
+            CameraWorker(
+                camera_config,
+                FrameHandler(
+                    camera_config.camera_url,
+                    detection,
+                    encoder=self.encoder,
+                    camera_id=camera_config.camera_id,
+                ),
+                self.executor,
+                self.stopped,
+                queue_size=queue_size or settings.CAMERA_QUEUE_SIZE,
+            )
+            for camera_config, detection in cameras
+        ]
+
+    def start(self):
+        # Параллелизм ограничивается размером пула, поэтому OpenCV
+        # не должен дополнительно распараллеливать каждый вызов
+        cv2.setNumThreads(1)
+        for worker in self.workers:
+            worker.start()
+        logger.info(f'Запущена обработка камер: {len(self.workers)}')
+
+    def stop(self, timeout: float = 10):
+        '''Останавливает захват кадров и дожидается распознавания
+        и сохранения уже переданных в пул кадров.'''
+
+        self.stopped.set()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            worker.join(timeout=max(deadline - time.monotonic(), 0))
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.encoder.flush(timeout=max(deadline - time.monotonic(), 0))
+        logger.info('Обработка камер остановлена.')
+
+    def run(self):
+        '''Запускает обработку камер до вызова stop().'''
+
+        self.start()
+        # Ожидание с таймаутом позволяет основному потоку
+        # обрабатывать сигналы
+        while not self.stopped.wait(1):
+            pass
+
+    def stats(self) -> dict:
+        return {worker.camera_url: worker.stats() for worker in self.workers}
@@ -0,0 +1,122 @@
+import threading
+from unittest import mock
+
+import numpy as np
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from vision.backends import (
+    BatchCollector,
+    CascadeDetector,
+    OnnxDetector,
+)
+from vision.camera_vision import DetectionConfig
+
+
+def get_output(frames_count: int, anchors) -> np.ndarray:
+    '''Возвращает выход YOLOv8 (кадры, 4 + классы, якоря) с указанными
+    якорями вида (cx, cy, w, h, класс, уверенность).'''
+
+    output = np.zeros((frames_count, 4 + 80, len(anchors)), np.float32)
+    for index, (cx, cy, w, h, class_id, confidence) in enumerate(anchors):
+        output[:, :4, index] = cx, cy, w, h
+        output[:, 4 + class_id, index] = confidence
+    return output
+
+
+@override_settings(ONNX_INPUT_SIZE=64)
+@mock.patch('vision.backends.pathlib.Path.is_file', return_value=True)
+class OnnxDetectorTests(SimpleTestCase):
+    '''Класс для тестирования движка распознавания ONNX.'''
+
+    def setUp(self):
+        self.net = mock.Mock()
+        patcher = mock.patch('vision.backends.get_net', return_value=self.net)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_single_forward(self, is_file):
+        '''Кадры пакета обрабатываются одним прямым проходом, а объекты
+        переводятся в координаты исходных кадров.'''
+
+        self.net.forward.return_value = get_output(2, [
+            (32, 32, 16, 16, 2, 0.9),  # автомобиль
+            (33, 32, 16, 16, 7, 0.8),  # грузовик, перекрывает автомобиль
+            (10, 10, 4, 4, 0, 0.7),  # человек
+            (50, 50, 4, 4, 2, 0.1),  # низкая уверенность
+        ])
+        detector = OnnxDetector(['cars', 'people'], batched=False)
+        frames = [
+            np.zeros((128, 128, 3), np.uint8),
+            np.zeros((256, 256, 3), np.uint8),
+        ]
+
+        first, second = detector.detect_batch(frames, [None, (10, 20, 64, 64)])
+
+        self.net.forward.assert_called_once()
+        self.assertEqual(
+            self.net.setInput.call_args.args[0].shape, (2, 3, 64, 64)
+        )
+        [car], [person] = first['cars'], first['people']
+        self.assertEqual(car[:4], (48, 48, 32, 32))
+        self.assertAlmostEqual(car.confidence, 0.9, places=5)
+        self.assertEqual(person[:4], (16, 16, 8, 8))
+        self.assertEqual(second['cars'][0][:4], (34, 44, 16, 16))
+
+    @override_settings(ONNX_MODEL_PATH='/missing.onnx')
+    def test_missing_model(self, is_file):
+        is_file.return_value = False
+        with self.assertRaises(ImproperlyConfigured):
+            OnnxDetector(['cars'])
+
+    def test_collector_batches_cameras(self, is_file):
+        '''Кадры нескольких камер объединяются в один пакет.'''
+
+        self.net.forward.side_effect = lambda: get_output(
+            self.net.setInput.call_args.args[0].shape[0],
+            [(32, 32, 16, 16, 0, 0.9)],
+        )
+        collector = BatchCollector(
+            'model.onnx', 64, max_batch=4, max_delay=0.5
+        )
+        collector.start()
+        detector = OnnxDetector(['people'], batched=False)
+        detector.collector = collector
+        results = []
+
+        def detect():
+            results.append(detector.detect(np.zeros((64, 64, 3), np.uint8)))
+
+        threads = [threading.Thread(target=detect) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(collector.batches_count, 1)
+        self.assertEqual(collector.frames_count, 4)
+
+
+class DetectionConfigTests(SimpleTestCase):
+    '''Класс для тестирования выбора движка распознавания.'''
+
+    def test_default_backend(self):
+        detection = DetectionConfig(object_types=['cars']).get_detection()
+        self.assertIsInstance(detection, CascadeDetector)
+
+    @override_settings(ONNX_BATCH_SIZE=1)
+    @mock.patch('vision.backends.pathlib.Path.is_file', return_value=True)
+    def test_onnx_backend(self, is_file):
+        detection = DetectionConfig(
+            object_types=['people'], backend='onnx'
+        ).get_detection()
+        self.assertIsInstance(detection, OnnxDetector)
+        with self.assertRaises(AssertionError):
+            DetectionConfig(
+                object_types=['faces'], backend='onnx'
+            ).get_detection()
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            DetectionConfig(object_types=['cars'], backend='unknown')
@@ -0,0 +1,49 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from big_three_test.benchmarks import get_quantile
+from vision import benchmarks
+
+
+class VisionBenchmarkTests(SimpleTestCase):
+    '''Класс для тестирования замеров производительности распознавания.'''
+
+    @override_settings(
+        MOTION_DETECTION=True, TRACKING=True, DETECT_EVERY=1
+    )
+    def test_run_on_fixture(self):
+        '''Синтетический ролик обрабатывается обработчиком кадров
+        камеры, длительности этапов берутся из метрик.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = benchmarks.create_fixture(
+                Path(directory) / 'fixture.mp4',
+                frames=10,
+                width=160,
+                height=120,
+            )
+            results = benchmarks.run(path, object_types=['cars'])
+
+        self.assertEqual(results['frames'], 10)
+        self.assertEqual(results['stages']['read']['count'], 10)
+        self.assertEqual(results['stages']['motion']['count'], 10)
+        self.assertEqual(
+            results['stages']['detect']['count'],
+            10 - results['skipped_by_motion'],
+        )
+        self.assertEqual(results['pipeline']['count'], 10)
+        self.assertEqual(sum(results['results'].values()), 10)
+        self.assertEqual(
+            results['stages']['encode']['count'],
+            results['results']['queued'],
+        )
+
+    def test_quantile(self):
+        '''Квантили оцениваются по интервалам гистограммы.'''
+
+        bounds = (0.01, 0.1)
+        self.assertAlmostEqual(get_quantile(bounds, [0, 4, 0], 0.5), 0.055)
+        self.assertEqual(get_quantile(bounds, [2, 0, 0], 1), 0.01)
+        self.assertEqual(get_quantile(bounds, [0, 1, 1], 1), 0.1)
@@ -0,0 +1,144 @@
+from unittest import mock
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from vision import metrics
+from vision.camera_vision import DetectionConfig, FrameHandler
+from vision.detection import Box
+from vision.jobs import run_detection_job, submit_job
+from vision.models import Camera
+from vision.roi import RegionOfInterest
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+# Нижняя половина кадра без левого нижнего угла
+ROI = [[[0, 0.5], [1, 0.5], [1, 1], [0.5, 1]]]
+
+
+class RegionOfInterestTests(SimpleTestCase):
+    '''Класс для тестирования областей распознавания.'''
+
+    def test_crop_and_mask(self):
+        '''Кадр обрезается по областям, пиксели вне областей
+        закрашиваются.'''
+
+        roi = RegionOfInterest(ROI)
+        frame = np.full((100, 200, 3), 255, dtype=np.uint8)
+        image, region = roi.apply(frame)
+        self.assertEqual(region, (0, 50, 200, 50))
+        self.assertEqual(image.shape, (50, 200, 3))
+        self.assertEqual(image[45, 10].tolist(), [0, 0, 0])
+        self.assertEqual(image[45, 190].tolist(), [255, 255, 255])
+        self.assertEqual(frame.min(), 255)
+
+    def test_motion_region(self):
+        '''Область движения ограничивается областями распознавания.'''
+
+        roi = RegionOfInterest([[[0.5, 0], [1, 0], [1, 1], [0.5, 1]]])
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        image, region = roi.apply(frame, (80, 10, 40, 20))
+        self.assertEqual(region, (100, 10, 20, 20))
+        self.assertIsNone(roi.mask)
+        self.assertEqual(roi.apply(frame, (0, 0, 50, 50)), (None, ()))
+
+
+@override_settings(MOTION_DETECTION=False, TRACKING=False)
+class CameraRegistryTests(TestCase):
+    '''Класс для тестирования реестра камер.'''
+
+    def setUp(self):
+        self.camera = Camera.objects.create(
+            url=CAMERA_URL,
+            object_types=['people'],
+            min_neighbors=5,
+            roi=ROI,
+        )
+
+    def test_handler_detects_in_roi(self):
+        '''Распознавание выполняется на части кадра, а координаты
+        объектов переводятся в координаты кадра.'''
+
+        encoder = mock.Mock()
+        handler = FrameHandler(
+            CAMERA_URL,
+            DetectionConfig.from_camera(self.camera),
+            encoder=encoder,
+            camera_id=self.camera.pk,
+        )
+        self.assertEqual(handler.detection.min_neighbors, 5)
+        handler.detection = mock.Mock()
+        handler.detection.detect.return_value = {
+            'people': [Box(10, 5, 20, 20, 1.0)]
+        }
+        handler.handle(np.zeros((100, 200, 3), dtype=np.uint8))
+
+        [image], _ = handler.detection.detect.call_args
+        self.assertEqual(image.shape, (50, 200, 3))
+        [encoded], _ = encoder.submit.call_args
+        self.assertEqual(encoded.items, [Box(10, 55, 20, 20, 1.0)])
+
+    def test_motion_outside_roi(self):
+        '''Движение вне областей распознавания не запускает
+        распознавание.'''
+
+        # Отдельный адрес, чтобы не менять метрики камеры других тестов
+        camera_url = 'https://example.com/roi.m3u8'
+        handler = FrameHandler(
+            camera_url,
+            DetectionConfig.from_camera(self.camera),
+            encoder=mock.Mock(),
+        )
+        handler.motion = mock.Mock()
+        handler.motion.detect.return_value = (0, 0, 50, 20)
+        handler.detection = mock.Mock()
+        frames = metrics.FRAMES.get(camera=camera_url, result='outside_roi')
+        handler.handle(np.zeros((100, 200, 3), dtype=np.uint8))
+
+        handler.detection.detect.assert_not_called()
+        self.assertEqual(
+            metrics.FRAMES.get(camera=camera_url, result='outside_roi'),
+            frames + 1,
+        )
+
+    @mock.patch('vision.camera_vision.VideoCatch')
+    @mock.patch('vision.jobs.enqueue')
+    def test_job_uses_camera(self, enqueue, video_catch):
+        '''Задача для камеры реестра использует ее параметры.'''
+
+        video_catch.return_value.process.return_value = '/media/file/1.jpg'
+        job = submit_job(CAMERA_URL, ['cars'])
+        self.assertEqual(job.camera, self.camera)
+
+        run_detection_job(job.pk)
+        _, kwargs = video_catch.call_args
+        self.assertEqual(kwargs['camera_config'].camera_id, self.camera.pk)
+        self.assertEqual(kwargs['detection'].object_types, ['cars'])
+        self.assertEqual(kwargs['detection'].roi, ROI)
+
+    def test_roi_validation(self):
+        self.camera.roi = [[[0, 0], [2, 0], [1, 1]]]
+        with self.assertRaises(ValidationError):
+            self.camera.full_clean()
+
+    def test_validation(self):
+        '''Некорректные параметры камеры вызывают ValidationError.'''
+
+        self.camera.full_clean()
+        invalid = {
+            'roi': [[0.1, 0.2, 0.3]],
+            'backend': 'unknown',
+            'object_types': ['unknown'],
+            'scale_factor': 1.0,
+        }
+        for field, value in invalid.items():
+            with self.subTest(field=field):
+                camera = Camera(
+                    url=CAMERA_URL, object_types=['people'], roi=ROI
+                )
+                setattr(camera, field, value)
+                with self.assertRaises(ValidationError) as context:
+                    camera.clean()
+                self.assertEqual(
+                    list(context.exception.message_dict), [field]
+                )
@@ -0,0 +1,57 @@
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from vision.detection import Box, DetectionPass
+
+
+class DetectionPassTests(SimpleTestCase):
+    '''Класс для тестирования прохода распознавания.'''
+
+    @mock.patch('vision.detection.classifiers')
+    def test_boxes_mapped_to_full_resolution(self, classifiers):
+        '''Координаты объектов переводятся в разрешение исходного кадра,
+        а перевод в оттенки серого выполняется один раз.'''
+
+        classifier = classifiers.get.return_value
+        classifier.detectMultiScale3.return_value = (
+            [(10, 20, 30, 40)], [20], [1.5]
+        )
+        frame = np.zeros((400, 600, 3), dtype=np.uint8)
+        detection = DetectionPass(['cars', 'people'], scales=(0.5,))
+
+        with mock.patch(
+            'vision.detection.cv2.cvtColor',
+            return_value=np.zeros((400, 600), dtype=np.uint8),
+        ) as cvt_color:
+            result = detection.detect(frame)
+
+        cvt_color.assert_called_once()
+        box = Box(20, 40, 60, 80, confidence=1.5)
+        self.assertEqual(result, {'cars': [box], 'people': [box]})
+        image = classifier.detectMultiScale3.call_args.args[0]
+        self.assertEqual(image.shape, (200, 300))
+        self.assertEqual(
+            classifier.detectMultiScale3.call_args.kwargs['minSize'], (15, 15)
+        )
+
+    @mock.patch('vision.detection.classifiers')
+    def test_region_offsets_boxes(self, classifiers):
+        '''Распознавание в области движения возвращает координаты
+        в системе исходного кадра.'''
+
+        classifier = classifiers.get.return_value
+        classifier.detectMultiScale3.return_value = (
+            [(10, 20, 30, 40)], [20], [1.5]
+        )
+        frame = np.zeros((400, 600, 3), dtype=np.uint8)
+        detection = DetectionPass(['cars'])
+
+        result = detection.detect(frame, region=(100, 50, 200, 150))
+
+        self.assertEqual(
+            result, {'cars': [Box(110, 70, 30, 40, confidence=1.5)]}
+        )
+        image = classifier.detectMultiScale3.call_args.args[0]
+        self.assertEqual(image.shape, (150, 200))
@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from vision.models import Detection
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+
+
+class DetectionViewTests(TestCase):
+    '''Класс для тестирования API распознанных объектов.'''
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for object_class, count in (('cars', 2), ('cars', 3), ('people', 1)):
+            Detection.objects.create(
+                camera_url=CAMERA_URL,
+                object_class=object_class,
+                count=count,
+                boxes=[[0, 0, 10, 10, 1.0]] * count,
+                confidence=1.0,
+            )
+
+    def setUp(self) -> None:
+        self.client = Client()
+
+    def test_filter_by_class(self):
+        '''Фильтрация распознаваний по типу объектов.'''
+
+        response = self.client.get(
+            reverse('vision:detection-list'), data={'object_class': 'cars'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.data.get('count'), 2)
+
+    def test_stats(self):
+        '''Агрегирование количества объектов по камере и типу.'''
+
+        response = self.client.get(
+            reverse('vision:detection-stats'), data={'period': 'day'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        stats = {
+            item['object_class']: (item['detections'], item['objects'])
+            for item in response.data.get('results')
+        }
+        self.assertEqual(stats, {'cars': (2, 5), 'people': (1, 1)})
+
+    def test_stats_invalid_period(self):
+        '''Недопустимый период агрегирования.'''
+
+        response = self.client.get(
+            reverse('vision:detection-stats'), data={'period': 'year'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
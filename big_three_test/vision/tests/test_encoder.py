@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from vision.camera_vision import DetectionConfig, FrameHandler
+from vision.detection import Box
+from vision.encoder import EncodedFrame, FrameEncoder
+from vision.models import Detection
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def get_frame():
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    frame[40:80, 60:100] = 200
+    return frame
+
+
+class FrameEncoderTests(SimpleTestCase):
+    '''Класс для тестирования пула кодирования кадров.'''
+
+    def setUp(self):
+        self.saved = []
+        patcher = mock.patch(
+            'vision.encoder.save_content', side_effect=self.save_content
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save_content(self, content, extension):
+        '''Вместо сохранения декодирует содержимое.'''
+
+        image = cv2.imdecode(
+            np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR
+        )
+        self.saved.append((extension, image))
+        return mock.Mock()
+
+    def test_annotated_and_original(self):
+        '''Размеченный и исходный кадры уменьшаются и сохраняются
+        в заданном формате, переданный кадр не изменяется.'''
+
+        encoder = FrameEncoder(
+            workers=1,
+            format='webp',
+            quality=100,
+            max_width=80,
+            keep_original=True,
+        )
+        frame = get_frame()
+        on_saved = mock.Mock()
+        encoded = EncodedFrame(
+            CAMERA_URL, frame, [Box(50, 30, 60, 60, 1.0)], on_saved
+        )
+        self.assertTrue(encoder.submit(encoded))
+        self.assertTrue(encoder.flush(timeout=5))
+
+        self.assertTrue(encoded.done.is_set())
+        on_saved.assert_called_once_with(encoded.file, encoded.original)
+        [(extension, annotated), (_, original)] = self.saved
+        self.assertEqual(extension, 'webp')
+        self.assertEqual(annotated.shape, (60, 80, 3))
+        self.assertEqual(original.shape, (60, 80, 3))
+        # Желтый прямоугольник есть только на размеченном кадре
+        self.assertGreater(annotated[15, 40, 2], 200)
+        self.assertLess(original[15, 40, 2], 50)
+        self.assertEqual(frame.max(), 200)
+
+    def test_full_queue_drops_frames(self):
+        '''При переполнении очереди кадры отбрасываются без ожидания.'''
+
+        encoder = FrameEncoder(workers=0, queue_size=1)
+        for expected in (True, False):
+            self.assertEqual(
+                encoder.submit(EncodedFrame(CAMERA_URL, get_frame(), [])),
+                expected,
+            )
+        self.assertEqual(encoder.dropped_count, 1)
+        self.assertFalse(encoder.flush(timeout=0))
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            FrameEncoder(workers=0, format='bmp')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MOTION_DETECTION=False)
+class FrameHandlerEncodingTests(TestCase):
+    '''Класс для тестирования сохранения кадров с распознаваниями.'''
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_detections_reference_both_frames(self):
+        '''Распознавания ссылаются на размеченный и исходный кадры,
+        а обработчик не ожидает кодирования.'''
+
+        encoder = FrameEncoder(workers=0, keep_original=True)
+        handler = FrameHandler(
+            CAMERA_URL,
+            DetectionConfig(object_types=['cars']),
+            encoder=encoder,
+        )
+        handler.detection = mock.Mock()
+        handler.detection.detect.return_value = {
+            'cars': [Box(60, 40, 40, 40, 0.9)]
+        }
+
+        encoded = handler.handle(get_frame())
+        self.assertFalse(encoded.done.is_set())
+        self.assertFalse(Detection.objects.exists())
+
+        encoder.process(encoded)
+        detection = Detection.objects.get()
+        self.assertEqual(detection.file, encoded.file)
+        self.assertEqual(detection.original, encoded.original)
+        self.assertNotEqual(
+            encoded.file.checksum, encoded.original.checksum
+        )
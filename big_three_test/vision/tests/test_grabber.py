@@ -0,0 +1,60 @@
+import time
+
+from django.test import SimpleTestCase
+
+from vision.grabber import FrameGrabber
+
+
+class FakeStream:
+    '''Имитация cv2.VideoCapture с конечным количеством кадров.'''
+
+    def __init__(self, frames_count: int):
+        self.frames_count = frames_count
+        self.grabbed = 0
+        self.retrieved = 0
+
+    def grab(self):
+        if self.grabbed >= self.frames_count:
+            return False
+        self.grabbed += 1
+        time.sleep(0.001)
+        return True
+
+    def retrieve(self):
+        self.retrieved += 1
+        return True, self.grabbed
+
+
+class FrameGrabberTests(SimpleTestCase):
+    '''Класс для тестирования потока захвата кадров.'''
+
+    def test_retrieve_only_on_request(self):
+        '''Кадры декодируются только по запросу.'''
+
+        stream = FakeStream(frames_count=200)
+        grabber = FrameGrabber(stream)
+        grabber.start()
+        success, frame = grabber.read(timeout=1)
+        grabber.join(timeout=1)
+        self.assertTrue(success)
+        self.assertEqual(stream.retrieved, 1)
+        self.assertEqual(stream.grabbed, 200)
+        self.assertEqual(grabber.grabbed_count, 200)
+
+    def test_read_after_stream_end(self):
+        '''После окончания потока чтение возвращает неуспешный результат.'''
+
+        grabber = FrameGrabber(FakeStream(frames_count=1))
+        grabber.start()
+        grabber.join(timeout=1)
+        self.assertEqual(grabber.read(timeout=0.1), (False, None))
+
+    def test_listener_receives_every_frame(self):
+        '''Обработчику кадров передается каждый кадр видеопотока.'''
+
+        frames = []
+        stream = FakeStream(frames_count=20)
+        grabber = FrameGrabber(stream, listener=frames.append)
+        grabber.start()
+        grabber.join(timeout=1)
+        self.assertEqual(frames, list(range(1, 21)))
@@ -0,0 +1,156 @@
+import tempfile
+from concurrent.futures import Future
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from big_three_test.metrics import Histogram, Registry
+from vision import jobs
+from vision.jobs import run_detection_job, submit_job
+from vision.models import DetectionJob
+from vision.profiling import SamplingProfiler
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+
+
+class DetectionJobTests(TestCase):
+    '''Класс для тестирования фоновых задач распознавания.'''
+
+    def setUp(self) -> None:
+        self.client = Client()
+
+    @mock.patch('vision.jobs.enqueue')
+    def test_post_creates_job(self, enqueue):
+        '''Отправка формы создает задачу и не запускает распознавание.'''
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('vision:index'),
+                data={
+                    'camera_url': CAMERA_URL,
+                    'object_types': ['cars', 'people'],
+                },
+            )
+        job = DetectionJob.objects.get()
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertEqual(job.status, DetectionJob.PENDING)
+        self.assertEqual(job.object_types, ['cars', 'people'])
+        enqueue.assert_called_once_with(job.pk)
+
+    @override_settings(DETECTION_QUEUE_SIZE=1)
+    @mock.patch('vision.jobs.enqueue')
+    def test_post_with_full_queue(self, enqueue):
+        '''При переполненной очереди новая задача не создается.'''
+
+        DetectionJob.objects.create(
+            camera_url=CAMERA_URL, object_types=['cars']
+        )
+        response = self.client.post(
+            reverse('vision:index'), data={'camera_url': CAMERA_URL}
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(DetectionJob.objects.count(), 1)
+        enqueue.assert_not_called()
+
+    @override_settings(DETECTION_QUEUE_SIZE=1, DETECTION_JOB_TIMEOUT=60)
+    @mock.patch('vision.jobs.enqueue')
+    def test_stale_jobs_released(self, enqueue):
+        '''Потерянные задачи завершаются с ошибкой и освобождают
+        место в очереди.'''
+
+        stale_job = DetectionJob.objects.create(
+            camera_url=CAMERA_URL,
+            object_types=['cars'],
+            status=DetectionJob.RUNNING,
+        )
+        DetectionJob.objects.filter(pk=stale_job.pk).update(
+            updated=timezone.now() - timedelta(seconds=61)
+        )
+        job = submit_job(CAMERA_URL, ['cars'])
+        stale_job.refresh_from_db()
+        self.assertEqual(stale_job.status, DetectionJob.FAILED)
+        self.assertEqual(job.status, DetectionJob.PENDING)
+
+    @mock.patch('vision.camera_vision.VideoCatch')
+    def test_run_job(self, video_catch):
+        '''Результат распознавания сохраняется в задаче.'''
+
+        video_catch.return_value.process.return_value = '/media/file/1.jpg'
+        job = DetectionJob.objects.create(
+            camera_url=CAMERA_URL, object_types=['cars']
+        )
+        run_detection_job(job.pk)
+        response = self.client.get(
+            reverse('vision:job-status', args=(job.pk,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json().get('status'), DetectionJob.DONE)
+        self.assertEqual(response.json().get('result'), '/media/file/1.jpg')
+
+    @mock.patch('vision.jobs.run_detection_job')
+    def test_worker_metrics_reach_parent(self, run_job):
+        '''Метрики дочернего процесса передаются с результатом задачи
+        и добавляются к метрикам процесса, отдающего /metrics.'''
+
+        worker_registry, parent_registry = Registry(), Registry()
+        worker_stage = Histogram(
+            'stage_seconds', 'test', labels=('stage',),
+            registry=worker_registry,
+        )
+        parent_stage = Histogram(
+            'stage_seconds', 'test', labels=('stage',),
+            registry=parent_registry,
+        )
+        run_job.side_effect = lambda job_id: worker_stage.observe(
+            0.2, stage='detect'
+        )
+
+        with mock.patch.object(jobs, 'default_registry', worker_registry):
+            snapshot = jobs.run_in_worker(1)
+        self.assertEqual(worker_stage.get_count(stage='detect'), 0)
+
+        future = Future()
+        future.set_result(snapshot)
+        with mock.patch.object(jobs, 'default_registry', parent_registry):
+            jobs._on_job_done(1)(future)
+            jobs._on_job_done(1)(future)
+        self.assertEqual(parent_stage.get_count(stage='detect'), 2)
+        _, total = parent_stage.get_buckets(stage='detect')
+        self.assertAlmostEqual(total, 0.4)
+
+    @mock.patch('vision.jobs.run_detection_job')
+    def test_worker_profiles_are_dumped(self, run_job):
+        '''Стеки профилировщика дочернего процесса передаются
+        с результатом задачи и сохраняются процессом, создавшим ее.'''
+
+        worker_profiler, parent_profiler = (
+            SamplingProfiler(), SamplingProfiler()
+        )
+        run_job.side_effect = lambda job_id: worker_profiler.stacks[
+            CAMERA_URL
+        ].update({'run (camera_vision.py:1)': 3})
+
+        with mock.patch.object(jobs, 'profiler', worker_profiler):
+            result = jobs.run_in_worker(1)
+        self.assertEqual(dict(worker_profiler.stacks), {})
+
+        future = Future()
+        future.set_result(result)
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            override_settings(VISION_PROFILE_DIR=directory),
+            mock.patch.object(jobs, 'profiler', parent_profiler),
+        ):
+            jobs._on_job_done(1)(future)
+            jobs._on_job_done(1)(future)
+            [path] = Path(directory).iterdir()
+            self.assertEqual(
+                path.read_text(), 'run (camera_vision.py:1) 6\n'
+            )
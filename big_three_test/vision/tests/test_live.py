@@ -0,0 +1,97 @@
+import threading
+from http import HTTPStatus
+from unittest import mock
+
+import numpy as np
+from django.test import Client, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from vision.detection import Box
+from vision.live import LivePipeline, LivePipelines, stream_events
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+
+
+@override_settings(MOTION_DETECTION=False)
+@mock.patch('vision.live.LivePipeline.start')
+class LivePipelineTests(SimpleTestCase):
+    '''Класс для тестирования общего потока просмотра камеры.'''
+
+    def test_viewers_share_pipeline(self, start):
+        '''Зрители одной камеры используют общий поток, который
+        останавливается при отключении последнего зрителя.'''
+
+        registry = LivePipelines()
+        first = registry.acquire(CAMERA_URL, ['cars', 'people'])
+        second = registry.acquire(CAMERA_URL, ['people', 'cars'])
+        other = registry.acquire(CAMERA_URL, ['cars'])
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(start.call_count, 2)
+        registry.release(first)
+        self.assertFalse(first._stopped.is_set())
+        registry.release(second)
+        self.assertTrue(first._stopped.is_set())
+        self.assertIsNot(
+            registry.acquire(CAMERA_URL, ['cars', 'people']), first
+        )
+
+    def test_process_publishes_frame_and_event(self, start):
+        '''Кадр публикуется в формате JPEG, а распознанные объекты -
+        в виде события.'''
+
+        pipeline = LivePipeline(CAMERA_URL, ['cars'])
+        pipeline.detection = mock.Mock()
+        pipeline.detection.detect.return_value = {
+            'cars': [Box(1, 2, 3, 4, confidence=0.5)]
+        }
+        pipeline.process(np.zeros((48, 64, 3), dtype=np.uint8))
+
+        self.assertEqual(pipeline.wait(0, timeout=0), 1)
+        self.assertTrue(pipeline.frame.startswith(b'\xff\xd8'))
+        [event] = pipeline.get_events(0)
+        self.assertEqual(event['type'], 'detection')
+        self.assertEqual(event['objects'], {'cars': [[1, 2, 3, 4, 0.5]]})
+
+    @mock.patch('vision.live.pipelines', new_callable=LivePipelines)
+    def test_stream_events(self, pipelines, start):
+        '''События передаются в формате Server-Sent Events, а зритель
+        отключается при закрытии потока.'''
+
+        pipeline = pipelines.acquire(CAMERA_URL, ['cars'])
+        threading.Timer(
+            0.1,
+            pipeline.publish,
+            args=(b'', {'type': 'detection', 'objects': {}}),
+        ).start()
+
+        events = stream_events(CAMERA_URL, ['cars'])
+        message = next(events)
+        self.assertEqual(pipeline.subscribers, 2)
+        self.assertTrue(message.startswith('event: detection\ndata: {'))
+        events.close()
+        self.assertEqual(pipeline.subscribers, 1)
+
+
+class LiveViewTests(SimpleTestCase):
+    '''Класс для тестирования представлений просмотра камеры.'''
+
+    def test_invalid_params(self):
+        response = Client().get(reverse('vision:live'))
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('camera_url', response.json())
+
+    @mock.patch('vision.views.stream_frames', return_value=iter([b'']))
+    def test_mjpeg_stream(self, stream_frames):
+        response = Client().get(
+            reverse('vision:live'),
+            {'camera_url': CAMERA_URL, 'object_types': ['people']},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response['Content-Type'],
+            'multipart/x-mixed-replace; boundary=frame',
+        )
+        stream_frames.assert_called_once_with(CAMERA_URL, ['people'])
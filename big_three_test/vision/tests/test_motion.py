@@ -0,0 +1,66 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from vision.motion import MotionDetector, hash_distance, perceptual_hash
+
+
+class MotionDetectorTests(SimpleTestCase):
+    '''Класс для тестирования определения движения.'''
+
+    def setUp(self):
+        self.background = np.full((240, 320, 3), 80, dtype=np.uint8)
+        self.motion = MotionDetector(scale=0.5)
+
+    def test_first_frame_is_full_frame(self):
+        '''На первом кадре распознавание выполняется на всем кадре.'''
+
+        self.assertIsNone(self.motion.detect(self.background))
+
+    def test_static_scene_has_no_motion(self):
+        '''В неизменной сцене движение не обнаруживается.'''
+
+        for _ in range(5):
+            region = self.motion.detect(self.background.copy())
+        self.assertEqual(region, ())
+
+    def test_moving_object_region(self):
+        '''Область движения охватывает появившийся объект.'''
+
+        for _ in range(5):
+            self.motion.detect(self.background.copy())
+        frame = self.background.copy()
+        frame[100:160, 200:260] = 255
+
+        x, y, w, h = self.motion.detect(frame)
+
+        self.assertTrue(x <= 200 and y <= 100)
+        self.assertTrue(x + w >= 260 and y + h >= 160)
+        self.assertLess(w * h, 320 * 240 / 2)
+
+
+class PerceptualHashTests(SimpleTestCase):
+    '''Класс для тестирования перцептивного хэша кадров.'''
+
+    def test_near_duplicate_frames(self):
+        '''Хэши кадров с небольшим шумом почти совпадают, а хэши
+        разных кадров значительно различаются.'''
+
+        gradient = np.tile(
+            np.linspace(0, 255, 320, dtype=np.uint8), (240, 1)
+        )
+        frame = np.dstack([gradient] * 3)
+        noise = np.random.default_rng(0).integers(
+            0, 3, frame.shape, dtype=np.uint8
+        )
+        other = np.ascontiguousarray(frame[:, ::-1])
+
+        self.assertLessEqual(
+            hash_distance(perceptual_hash(frame), perceptual_hash(
+                frame + noise
+            )),
+            6,
+        )
+        self.assertGreater(
+            hash_distance(perceptual_hash(frame), perceptual_hash(other)),
+            32,
+        )
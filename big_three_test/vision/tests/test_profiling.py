@@ -0,0 +1,83 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from vision import metrics
+from vision.camera_vision import DetectionConfig, FrameHandler
+from vision.profiling import SamplingProfiler
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+
+
+def busy_loop(stopped: threading.Event):
+    while not stopped.is_set():
+        sum(range(100))
+
+
+class SamplingProfilerTests(SimpleTestCase):
+    '''Класс для тестирования выборочного профилировщика.'''
+
+    def test_samples_only_tracked_cameras(self):
+        '''Стеки снимаются только с потоков профилируемых камер.'''
+
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.enable(CAMERA_URL)
+        stopped = threading.Event()
+
+        def work(camera_url):
+            with profiler.track(camera_url):
+                busy_loop(stopped)
+
+        threads = [
+            threading.Thread(target=work, args=(camera_url,))
+            for camera_url in (CAMERA_URL, 'https://example.com/other')
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        stopped.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(list(profiler.stacks), [CAMERA_URL])
+        report = profiler.get_report(CAMERA_URL)
+        self.assertIn('busy_loop (test_profiling.py:', report)
+        with tempfile.TemporaryDirectory() as directory:
+            [path] = profiler.dump(directory)
+            self.assertEqual(
+                Path(path).name, 'https_example.com_stream.m3u8.folded'
+            )
+
+
+class FrameHandlerMetricsTests(SimpleTestCase):
+    '''Класс для тестирования метрик обработки кадров.'''
+
+    @override_settings(MOTION_DETECTION=True)
+    def test_stage_metrics(self):
+        handler = FrameHandler(
+            CAMERA_URL, DetectionConfig(object_types=['cars'])
+        )
+        handler.detection = mock.Mock()
+        handler.detection.detect.return_value = {'cars': []}
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        for _ in range(3):
+            handler.handle(frame)
+
+        self.assertEqual(
+            metrics.STAGE_SECONDS.get_count(
+                camera=CAMERA_URL, stage='motion'
+            ),
+            3,
+        )
+        # Первый кадр распознается целиком, на остальных нет движения
+        self.assertEqual(
+            metrics.FRAMES.get(camera=CAMERA_URL, result='no_objects'), 1
+        )
+        self.assertEqual(
+            metrics.FRAMES.get(camera=CAMERA_URL, result='no_motion'), 2
+        )
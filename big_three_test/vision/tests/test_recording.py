@@ -0,0 +1,127 @@
+import queue
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase
+
+from vision.recording import ClipRecorder
+
+
+class ClipRecorderTests(SimpleTestCase):
+    '''Класс для тестирования записи видеороликов.'''
+
+    def setUp(self):
+        self.saved = []
+        patcher = mock.patch(
+            'vision.recording.create_file', side_effect=self.create_file
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_file(self, file):
+        '''Вместо сохранения подсчитывает кадры видеоролика.'''
+
+        capture = cv2.VideoCapture(file.file.name)
+        frames = 0
+        while capture.read()[0]:
+            frames += 1
+        capture.release()
+        self.saved.append((file.name, frames))
+        return mock.Mock()
+
+    def get_frame(self, value: int):
+        return np.full((48, 64, 3), value, dtype=np.uint8)
+
+    def test_clip_contains_pre_and_post_roll(self):
+        '''Ролик содержит кадры до и после распознавания, а буфер
+        кадров до распознавания ограничен.'''
+
+        recorder = ClipRecorder(
+            fps=10, pre_roll=0.5, post_roll=0.3, frame_queue_size=10
+        )
+        for value in range(10):
+            recorder.add(self.get_frame(value))
+        # Кадры сжимаются в отдельном потоке
+        recorder._frames.join()
+        self.assertEqual(len(recorder.pre_roll), 5)
+
+        clip = recorder.trigger()
+        for value in range(10, 15):
+            recorder.add(self.get_frame(value))
+
+        self.assertTrue(clip.done.wait(timeout=5))
+        recorder.close(timeout=5)
+        self.assertEqual(len(self.saved), 1)
+        name, frames = self.saved[0]
+        self.assertTrue(name.endswith('.mp4'))
+        self.assertEqual(frames, 8)
+        # Кадры после окончания ролика снова попадают в буфер
+        self.assertEqual(len(recorder.pre_roll), 2)
+
+    def test_full_queue_drops_frames(self):
+        '''При переполнении очереди кадры отбрасываются без ожидания.'''
+
+        recorder = ClipRecorder(fps=10, pre_roll=1, frame_queue_size=2)
+        # Потоки сжатия и кодирования остановлены и не разбирают очереди
+        recorder.close(timeout=5)
+        for value in range(10):
+            recorder.add(self.get_frame(value))
+        self.assertEqual(recorder.dropped_count, 8)
+
+    def test_clip_with_dropped_frames_is_done(self):
+        '''Ролик, все кадры которого отброшены, завершается без
+        сохранения.'''
+
+        recorder = ClipRecorder(fps=10, post_roll=0.3, frame_queue_size=5)
+        with mock.patch.object(
+            recorder._queue, 'put_nowait', side_effect=queue.Full
+        ):
+            clip = recorder.trigger()
+            for value in range(3):
+                recorder.add(self.get_frame(value))
+            self.assertTrue(clip.done.wait(timeout=5))
+        recorder.close(timeout=5)
+        self.assertEqual(recorder.dropped_count, 3)
+        self.assertEqual(self.saved, [])
+
+    @mock.patch('vision.recording.cv2.VideoWriter')
+    def test_writer_not_opened(self, video_writer):
+        '''Ролик не сохраняется, если запись видео не открылась.'''
+
+        video_writer.return_value.isOpened.return_value = False
+        recorder = ClipRecorder(fps=10, post_roll=0.3)
+        clip = recorder.trigger()
+        for value in range(3):
+            recorder.add(self.get_frame(value))
+        self.assertTrue(clip.done.wait(timeout=5))
+        recorder.close(timeout=5)
+        self.assertIsNone(clip.file)
+        self.assertEqual(self.saved, [])
+
+    def test_buffer_is_compressed_and_bounded(self):
+        '''Кадры буфера уменьшаются и сжимаются, а размер буфера
+        ограничен в байтах.'''
+
+        recorder = ClipRecorder(
+            fps=10,
+            pre_roll=5,
+            max_width=32,
+            max_buffer_size=2000,
+            frame_queue_size=20,
+        )
+        noise = np.random.default_rng(0).integers(
+            0, 256, (48, 64, 3), dtype=np.uint8
+        )
+        for _ in range(20):
+            recorder.add(noise)
+        recorder._frames.join()
+        self.assertLess(len(recorder.pre_roll), 20)
+        self.assertLessEqual(recorder.pre_roll_size, 2000)
+        self.assertEqual(
+            recorder.pre_roll_size,
+            sum(frame.nbytes for frame in recorder.pre_roll),
+        )
+        frame = cv2.imdecode(recorder.pre_roll[0], cv2.IMREAD_COLOR)
+        self.assertEqual(frame.shape, (24, 32, 3))
+        recorder.close(timeout=5)
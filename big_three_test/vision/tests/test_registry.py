@@ -0,0 +1,40 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from vision.registry import ClassifierRegistry, classifiers
+
+
+class ClassifierRegistryTests(SimpleTestCase):
+    '''Класс для тестирования реестра каскадных классификаторов.'''
+
+    def test_builtin_cascades_registered(self):
+        '''Встроенные каскады регистрируются автоматически.'''
+
+        self.assertIn('cars', classifiers)
+        self.assertIn('people', classifiers)
+
+    def test_instance_per_thread(self):
+        '''Каскад загружается один раз на поток.'''
+
+        registry = ClassifierRegistry()
+        registry.autodiscover()
+        first = registry.get('cars')
+        self.assertIs(registry.get('CARS'), first)
+
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.update(cars=registry.get('cars'))
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(result['cars'], first)
+        stats = registry.stats()['cars']
+        self.assertEqual(stats['instances'], 2)
+        self.assertGreater(stats['load_time'], 0)
+
+    def test_unknown_cascade(self):
+        '''Незарегистрированный каскад не может быть получен.'''
+
+        with self.assertRaises(KeyError):
+            ClassifierRegistry().get('cars')
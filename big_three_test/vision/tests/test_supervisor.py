@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from vision.camera_vision import CameraConfig
+from vision.supervisor import Backoff, CameraWorker
+
+
+class BackoffTests(SimpleTestCase):
+    '''Класс для тестирования задержки переподключения.'''
+
+    def test_delay_grows_up_to_maximum(self):
+        backoff = Backoff(1, 5)
+        delays = [backoff.next() for _ in range(5)]
+        for delay, expected in zip(delays, (1, 2, 4, 5, 5)):
+            self.assertTrue(expected <= delay <= expected * 1.1)
+        backoff.reset()
+        self.assertLessEqual(backoff.next(), 1.1)
+
+
+class CameraWorkerTests(SimpleTestCase):
+    '''Класс для тестирования потока обработки камеры.'''
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+        self.stopped = threading.Event()
+        self.handler = mock.Mock()
+
+    def get_worker(self, **kwargs) -> CameraWorker:
+        return CameraWorker(
+            CameraConfig(camera_url='http://camera', record=False),
+            self.handler,
+            self.executor,
+            self.stopped,
+            **kwargs,
+        )
+
+    def test_oldest_frames_dropped_while_busy(self):
+        '''Пока кадр камеры распознается, в очереди остаются только
+        самые свежие кадры.'''
+
+        started, release = threading.Event(), threading.Event()
+        handled = []
+
+        def handle(frame):
+            handled.append(frame)
+            started.set()
+            release.wait(timeout=5)
+
+        self.handler.handle.side_effect = handle
+        worker = self.get_worker(queue_size=2)
+        worker.submit(1)
+        self.assertTrue(started.wait(timeout=5))
+        for frame in range(2, 6):
+            worker.submit(frame)
+        release.set()
+        for _ in range(100):
+            if not worker.busy:
+                break
+            self.stopped.wait(0.05)
+
+        self.assertEqual(handled, [1, 4, 5])
+        self.assertEqual(worker.dropped_count, 2)
+        self.assertFalse(worker.busy)
+
+    @override_settings(
+        CAMERA_RECONNECT_DELAY=0.01, CAMERA_RECONNECT_MAX_DELAY=0.02
+    )
+    @mock.patch('vision.supervisor.cv2.VideoCapture')
+    def test_reconnect_until_stopped(self, video_capture):
+        '''При недоступности камеры поток переподключается к ней
+        до остановки.'''
+
+        video_capture.return_value.isOpened.return_value = False
+        worker = self.get_worker()
+        worker.start()
+        self.stopped.wait(0.2)
+        self.stopped.set()
+        worker.join(timeout=1)
+
+        self.assertFalse(worker.is_alive())
+        self.assertGreater(worker.reconnect_count, 2)
+        self.assertEqual(
+            video_capture.return_value.release.call_count,
+            video_capture.call_count,
+        )
@@ -0,0 +1,165 @@
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from vision.camera_vision import DetectionConfig, FrameHandler
+from vision.detection import Box
+from vision.tracking import IouTracker, get_iou
+
+CAMERA_URL = 'https://example.com/stream.m3u8'
+
+
+class IouTrackerTests(SimpleTestCase):
+    '''Класс для тестирования трекера объектов.'''
+
+    def test_iou(self):
+        box = Box(0, 0, 10, 10, 1.0)
+        self.assertEqual(get_iou(box, box._replace(x=5)), 50 / 150)
+        self.assertEqual(get_iou(box, box._replace(x=20)), 0)
+
+    def test_stable_ids_between_detections(self):
+        '''Движущийся объект сохраняет идентификатор благодаря
+        предсказанию положения между распознаваниями.'''
+
+        tracker = IouTracker(iou_threshold=0.3)
+        # Объект смещается на 3 пикселя за кадр, распознавание
+        # выполняется на каждом третьем кадре
+        for frame_index in range(10):
+            tracker.predict()
+            if frame_index % 3:
+                continue
+            box = Box(3 * frame_index, 0, 20, 20, 1.0)
+            [track] = tracker.update({'cars': [box]})['cars']
+            self.assertEqual(track.id, 1)
+        [track] = tracker.tracks
+        self.assertEqual(track.velocity, (3, 0))
+        self.assertEqual(track.box.x, 27)
+        self.assertEqual(tracker.counts['cars'], 1)
+
+    def test_new_objects_and_misses(self):
+        '''Новые объекты получают новые идентификаторы, а пропавшие
+        перестают отслеживаться.'''
+
+        tracker = IouTracker(max_misses=1)
+        tracker.update({'cars': [Box(0, 0, 20, 20, 1.0)]})
+        tracks = tracker.update({
+            'cars': [Box(100, 100, 20, 20, 1.0), Box(1, 1, 20, 20, 1.0)],
+            'people': [Box(0, 0, 20, 20, 1.0)],
+        })
+        self.assertEqual([track.id for track in tracks['cars']], [2, 1])
+        self.assertEqual([track.id for track in tracks['people']], [3])
+
+        tracker.update({})
+        self.assertEqual(len(tracker.tracks), 3)
+        tracker.update({})
+        self.assertEqual(tracker.tracks, [])
+        self.assertEqual(tracker.counts, {'cars': 2, 'people': 1})
+
+
+@override_settings(TRACKING=True, MOTION_DETECTION=False)
+class FrameHandlerTrackingTests(SimpleTestCase):
+    '''Класс для тестирования распознавания с отслеживанием объектов.'''
+
+    def test_detect_every_and_new_tracks(self):
+        '''Распознавание выполняется на каждом N-м кадре, а кадр
+        сохраняется только при появлении новых объектов.'''
+
+        encoder = mock.Mock()
+        handler = FrameHandler(
+            CAMERA_URL,
+            DetectionConfig(object_types=['cars'], detect_every=2),
+            encoder=encoder,
+        )
+        handler.detection = mock.Mock()
+        handler.detection.detect.side_effect = [
+            {'cars': [Box(0, 0, 20, 20, 1.0)]},
+            {'cars': [Box(4, 0, 20, 20, 1.0)]},
+            {'cars': [Box(8, 0, 20, 20, 1.0), Box(60, 60, 20, 20, 1.0)]},
+        ]
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        for _ in range(6):
+            handler.handle(frame)
+
+        self.assertEqual(handler.detection.detect.call_count, 3)
+        self.assertEqual(encoder.submit.call_count, 2)
+        self.assertEqual(handler.tracker.counts['cars'], 2)
+
+    def get_handler(self, encoder):
+        handler = FrameHandler(
+            CAMERA_URL,
+            DetectionConfig(object_types=['cars'], detect_every=1),
+            encoder=encoder,
+        )
+        handler.detection = mock.Mock()
+        return handler
+
+    def test_new_object_in_static_scene(self):
+        '''Кадр с новым объектом сохраняется, даже если сцена почти
+        не изменилась.'''
+
+        encoder = mock.Mock()
+        handler = self.get_handler(encoder)
+        first, second = Box(10, 10, 20, 20, 1.0), Box(100, 60, 20, 20, 1.0)
+        handler.detection.detect.side_effect = [
+            {'cars': [first]},
+            {'cars': [first]},
+            {'cars': [first, second]},
+        ]
+        frame = np.full((120, 160, 3), 90, dtype=np.uint8)
+        for _ in range(3):
+            handler.handle(frame)
+
+        self.assertEqual(encoder.submit.call_count, 2)
+        [encoded], _ = encoder.submit.call_args
+        self.assertEqual(encoded.items, [first, second])
+
+    def test_dropped_and_failed_frames_are_retried(self):
+        '''Если кадр с новым объектом отброшен или не сохранен,
+        он сохраняется при следующем распознавании объекта.'''
+
+        encoder = mock.Mock()
+        encoder.submit.side_effect = [False, True, True, True]
+        handler = self.get_handler(encoder)
+        handler.detection.detect.return_value = {
+            'cars': [Box(10, 10, 20, 20, 1.0)]
+        }
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        # Кадр отброшен пулом, затем передан повторно
+        handler.handle(frame)
+        encoded = handler.handle(frame)
+        self.assertEqual(encoder.submit.call_count, 2)
+        handler.handle(frame)
+        self.assertEqual(encoder.submit.call_count, 2)
+
+        # Сохранение завершилось ошибкой
+        encoded.done.set()
+        handler.handle(frame)
+        self.assertEqual(encoder.submit.call_count, 3)
+        handler.handle(frame)
+        self.assertEqual(encoder.submit.call_count, 3)
+
+    def test_dropped_frame_duplicate(self):
+        '''Кадр с объектом из отброшенного кадра не сохраняется,
+        пока сцена не отличается от последнего сохраненного кадра.'''
+
+        encoder = mock.Mock()
+        encoder.submit.side_effect = [True, False, True]
+        handler = self.get_handler(encoder)
+        first, second = Box(10, 10, 20, 20, 1.0), Box(100, 60, 20, 20, 1.0)
+        handler.detection.detect.side_effect = [
+            {'cars': [first]},
+            {'cars': [first, second]},
+            {'cars': [first, second]},
+            {'cars': [first, second]},
+        ]
+        frame = np.full((120, 160, 3), 90, dtype=np.uint8)
+        for _ in range(3):
+            handler.handle(frame)
+        self.assertEqual(encoder.submit.call_count, 2)
+
+        frame[:, 80:] = 200
+        handler.handle(frame)
+        self.assertEqual(encoder.submit.call_count, 3)
+        [encoded], _ = encoder.submit.call_args
+        self.assertEqual(encoded.items, [first, second])
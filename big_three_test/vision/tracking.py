@@ -0,0 +1,157 @@
+import itertools
+from collections import Counter
+
+from vision.detection import Box
+
+
+def get_iou(first: Box, second: Box) -> float:
+    '''Возвращает отношение площади пересечения прямоугольников
+    к площади их объединения.'''
+
+    width = min(first.x + first.w, second.x + second.w) - max(
+        first.x, second.x
+    )
+    height = min(first.y + first.h, second.y + second.h) - max(
+        first.y, second.y
+    )
+    if width <= 0 or height <= 0:
+        return 0
+    intersection = width * height
+    union = first.w * first.h + second.w * second.h - intersection
+    return intersection / union
+
+
+class Track:
+    '''Объект, отслеживаемый между кадрами.
+
+    Между распознаваниями положение объекта предсказывается
+    по скорости, вычисленной по двум последним распознаваниям.
+    '''
+
+    def __init__(self, track_id: int, object_class: str, box: Box):
+        self.id = track_id
+        self.object_class = object_class
+        # Предсказанное и последнее распознанное положение объекта
+        self.box = box
+        self.detected_box = box
+        # Смещение объекта за кадр
+        self.velocity = (0, 0)
+        # Количество кадров после последнего распознавания
+        self.steps = 0
+        # Количество распознаваний объекта и пропусков подряд
+        self.hits = 1
+        self.misses = 0
+        # Передан ли кадр с объектом на сохранение
+        self.uploaded = False
+        # Не удалось ли сохранить переданный кадр с объектом
+        self.failed = False
+
+    def predict(self):
+        '''Перемещает объект на следующий кадр.'''
+
+        self.steps += 1
+        dx, dy = self.velocity
+        self.box = self.detected_box._replace(
+            x=round(self.detected_box.x + dx * self.steps),
+            y=round(self.detected_box.y + dy * self.steps),
+        )
+
+    def update(self, box: Box):
+        '''Обновляет положение и скорость по распознанному объекту.'''
+
+        if self.steps:
+            self.velocity = (
+                (box.x - self.detected_box.x) / self.steps,
+                (box.y - self.detected_box.y) / self.steps,
+            )
+        self.box = self.detected_box = box
+        self.steps = 0
+        self.hits += 1
+        self.misses = 0
+
+    def hold(self):
+        '''Фиксирует объект в предсказанном положении.'''
+
+        self.detected_box = self.box
+        self.velocity = (0, 0)
+        self.steps = 0
+
+
+class IouTracker:
+    '''Класс для отслеживания объектов по перекрытию прямоугольников.
+
+    Распознанные объекты сопоставляются с предсказанными положениями
+    отслеживаемых объектов того же типа по убыванию IoU. Объекты без
+    пары получают новый идентификатор, а отслеживаемые объекты,
+    не найденные max_misses распознаваний подряд, удаляются.
+    '''
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 3):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.tracks = []
+        # Количество уникальных объектов каждого типа
+        self.counts = Counter()
+        self._ids = itertools.count(1)
+
+    def predict(self) -> list:
+        '''Перемещает отслеживаемые объекты на следующий кадр.'''
+
+        for track in self.tracks:
+            track.predict()
+        return self.tracks
+
+    def hold(self):
+        '''Фиксирует объекты при отсутствии движения в сцене.'''
+
+        for track in self.tracks:
+            track.hold()
+
+    def update(self, detected: dict) -> dict:
+        '''Сопоставляет распознанные объекты с отслеживаемыми.
+
+        Возвращает словарь вида {тип объектов: [Track, ...]}, списки
+        которого соответствуют спискам прямоугольников detected.
+        '''
+
+        pairs = sorted(
+            (
+                (get_iou(track.box, box), track_index, object_class, index)
+                for object_class, boxes in detected.items()
+                for index, box in enumerate(boxes)
+                for track_index, track in enumerate(self.tracks)
+                if track.object_class == object_class
+            ),
+            reverse=True,
+        )
+        assigned = {
+            object_class: [None] * len(boxes)
+            for object_class, boxes in detected.items()
+        }
+        matched = set()
+        for iou, track_index, object_class, index in pairs:
+            if iou < self.iou_threshold:
+                break
+            if track_index in matched or assigned[object_class][index]:
+                continue
+            track = self.tracks[track_index]
+            track.update(detected[object_class][index])
+            assigned[object_class][index] = track
+            matched.add(track_index)
+
+        tracks = []
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    continue
+            tracks.append(track)
+        for object_class, boxes in detected.items():
+            for index, box in enumerate(boxes):
+                if assigned[object_class][index] is None:
+                    track = Track(next(self._ids), object_class, box)
+                    assigned[object_class][index] = track
+                    tracks.append(track)
+                    self.counts[object_class] += 1
+        self.tracks = tracks
+        return assigned
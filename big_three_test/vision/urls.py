@@ -1,9 +1,19 @@
-from django.urls import path
+from django.urls import include, path
+from rest_framework import routers
 
 from vision import views
 
 app_name = 'vision'
 
+router = routers.SimpleRouter()
+router.register('detections', views.DetectionViewSet, basename='detection')
+
 urlpatterns = [
     path('', views.IndexView.as_view(), name='index'),
+    path('jobs/<int:pk>/', views.JobStatusView.as_view(), name='job-status'),
+    path('live/', views.LiveStreamView.as_view(), name='live'),
+    path(
+        'live/events/', views.LiveEventsView.as_view(), name='live-events'
+    ),
+    path('api/', include(router.urls)),
 ]
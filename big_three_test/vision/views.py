@@ -1,36 +1,157 @@
+from http import HTTPStatus
 from typing import Any
 
-from django.http import HttpRequest, HttpResponse, HttpResponseServerError
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.views import View
 from django.views.generic import FormView
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-from vision.camera_vision import CameraConfig, DetectionConfig, VideoCatch
+from vision.filters import DetectionFilter
 from vision.forms import CameraForm
+from vision.jobs import JobQueueFull, submit_job
+from vision.live import stream_events, stream_frames
+from vision.models import Detection, DetectionJob
+from vision.serializers import DetectionSerializer, DetectionStatsSerializer
+
+# Периоды, по которым агрегируется статистика распознаваний
+STATS_PERIODS = {
+    'minute': TruncMinute,
+    'hour': TruncHour,
+    'day': TruncDay,
+}
 
 
 class IndexView(FormView):
     template_name = 'index.html'
     form_class = CameraForm
 
-    def post(
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        job_id = self.request.GET.get('job')
+        if job_id and job_id.isdigit():
+            context['job'] = DetectionJob.objects.filter(pk=job_id).first()
+        return context
+
+    def form_valid(self, form: CameraForm) -> HttpResponse:
+        data = form.cleaned_data
+        try:
+            job = submit_job(
+                camera_url=data.get('camera_url'),
+                object_types=data.get('object_types'),
+            )
+        except JobQueueFull as error:
+            form.add_error(None, str(error))
+            response = self.form_invalid(form)
+            response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+            return response
+        return redirect(f'{reverse("vision:index")}?job={job.pk}')
+
+
+class JobStatusView(View):
+    '''Возвращает статус и результат задачи распознавания.'''
+
+    def get(
+        self, request: HttpRequest, pk: int, *args: str, **kwargs: Any
+    ) -> JsonResponse:
+        job = get_object_or_404(DetectionJob, pk=pk)
+        return JsonResponse({
+            'id': job.pk,
+            'camera_url': job.camera_url,
+            'object_types': job.object_types,
+            'status': job.status,
+            'result': job.result or None,
+            'error': job.error or None,
+            'created': job.created,
+            'updated': job.updated,
+        })
+
+
+class LiveStreamView(View):
+    '''Передает кадры камеры с распознанными объектами в формате MJPEG.
+
+    Параметры запроса совпадают с полями формы: camera_url
+    и object_types. Все зрители одной камеры используют общий поток
+    распознавания.
+    '''
+
+    content_type = 'multipart/x-mixed-replace; boundary=frame'
+
+    def get_stream(self, camera_url: str, object_types):
+        return stream_frames(camera_url, object_types)
+
+    def get(
         self, request: HttpRequest, *args: str, **kwargs: Any
     ) -> HttpResponse:
-        form = self.get_form()
-        if form.is_valid():
-            data = form.cleaned_data
-            camera_url = data.get('camera_url')
-            camera_config = CameraConfig(camera_url=camera_url)
-            detection_config = DetectionConfig(object_type='cars')
-            video_stream = VideoCatch(
-                camera_config=camera_config, detection=detection_config
+        form = CameraForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse(
+                form.errors, status=HTTPStatus.BAD_REQUEST
             )
-            stream_response = video_stream.process()
-            if not stream_response:
-                raise HttpResponseServerError(
-                    'В процессе обработки запроса произошла ошибка.'
-                )
-            response = self.get(request, *args, **kwargs)
-            response.context_data.update(
-                {'file_url': stream_response}
+        response = StreamingHttpResponse(
+            self.get_stream(
+                form.cleaned_data['camera_url'],
+                form.cleaned_data['object_types'],
+            ),
+            content_type=self.content_type,
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Отключает буферизацию ответа в nginx
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class LiveEventsView(LiveStreamView):
+    '''Передает события распознавания камеры (Server-Sent Events).'''
+
+    content_type = 'text/event-stream'
+
+    def get_stream(self, camera_url: str, object_types):
+        return stream_events(camera_url, object_types)
+
+
+class DetectionViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    '''Класс для отображения распознанных объектов с фильтрацией
+    и агрегированной статистикой по камерам.'''
+
+    queryset = Detection.objects.all()
+    serializer_class = DetectionSerializer
+    filterset_class = DetectionFilter
+
+    @action(detail=False)
+    def stats(self, request, *args, **kwargs):
+        '''Количество распознаваний и объектов за период (minute, hour
+        или day) для каждой камеры и типа объектов.'''
+
+        period = request.query_params.get('period', 'minute')
+        if period not in STATS_PERIODS:
+            return Response(
+                {'detail': (
+                    f'Допустимые значения period: {", ".join(STATS_PERIODS)}'
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            return response
-        return super().post(request, *args, **kwargs)
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .annotate(period=STATS_PERIODS[period]('created'))
+            .values('period', 'camera_url', 'object_class')
+            .annotate(detections=Count('id'), objects=Sum('count'))
+            .order_by('-period', 'camera_url', 'object_class')
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = DetectionStatsSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)